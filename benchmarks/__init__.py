@@ -0,0 +1,11 @@
+"""
+Benchmarks against a file-backed SQLite database with the test models
+
+Each run migrates a new database, benchmarks.sqlite3 or the file named by
+BENCHMARK_DATABASE, and removes it afterwards. An existing file is refused.
+
+HOW TO RUN:
+`PYTHONPATH=.:src python -m benchmarks.historization_engines`
+`PYTHONPATH=.:src python -m benchmarks.write_read_paths --anchors 1000 \
+    --attributes 3 --history-depth 3 --output results.json`
+"""
@@ -0,0 +1,34 @@
+"""
+the database the benchmarks run on, created for the run and removed after it
+"""
+import contextlib
+import os
+
+
+@contextlib.contextmanager
+def benchmark_database():
+    """
+    migrate a new database for the run, and remove it afterwards
+
+    Refuses to run against an existing file, as the benchmarks write to the
+    database and it is removed afterwards: remove a leftover
+    benchmarks.sqlite3 or point BENCHMARK_DATABASE to a new file.
+    """
+    from django.conf import settings
+    from django.core.management import call_command
+
+    database_name = settings.DATABASES["default"]["NAME"]
+    if os.path.exists(database_name):
+        raise SystemExit(
+            f"{database_name} exists, remove it or set BENCHMARK_DATABASE to a "
+            "new file"
+        )
+    try:
+        call_command("migrate", verbosity=0)
+        yield
+    finally:
+        from django.db import connections
+
+        connections["default"].close()
+        if os.path.exists(database_name):
+            os.remove(database_name)
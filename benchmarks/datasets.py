@@ -0,0 +1,58 @@
+"""
+synthetic datasets of TProduct anchors: N anchors x M attributes x K history depth
+"""
+from django.db import transaction as db_transaction
+
+# the attributes with a plain value, by related_name
+ATTRIBUTE_VALUES = {
+    "name": lambda anchor, version: f"Product {anchor} v{version}",
+    "description": lambda anchor, version: f"Description {anchor} v{version}",
+    "stock_quantity": lambda anchor, version: anchor + version,
+}
+
+
+def get_attribute_names(attributes):
+    if not 0 <= attributes <= len(ATTRIBUTE_VALUES):
+        raise ValueError(f"attributes must be between 0 and {len(ATTRIBUTE_VALUES)}")
+    return list(ATTRIBUTE_VALUES)[:attributes]
+
+
+def generate_rows(prefix, anchors, attributes, version=0):
+    """
+    rows for `bulk_create_with_attributes`
+    """
+    attribute_names = get_attribute_names(attributes)
+    return [
+        {
+            "business_identifier": f"{prefix}-{i}",
+            **{name: ATTRIBUTE_VALUES[name](i, version) for name in attribute_names},
+        }
+        for i in range(anchors)
+    ]
+
+
+def create_dataset(prefix, anchors, attributes, history_depth):
+    """
+    create the anchors with their attributes, then update every attribute
+    until each has history_depth versions
+
+    Returns:
+        list: the TProduct anchors
+    """
+    from django_anchor_modeling.models import Transaction
+    from tests.orders.models.transaction_backed_models import TProduct
+
+    with db_transaction.atomic():
+        products = TProduct.objects.bulk_create_with_attributes(
+            generate_rows(prefix, anchors, attributes),
+            transaction=Transaction.objects.create(),
+        )
+        pks = [product.pk for product in products]
+        for version in range(1, history_depth):
+            txn = Transaction.objects.create()
+            for name in get_attribute_names(attributes):
+                attribute_class = TProduct._meta.get_field(name).related_model
+                attribute_class.objects.filter(anchor_id__in=pks).update(
+                    value=ATTRIBUTE_VALUES[name](0, version), transaction=txn
+                )
+    return products
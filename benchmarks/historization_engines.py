@@ -0,0 +1,82 @@
+"""
+Python against trigger historization engine
+
+Creates anchors with a name, then updates every name, one save at a time
+and as one queryset update, with each engine. Prints the timings as JSON.
+"""
+import argparse
+import json
+import os
+import time
+
+import django
+
+
+def run(rows):
+    from django.db import transaction as db_transaction
+
+    from django_anchor_modeling.models import Transaction
+    from tests.orders.models.transaction_backed_models import (
+        ProductName,
+        TProduct,
+        TriggerProduct,
+        TriggerProductName,
+    )
+
+    engines = {
+        "python": (TProduct, ProductName),
+        "trigger": (TriggerProduct, TriggerProductName),
+    }
+    results = {}
+    for engine, (anchor_class, name_class) in engines.items():
+        timings = {}
+
+        started = time.perf_counter()
+        with db_transaction.atomic():
+            txn = Transaction.objects.create()
+            for i in range(rows):
+                anchor = anchor_class.objects.create(
+                    business_identifier=f"{engine}-{i}", transaction=txn
+                )
+                name_class.objects.create(
+                    anchor=anchor, value=f"Name {i}", transaction=txn
+                )
+        timings["save_create"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with db_transaction.atomic():
+            txn = Transaction.objects.create()
+            for name in name_class.objects.all():
+                name.value = f"{name.value} - saved"
+                name.save(transaction=txn)
+        timings["save_update"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with db_transaction.atomic():
+            txn = Transaction.objects.create()
+            name_class.objects.all().update(value="updated", transaction=txn)
+        timings["queryset_update"] = time.perf_counter() - started
+
+        results[engine] = timings
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+    django.setup()
+
+    from benchmarks.database import benchmark_database
+
+    with benchmark_database():
+        results = run(args.rows)
+
+    print(json.dumps({"rows": args.rows, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
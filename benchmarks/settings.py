@@ -0,0 +1,11 @@
+import os
+
+from tests.settings import *  # noqa
+
+# file-backed, so that the numbers include the writes going to disk
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.environ.get("BENCHMARK_DATABASE", "benchmarks.sqlite3"),
+    }
+}
@@ -0,0 +1,225 @@
+"""
+throughput of the 6NF write and read paths
+
+Builds a dataset of N anchors x M attributes x K history depth per benchmark,
+then measures ops/sec and queries/op of each path on it. Prints the results as
+JSON, with the commit they ran on, to compare across commits.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import uuid
+
+import django
+
+
+def measure(ops, function):
+    """
+    run function in a transaction, counting its queries
+    """
+    from django.db import connection
+    from django.db import transaction as db_transaction
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        with db_transaction.atomic():
+            function()
+        seconds = time.perf_counter() - started
+    return {
+        "ops": ops,
+        "seconds": round(seconds, 6),
+        "ops_per_sec": round(ops / seconds, 2) if seconds else None,
+        "queries": len(queries),
+        "queries_per_op": round(len(queries) / ops, 3) if ops else None,
+    }
+
+
+def get_benchmarks(anchors, attributes, history_depth):
+    from benchmarks.datasets import create_dataset, generate_rows
+    from dataviewer.models import BusinessToDataFieldMap
+    from dataviewer.services import iter_hydrated_rows
+    from django_anchor_modeling.models import Transaction
+    from tests.orders.models.transaction_backed_models import ProductName, TProduct
+
+    def dataset():
+        prefix = uuid.uuid4().hex[:8]
+        return create_dataset(prefix, anchors, max(attributes, 1), history_depth)
+
+    def save():
+        prefix = uuid.uuid4().hex[:8]
+
+        def run():
+            txn = Transaction.objects.create()
+            for i in range(anchors):
+                TProduct(business_identifier=f"{prefix}-{i}", transaction=txn).save()
+
+        return anchors, run
+
+    def create_or_update_if_different():
+        products = dataset()
+
+        def run():
+            txn = Transaction.objects.create()
+            for i, product in enumerate(products):
+                # every other value is unchanged
+                value = product.name.value if i % 2 else f"{product.name.value}!"
+                ProductName.objects.create_or_update_if_different(product, value, txn)
+
+        return anchors, run
+
+    def queryset_update():
+        pks = [product.pk for product in dataset()]
+
+        def run():
+            ProductName.objects.filter(anchor_id__in=pks).update(
+                value="updated", transaction=Transaction.objects.create()
+            )
+
+        return anchors, run
+
+    def queryset_bulk_create():
+        prefix = uuid.uuid4().hex[:8]
+
+        def run():
+            TProduct.objects.bulk_create_with_attributes(
+                generate_rows(prefix, anchors, attributes),
+                transaction=Transaction.objects.create(),
+            )
+
+        return anchors, run
+
+    def queryset_bulk_update():
+        names = [product.name for product in dataset()]
+
+        def run():
+            for name in names:
+                name.value = f"{name.value}!"
+            ProductName.objects.bulk_update(
+                names, ["value"], transaction=Transaction.objects.create()
+            )
+
+        return anchors, run
+
+    def queryset_delete():
+        pks = [product.pk for product in dataset()]
+
+        def run():
+            ProductName.objects.filter(anchor_id__in=pks).delete(
+                transaction=Transaction.objects.create()
+            )
+
+        return anchors, run
+
+    def cascade_delete():
+        pks = [product.pk for product in dataset()]
+
+        def run():
+            TProduct.objects.filter(pk__in=pks).delete(
+                transaction=Transaction.objects.create()
+            )
+
+        return anchors, run
+
+    def dataviewer_hydration():
+        products = dataset()
+        map_key = f"benchmark-{uuid.uuid4().hex[:8]}"
+        BusinessToDataFieldMap.objects.create(
+            id=map_key,
+            description="benchmark",
+            main_model_class="orders.TProduct",
+            map={
+                "id": {"field": "business_identifier", "model": "TProduct"},
+                "name": {
+                    "field": "value",
+                    "model": "ProductName",
+                    "type": "prefetch_related",
+                    "related_name": "name",
+                },
+            },
+        )
+        filters = {"pk__in": [product.pk for product in products]}
+
+        def run():
+            for _ in iter_hydrated_rows(map_key, filters):
+                pass
+
+        return anchors, run
+
+    return {
+        "save": save,
+        "create_or_update_if_different": create_or_update_if_different,
+        "queryset_update": queryset_update,
+        "queryset_bulk_create": queryset_bulk_create,
+        "queryset_bulk_update": queryset_bulk_update,
+        "queryset_delete": queryset_delete,
+        "cascade_delete": cascade_delete,
+        "dataviewer_hydration": dataviewer_hydration,
+    }
+
+
+def run(anchors, attributes, history_depth, only=None):
+    results = {}
+    for name, benchmark in get_benchmarks(anchors, attributes, history_depth).items():
+        if only and name not in only:
+            continue
+        ops, function = benchmark()
+        results[name] = measure(ops, function)
+    return results
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--anchors", type=int, default=1000, help="N")
+    parser.add_argument("--attributes", type=int, default=3, help="M, up to 3")
+    parser.add_argument("--history-depth", type=int, default=3, help="K")
+    parser.add_argument("--only", nargs="*", help="the benchmarks to run")
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+    django.setup()
+
+    from django.conf import settings
+
+    from benchmarks.database import benchmark_database
+
+    with benchmark_database():
+        results = run(args.anchors, args.attributes, args.history_depth, args.only)
+
+    report = {
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": settings.DATABASES["default"]["ENGINE"],
+        "anchors": args.anchors,
+        "attributes": args.attributes,
+        "history_depth": args.history_depth,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
+
+
+class DataviewerConfig(AppConfig):
+    name = "dataviewer"
+
+    def ready(self):
+        from dataviewer import signals
+        from dataviewer.models import BusinessToDataFieldMap, BusinessToQueryMap
+        from dataviewer.registry import model_registry
+
+        model_registry.build()
+
+        post_save.connect(
+            signals.bump_query_map_version,
+            sender=BusinessToQueryMap,
+            dispatch_uid="dataviewer_query_map_saved",
+        )
+        post_delete.connect(
+            signals.bump_query_map_version,
+            sender=BusinessToQueryMap,
+            dispatch_uid="dataviewer_query_map_deleted",
+        )
+        post_save.connect(
+            signals.bump_biz_to_data_field_map_version,
+            sender=BusinessToDataFieldMap,
+            dispatch_uid="dataviewer_data_field_map_saved",
+        )
+        post_delete.connect(
+            signals.bump_biz_to_data_field_map_version,
+            sender=BusinessToDataFieldMap,
+            dispatch_uid="dataviewer_data_field_map_deleted",
+        )
@@ -0,0 +1,148 @@
+"""
+two-tier caches of the dataviewer maps
+
+A bounded memory tier per process sits in front of the Django cache. Each
+entry is stamped with the version of its map; the versions live in the Django
+cache and are bumped by the post_save and post_delete signals of the maps,
+see `dataviewer.signals`.
+
+The memory tier trusts the version it last read for DATAVIEWER_CACHE_TTL
+seconds, so a hot map costs no round trip to the Django cache, and a change
+made by another process is seen after at most that long.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+_MISSING = object()
+
+
+class LocalLRUCache:
+    """
+    a thread-safe, bounded LRU, with an optional time to live per entry
+    """
+
+    def __init__(self, maxsize=256, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TwoTierCache:
+    """
+    values by key, in process memory then in the Django cache,
+    valid for the version of the key they were stored with
+    """
+
+    def __init__(self, namespace, maxsize=None, ttl=None):
+        self.namespace = namespace
+        maxsize = maxsize or getattr(settings, "DATAVIEWER_CACHE_SIZE", 256)
+        ttl = ttl if ttl is not None else getattr(settings, "DATAVIEWER_CACHE_TTL", 30)
+        self._versions = LocalLRUCache(maxsize=maxsize, ttl=ttl)
+        self._values = LocalLRUCache(maxsize=maxsize)
+
+    def version_key(self, key):
+        return f"{self.namespace}_version:{key}"
+
+    def value_key(self, key):
+        return f"{self.namespace}:{key}"
+
+    def get_version(self, key):
+        """
+        A missing version (never set or evicted) starts from the current time,
+        so it never falls back to a version an older entry was stored with.
+        """
+        version = self._versions.get(key)
+        if version is None:
+            version_key = self.version_key(key)
+            version = cache.get(version_key)
+            if version is None:
+                cache.add(version_key, time.time_ns(), timeout=None)
+                version = cache.get(version_key)
+            self._versions.set(key, version)
+        return version
+
+    def bump_version(self, key):
+        version_key = self.version_key(key)
+        try:
+            version = cache.incr(version_key)
+        except ValueError:
+            # not in the Django cache
+            cache.add(version_key, time.time_ns(), timeout=None)
+            version = cache.get(version_key)
+        self._versions.pop(key)
+        self._values.pop(key)
+        return version
+
+    def get(self, key, loader):
+        """
+        the value of key for its current version, from memory, then from the
+        Django cache, then from loader() which is stored in both
+        """
+        version = self.get_version(key)
+        entry = self._values.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        entry = cache.get(self.value_key(key))
+        if entry is None or entry[0] != version:
+            entry = (version, loader())
+            cache.set(self.value_key(key), entry, timeout=None)
+        self._values.set(key, entry)
+        return entry[1]
+
+    def set(self, key, value):
+        entry = (self.get_version(key), value)
+        cache.set(self.value_key(key), entry, timeout=None)
+        self._values.set(key, entry)
+
+    def clear_local(self):
+        self._versions.clear()
+        self._values.clear()
+
+
+biz_to_data_field_map_cache = TwoTierCache("biz_to_data_field_map")
+query_map_cache = TwoTierCache("business_to_query_map")
+
+
+def get_query_map_version(map_id):
+    return query_map_cache.get_version(map_id)
+
+
+def bump_query_map_version(map_id):
+    return query_map_cache.bump_version(map_id)
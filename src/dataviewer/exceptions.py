@@ -0,0 +1,13 @@
+class AmbiguousModelNameError(ValueError):
+    """
+    a bare model name shared by models of different apps,
+    use "app_label.ModelName" instead
+    """
+
+    def __init__(self, model_name, labels):
+        self.model_name = model_name
+        self.labels = sorted(labels)
+        super().__init__(
+            f"Model name {model_name} is ambiguous, it could be any of "
+            f"{', '.join(self.labels)}. Use app_label.ModelName instead."
+        )
@@ -0,0 +1,320 @@
+"""
+compiled BusinessToQueryMap plans, cached per process
+
+A plan holds what every request for a map would otherwise parse again:
+the resolved main model, the queryset with its select_related, Prefetch tree
+and only, and the field processors with their paths split.
+
+>>> plan = get_query_plan("WHOLE_TREE")
+>>> [plan.process_instance(instance) for instance in plan.get_queryset()]
+
+Plans are dropped when the map is saved or deleted, see `dataviewer.signals`.
+
+For exports, `QueryPlan.iter_projected` reads the full_path_to_single rules
+with one values_list query instead of building model instances:
+
+>>> for row in plan.iter_projected(plan.get_queryset().filter(...)):
+>>>     writer.writerow(row)
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Optional
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import QuerySet
+
+from dataviewer.cache import get_query_map_version
+from dataviewer.models import BusinessToQueryMap
+from dataviewer.utils.query_helpers import QueryHelpers
+
+
+def get_nested_attr(instance, attr_parts):
+    """
+    `QueryHelpers.get_nested_attr` with the path already split
+    """
+    current_attr = instance
+    for attr in attr_parts:
+        if current_attr is None:
+            return None
+        current_attr = getattr(current_attr, attr, None)
+    return current_attr
+
+
+def get_projection_lookup(model, path, hasattr_conditions=()):
+    """
+    the values() lookup of a full_path_to_single path, or None when the path
+    cannot be read in SQL the same way `get_nested_attr` reads it
+
+    Eligible paths go through single-valued relations (forward foreign keys
+    and one to ones, reverse one to ones) to a concrete field, so a missing
+    relation reads as None in both. hasattr conditions are only eligible on
+    the first relation of the path, for the same reason.
+    """
+    current_model = model
+    for index, part in enumerate(path):
+        is_last = index == len(path) - 1
+        try:
+            field = (
+                current_model._meta.pk
+                if part == "pk"
+                else current_model._meta.get_field(part)
+            )
+        except FieldDoesNotExist:
+            return None
+
+        if field.is_relation and part != getattr(field, "attname", None):
+            if is_last or field.many_to_many or field.one_to_many:
+                # an instance or a manager, not a value
+                return None
+            current_model = field.related_model
+        elif not is_last or not field.concrete:
+            # an attribute of a value, or a property
+            return None
+
+    for attribute in hasattr_conditions:
+        if len(path) < 2 or attribute != path[0]:
+            return None
+
+    return "__".join(path)
+
+
+@dataclass(frozen=True)
+class FieldProcessorPlan:
+    """
+    one rule of BusinessToQueryMap.field_processors, parsed
+
+    kind is "single", "many_dict", "many_string" or None for the rules
+    `QueryHelpers.apply_field_processor_rule` returns None for.
+    """
+
+    field: str
+    kind: Optional[str]
+    path: tuple = ()
+    hasattr_conditions: tuple = ()
+    # (key, split path) for many_dict, the split path for many_string
+    sub_paths: tuple = ()
+    # the values() lookup of the eligible "single" rules
+    lookup: Optional[str] = None
+
+    @classmethod
+    def compile(cls, field, rule, model=None):
+        if "full_path_to_single" in rule:
+            path = tuple(rule["full_path_to_single"].split("."))
+            hasattr_conditions = tuple(
+                value
+                for condition, value in rule.get("conditions", {}).items()
+                if condition == "hasattr"
+            )
+            return cls(
+                field=field,
+                kind="single",
+                path=path,
+                hasattr_conditions=hasattr_conditions,
+                lookup=(
+                    get_projection_lookup(model, path, hasattr_conditions)
+                    if model is not None
+                    else None
+                ),
+            )
+
+        if "path_to_many" in rule:
+            # the path to many is one attribute, not split
+            path = (rule["path_to_many"],)
+            if "return_dict" in rule:
+                return cls(
+                    field=field,
+                    kind="many_dict",
+                    path=path,
+                    sub_paths=tuple(
+                        (key, tuple(sub_path.split(".")))
+                        for key, sub_path in rule["return_dict"].items()
+                    ),
+                )
+            if "return_string" in rule:
+                return cls(
+                    field=field,
+                    kind="many_string",
+                    path=path,
+                    sub_paths=tuple(rule["return_string"].split(".")),
+                )
+
+        return cls(field=field, kind=None)
+
+    def apply(self, instance):
+        if self.kind == "single":
+            for attribute in self.hasattr_conditions:
+                if not hasattr(instance, attribute):
+                    return None
+            return get_nested_attr(instance, self.path)
+
+        if self.kind is None:
+            return None
+
+        related_objects = getattr(instance, self.path[0], None)
+        if related_objects is None:
+            return []
+
+        if self.kind == "many_dict":
+            return [
+                {key: get_nested_attr(item, path) for key, path in self.sub_paths}
+                for item in related_objects.all()
+            ]
+
+        values = [
+            str(get_nested_attr(item, self.sub_paths)) for item in related_objects.all()
+        ]
+        return ", ".join(filter(None, values))
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    map_id: str
+    version: Any
+    main_model: type
+    # never evaluated, see get_queryset
+    queryset: QuerySet
+    field_processors: tuple
+
+    @classmethod
+    def compile(cls, query_map, version=None):
+        main_model = QueryHelpers._get_model_for_queryset(query_map.main_model_class)
+        queryset = main_model.objects.select_related(*query_map.select_related)
+        queryset = QueryHelpers.apply_nested_prefetch_rules(
+            queryset, query_map.prefetch_related
+        )
+        if query_map.only:
+            queryset = queryset.only(*query_map.only)
+
+        return cls(
+            map_id=query_map.pk,
+            version=version,
+            main_model=main_model,
+            queryset=queryset,
+            field_processors=tuple(
+                FieldProcessorPlan.compile(field, rule, main_model)
+                for field, rule in query_map.field_processors.items()
+            ),
+        )
+
+    def get_queryset(self):
+        """
+        a fresh clone, as the template is shared by every request
+        """
+        return self.queryset.all()
+
+    def process_instance(self, instance):
+        """
+        same as `QueryHelpers.process_instance` with the field processors of the map
+        """
+        return {
+            processor.field: processor.apply(instance)
+            for processor in self.field_processors
+        }
+
+    def iter_projected(self, queryset=None, chunk_size=2000):
+        """
+        the processed rows of queryset, as `process_instance` would return them,
+        with the rules that have a lookup read by one values_list query
+
+        The other rules (path_to_many, or paths through properties) fall back
+        to the instances of queryset, with its prefetches, per chunk of rows.
+
+        Args:
+            queryset: of the main model, defaults to `get_queryset`
+            chunk_size: the rows per fetch from the database cursor
+                and per fallback query
+
+        Yields:
+            dict: one per row
+        """
+        if queryset is None:
+            queryset = self.get_queryset()
+
+        projected = [p for p in self.field_processors if p.lookup is not None]
+        fallback = [p for p in self.field_processors if p.lookup is None]
+        rows = (
+            queryset.select_related(None)
+            .prefetch_related(None)
+            .values_list("pk", *(processor.lookup for processor in projected))
+            .iterator(chunk_size=chunk_size)
+        )
+
+        while chunk := list(islice(rows, chunk_size)):
+            instances = (
+                {
+                    instance.pk: instance
+                    for instance in queryset.filter(pk__in=[row[0] for row in chunk])
+                }
+                if fallback
+                else {}
+            )
+            for pk, *values in chunk:
+                result = dict(zip((p.field for p in projected), values))
+                instance = instances.get(pk)
+                for processor in fallback:
+                    result[processor.field] = (
+                        processor.apply(instance) if instance is not None else None
+                    )
+                yield {
+                    processor.field: result[processor.field]
+                    for processor in self.field_processors
+                }
+
+
+class QueryPlanCache:
+    """
+    a thread-safe LRU of QueryPlans by map id, holding the version they were
+    compiled for
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, map_id, version):
+        with self._lock:
+            plan = self._plans.get(map_id)
+            if plan is None or plan.version != version:
+                return None
+            self._plans.move_to_end(map_id)
+            return plan
+
+    def set(self, plan):
+        with self._lock:
+            self._plans[plan.map_id] = plan
+            self._plans.move_to_end(plan.map_id)
+            while len(self._plans) > self.maxsize:
+                self._plans.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+
+    def __len__(self):
+        return len(self._plans)
+
+
+query_plan_cache = QueryPlanCache(
+    maxsize=getattr(settings, "DATAVIEWER_QUERY_PLAN_CACHE_SIZE", 128)
+)
+
+
+def get_query_plan(map_id):
+    """
+    the compiled plan of the BusinessToQueryMap map_id,
+    from the process cache unless the map changed since it was compiled
+
+    Raises:
+        BusinessToQueryMap.DoesNotExist
+    """
+    # read before the map, so a change during the compile is not missed
+    version = get_query_map_version(map_id)
+    plan = query_plan_cache.get(map_id, version)
+    if plan is None:
+        plan = QueryPlan.compile(BusinessToQueryMap.objects.get(pk=map_id), version)
+        query_plan_cache.set(plan)
+    return plan
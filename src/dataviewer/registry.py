@@ -0,0 +1,116 @@
+"""
+in-process index of the model classes for the dataviewer lookups
+
+Built once in `DataviewerConfig.ready()`, so resolving a model is a dict hit
+instead of a cache round trip or a ContentType query.
+"""
+import threading
+
+from django.apps import apps
+
+from dataviewer.exceptions import AmbiguousModelNameError
+
+
+class ModelRegistry:
+    """
+    the models by "app_label.ModelName", by bare model name and by
+    content type id, all case-insensitive like ContentType
+    """
+
+    def __init__(self):
+        self.by_label = {}
+        self.by_name = {}
+        # bare name -> labels of the apps sharing it
+        self.ambiguous_names = {}
+        self.by_content_type_id = None
+        self._lock = threading.Lock()
+
+    def build(self, models=None):
+        if models is None:
+            models = apps.get_models(include_auto_created=True)
+
+        by_label = {}
+        labels_by_name = {}
+        for model in models:
+            by_label[model._meta.label_lower] = model
+            labels_by_name.setdefault(model._meta.model_name, set()).add(
+                model._meta.label
+            )
+
+        self.by_label = by_label
+        self.by_name = {
+            name: by_label[next(iter(labels)).lower()]
+            for name, labels in labels_by_name.items()
+            if len(labels) == 1
+        }
+        self.ambiguous_names = {
+            name: labels for name, labels in labels_by_name.items() if len(labels) > 1
+        }
+        self.by_content_type_id = None
+
+    def get_by_label(self, label):
+        """
+        Raises:
+            LookupError
+        """
+        if not self.by_label:
+            self.build()
+        try:
+            return self.by_label[label.lower()]
+        except KeyError:
+            raise LookupError(f"Model {label} not found.") from None
+
+    def get_by_name(self, model_name):
+        """
+        Raises:
+            AmbiguousModelNameError: when apps share the name
+            LookupError
+        """
+        if not self.by_label:
+            self.build()
+        name = model_name.lower()
+        if name in self.ambiguous_names:
+            raise AmbiguousModelNameError(model_name, self.ambiguous_names[name])
+        try:
+            return self.by_name[name]
+        except KeyError:
+            raise LookupError(f"Model {model_name} not found.") from None
+
+    def get(self, name):
+        """
+        by label when name has a dot, by bare name otherwise
+        """
+        return self.get_by_label(name) if "." in name else self.get_by_name(name)
+
+    def _load_content_types(self):
+        from django.contrib.contenttypes.models import ContentType
+
+        with self._lock:
+            self.by_content_type_id = {
+                pk: self.by_label.get(f"{app_label}.{model}")
+                for pk, app_label, model in ContentType.objects.values_list(
+                    "pk", "app_label", "model"
+                )
+            }
+
+    def get_by_content_type_id(self, content_type_id):
+        """
+        the content type ids are read with one query on the first call,
+        not in ready(), as the table may not exist yet
+
+        Raises:
+            LookupError
+        """
+        if (
+            self.by_content_type_id is None
+            or content_type_id not in self.by_content_type_id
+        ):
+            # also reloaded for the content types created since
+            self._load_content_types()
+        model = self.by_content_type_id.get(content_type_id)
+        if model is None:
+            raise LookupError(f"Content type {content_type_id} not found.")
+        return model
+
+
+model_registry = ModelRegistry()
@@ -1,60 +1,54 @@
-from django.apps import apps
+from asgiref.sync import sync_to_async
 from django.contrib.contenttypes.models import ContentType
-from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import transaction
 from django.db.models import Prefetch
 
+from dataviewer.cache import biz_to_data_field_map_cache
+from dataviewer.exceptions import AmbiguousModelNameError
 from dataviewer.models import BusinessToDataFieldMap
+from dataviewer.registry import model_registry
 
 
 def get_app_model(app_label, model_name):
-    cache_key = f"content_type:{app_label}.{model_name}"
-    model_class = cache.get(cache_key)
-    if not model_class:
-        try:
-            # lower_case_app_label = app_label.lower()
-            # lower_case_model_name = model_name.lower()
-            model_class = apps.get_model(app_label, model_name)
-            cache.set(cache_key, model_class)
-        except LookupError as e:
-            raise ValueError(f"Model {model_name} in app {app_label} not found.") from e
-    return model_class
+    try:
+        return model_registry.get_by_label(f"{app_label}.{model_name}")
+    except LookupError as e:
+        raise ValueError(f"Model {model_name} in app {app_label} not found.") from e
 
 
 def get_model_class(model_name):
     """
     to be deprecated in favor of get_app_model
+
+    Raises:
+        AmbiguousModelNameError: when models of different apps have the name
     """
-    cache_key = f"content_type:{model_name}"
-    model_class = cache.get(cache_key)
-    if not model_class:
-        try:
-            lower_case_model_name = model_name.lower()
-            model_class = ContentType.objects.get(
-                model=lower_case_model_name
-            ).model_class()
-            cache.set(cache_key, model_class)
-        except ContentType.DoesNotExist as e:
-            raise ContentType.DoesNotExist(
-                f"ContentType with model {model_name} does not exist"
-            ) from e
-    return model_class
+    try:
+        return model_registry.get_by_name(model_name)
+    except AmbiguousModelNameError:
+        raise
+    except LookupError as e:
+        raise ContentType.DoesNotExist(
+            f"ContentType with model {model_name} does not exist"
+        ) from e
 
 
 def get_biz_to_data_field_map(key):
-    cache_key = cache_key_for_biz_to_data_field_map(key)
-    field_model_map = cache.get(cache_key)
-    if not field_model_map:
+    """
+    from the memory of the process, the Django cache, or the database,
+    see `dataviewer.cache`
+    """
+
+    def load_map():
         try:
-            data_map = BusinessToDataFieldMap.objects.get(id=key)
-            field_model_map = data_map.map
-            cache_biz_to_data_field_map(key, field_model_map)
+            return BusinessToDataFieldMap.objects.get(id=key).map
         except BusinessToDataFieldMap.DoesNotExist as e:
             raise BusinessToDataFieldMap.DoesNotExist(
                 f"BusinessToDataFieldMap with id {key} does not exist"
             ) from e
-    return field_model_map
+
+    return biz_to_data_field_map_cache.get(key, load_map)
 
 
 # {
@@ -80,6 +74,9 @@ def create_biz_to_data_field_map(key, field_model_map, description=""):
                 "order_by": "-from_epoch"
             }
         }
+
+    With "type": "prefetch_latest" instead, only the first version in
+    order_by is fetched per anchor, and read without another query.
     """
     with transaction.atomic():
         obj, created = BusinessToDataFieldMap.objects.get_or_create(
@@ -112,14 +109,13 @@ def delete_and_create_biz_to_data_field_map(
 
 
 def cache_key_for_biz_to_data_field_map(key):
-    return f"biz_to_data_field_map:{key}"
+    return biz_to_data_field_map_cache.value_key(key)
 
 
 def cache_biz_to_data_field_map(key, model_dot_map=None):
     if model_dot_map is None:
         model_dot_map = {}
-    cache_key = cache_key_for_biz_to_data_field_map(key)
-    cache.set(cache_key, model_dot_map)
+    biz_to_data_field_map_cache.set(key, model_dot_map)
 
 
 def get_hydrated_anchor_based_on_data_map(
@@ -179,6 +175,16 @@ def get_hydrated_queryset_based_on_data_map(
     return queryset
 
 
+def get_latest_prefetch_to_attr(related_name):
+    """
+    the relations leading to the versions, and the to_attr holding
+    the latest version on the last of them (the anchor itself when it is a
+    direct relation), for the "prefetch_latest" fetch type
+    """
+    *path, versions = related_name.split("__")
+    return path, f"{versions}_latest"
+
+
 def append_only_fields_get_model_class(model_info, main_model_class, only_fields):
     model_name = model_info["model"]
     main_model_name = main_model_class.__name__
@@ -210,9 +216,20 @@ def append_select_or_prefetch_related_fields(
         select_related_fields.append(related_name)
     elif fetch_type == "prefetch_related":
         related_name = model_info.get("related_name", field)
+        prefetch_queryset = model_class.objects.only(field_name)
+        if order_by:
+            prefetch_queryset = prefetch_queryset.order_by(order_by)
+        prefetch = Prefetch(related_name, queryset=prefetch_queryset)
+        prefetch_related_fields.append(prefetch)
+    elif fetch_type == "prefetch_latest":
+        # one version per related object, with a ROW_NUMBER() window
+        # partitioned by the relation, in a list to read without a query
+        related_name = model_info.get("related_name", field)
+        _, to_attr = get_latest_prefetch_to_attr(related_name)
         prefetch = Prefetch(
             related_name,
-            queryset=model_class.objects.only(field_name).order_by(order_by),
+            queryset=model_class.objects.order_by(order_by or "-pk")[:1],
+            to_attr=to_attr,
         )
         prefetch_related_fields.append(prefetch)
 
@@ -260,6 +277,119 @@ def append_result_with_right_data_in_field(anchor, model_info, field, result):
             result[field] = getattr(related_object, field_name, None)
         except (AttributeError, ObjectDoesNotExist):
             result[field] = None
+    elif fetch_type == "prefetch_latest":
+        path, to_attr = get_latest_prefetch_to_attr(
+            model_info.get("related_name", field)
+        )
+        related_object = anchor
+        for related_name in path:
+            try:
+                related_object = getattr(related_object, related_name)
+            except (AttributeError, ObjectDoesNotExist):
+                related_object = None
+                break
+        latest = getattr(related_object, to_attr, None)
+        result[field] = getattr(latest[0], field_name, None) if latest else None
     else:
         result[field] = getattr(anchor, field_name, None)
     return result
+
+
+def get_main_model_class_for_biz_to_data_field_map(key):
+    try:
+        main_model_class = (
+            BusinessToDataFieldMap.objects.only("main_model_class")
+            .get(id=key)
+            .main_model_class
+        )
+    except BusinessToDataFieldMap.DoesNotExist as e:
+        raise BusinessToDataFieldMap.DoesNotExist(
+            f"BusinessToDataFieldMap with id {key} does not exist"
+        ) from e
+    if not main_model_class:
+        raise ValueError(
+            f"BusinessToDataFieldMap with id {key} has no main_model_class"
+        )
+    return get_app_model(*main_model_class.split("."))
+
+
+def get_hydrated_rows_queryset(
+    map_key, filters=None, main_model_class=None, fields=None
+):
+    """
+    Returns:
+        tuple: the queryset of `iter_hydrated_rows` ordered by pk, and the map
+    """
+    field_model_map = get_biz_to_data_field_map(map_key)
+    if main_model_class is None:
+        main_model_class = get_main_model_class_for_biz_to_data_field_map(map_key)
+
+    queryset = get_hydrated_queryset_based_on_data_map(
+        filters or {}, main_model_class, field_model_map, fields
+    ).order_by("pk")
+    return queryset, field_model_map
+
+
+def get_hydrated_rows_chunk(queryset, field_model_map, last_pk, chunk_size, fields):
+    """
+    Returns:
+        tuple: the transformed rows after last_pk, and the pk of the last of them
+    """
+    chunk_queryset = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+    chunk = list(chunk_queryset[:chunk_size])
+    rows = [
+        transform_hydrated_instance_into_dict(anchor, field_model_map, fields)
+        for anchor in chunk
+    ]
+    return rows, chunk[-1].pk if chunk else last_pk
+
+
+def iter_hydrated_rows(
+    map_key, filters=None, chunk_size=1000, main_model_class=None, fields=None
+):
+    """
+    Yields the dicts of `transform_hydrated_instance_into_dict` for the main model
+    rows matching filters, one chunk at a time so memory stays flat.
+
+    Chunks are paged by primary key (WHERE pk > last pk ORDER BY pk LIMIT n),
+    not OFFSET, and the prefetches of the map run per chunk.
+
+    Args:
+        map_key: the id of the BusinessToDataFieldMap
+        filters: the filter parameters and values of the main model
+        main_model_class: defaults to the main_model_class of the map
+    """
+    queryset, field_model_map = get_hydrated_rows_queryset(
+        map_key, filters, main_model_class, fields
+    )
+    last_pk = None
+    while True:
+        rows, last_pk = get_hydrated_rows_chunk(
+            queryset, field_model_map, last_pk, chunk_size, fields
+        )
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+
+
+async def aiter_hydrated_rows(
+    map_key, filters=None, chunk_size=1000, main_model_class=None, fields=None
+):
+    """
+    `iter_hydrated_rows` for async views, with one thread hop per chunk
+    (its query, its prefetches and the transformation), not per row
+
+    >>> async for row in aiter_hydrated_rows("Product.GENERIC"):
+    """
+    queryset, field_model_map = await sync_to_async(get_hydrated_rows_queryset)(
+        map_key, filters, main_model_class, fields
+    )
+    last_pk = None
+    while True:
+        rows, last_pk = await sync_to_async(get_hydrated_rows_chunk)(
+            queryset, field_model_map, last_pk, chunk_size, fields
+        )
+        for row in rows:
+            yield row
+        if len(rows) < chunk_size:
+            return
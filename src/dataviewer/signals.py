@@ -0,0 +1,24 @@
+from django.db import transaction
+
+from dataviewer.cache import biz_to_data_field_map_cache, query_map_cache
+
+
+def _bump_version_now_and_on_commit(map_cache, key, using):
+    # right away for this process, and again on commit, so entries cached
+    # by other processes from the row before the commit are dropped too
+    map_cache.bump_version(key)
+    transaction.on_commit(lambda: map_cache.bump_version(key), using=using)
+
+
+def bump_query_map_version(sender, instance, using=None, **kwargs):
+    """
+    invalidate the compiled plans of a BusinessToQueryMap saved or deleted
+    """
+    _bump_version_now_and_on_commit(query_map_cache, instance.pk, using)
+
+
+def bump_biz_to_data_field_map_version(sender, instance, using=None, **kwargs):
+    """
+    invalidate the cached map of a BusinessToDataFieldMap saved or deleted
+    """
+    _bump_version_now_and_on_commit(biz_to_data_field_map_cache, instance.pk, using)
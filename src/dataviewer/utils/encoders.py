@@ -0,0 +1,48 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+class Echo:
+    """
+    a file-like object that returns what is written, for csv.writer
+    """
+
+    def write(self, value):
+        return value
+
+
+def iter_json_lines(rows):
+    """
+    Yields one JSON document per row and line, for a StreamingHttpResponse
+
+    >>> StreamingHttpResponse(
+    >>>     iter_json_lines(iter_hydrated_rows("Product.GENERIC")),
+    >>>     content_type="application/jsonl",
+    >>> )
+    """
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+
+def iter_csv(rows, fieldnames=None):
+    """
+    Yields the header then one CSV line per row, for a StreamingHttpResponse
+
+    fieldnames default to the keys of the first row
+    """
+    rows = iter(rows)
+    writer = csv.writer(Echo())
+    if fieldnames is None:
+        first_row = next(rows, None)
+        if first_row is None:
+            return
+        fieldnames = list(first_row)
+        yield writer.writerow(fieldnames)
+        yield writer.writerow([first_row.get(name) for name in fieldnames])
+    else:
+        yield writer.writerow(fieldnames)
+
+    for row in rows:
+        yield writer.writerow([row.get(name) for name in fieldnames])
@@ -0,0 +1,250 @@
+"""
+where the queries of a block of code go, by anchor-model kind and operation
+
+>>> with profile_queries(explain=True) as profiler:
+>>>     rows = list(iter_hydrated_rows("Product.GENERIC"))
+>>> print(profiler.report())
+
+or as a decorator, logging the report to the "dataviewer.profiling" logger:
+
+>>> @profile_queries()
+>>> def export(): ...
+
+Unlike the django.db.backends logger, it works with DEBUG = False.
+"""
+import logging
+import os
+import re
+import time
+import traceback
+from collections import defaultdict
+from contextlib import ContextDecorator
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import django
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from dataviewer.utils.query_capture_handler import QueryCaptureHandler
+
+logger = logging.getLogger("dataviewer.profiling")
+
+_TABLE_PATTERN = re.compile(
+    r'^\s*(?:SELECT\b.*?\bFROM|INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+[`"\[]?(\w+)',
+    re.IGNORECASE | re.DOTALL,
+)
+# the read-only probes for a reused transaction: an exists() filtering on
+# transaction_id, or a read of transaction_id alone
+_TRANSACTION_PROBE_PATTERN = re.compile(
+    r"^\s*SELECT\s+(?:"
+    r"(?:1|%s)\s+AS\s+\S+\s+FROM\b.*\bWHERE\b.*\btransaction_id\b"
+    r'|(?:[`"\[]?\w+[`"\]]?\.)?[`"\[]?transaction_id[`"\]]?\s+FROM\b'
+    r")",
+    re.IGNORECASE | re.DOTALL,
+)
+_IGNORED_PATHS = (
+    os.path.dirname(django.__file__),
+    os.path.dirname(os.path.abspath(__file__)),
+)
+
+
+def get_model_kind(model):
+    """
+    "transaction", "historized", "attribute", "tie", "anchor" or "other"
+    """
+    from django_anchor_modeling.models import (
+        Historized,
+        StaticTie,
+        Transaction,
+        TransactionBackedModel,
+        TransactionBackedTie,
+        ZeroUpdateStrategyModel,
+    )
+
+    if model is None:
+        return "other"
+    if issubclass(model, Transaction):
+        return "transaction"
+    if issubclass(model, Historized):
+        return "historized"
+    if issubclass(model, (TransactionBackedTie, StaticTie)):
+        return "tie"
+    if issubclass(model, (TransactionBackedModel, ZeroUpdateStrategyModel)):
+        return "attribute" if model._meta.pk.is_relation else "anchor"
+    return "other"
+
+
+def get_operation(kind, statement, sql=""):
+    """
+    what the statement is for: "hydrate", "history write", "transaction check",
+    "write" or "other"
+
+    A transaction check is a read of the Transaction table, or a read-only
+    probe of the transaction_id of active rows. Statements that write are
+    writes, whatever they filter on.
+    """
+    if statement in ("INSERT", "UPDATE", "DELETE"):
+        return "history write" if kind == "historized" else "write"
+    if statement != "SELECT":
+        return "other"
+    if kind == "transaction" or _TRANSACTION_PROBE_PATTERN.match(sql):
+        return "transaction check"
+    return "hydrate"
+
+
+def get_call_site():
+    """
+    the innermost frame outside of Django and of this module
+    """
+    for frame in reversed(traceback.extract_stack()):
+        if not frame.filename.startswith(_IGNORED_PATHS):
+            return f"{frame.filename}:{frame.lineno} in {frame.name}"
+    return None
+
+
+@dataclass
+class ProfiledQuery:
+    sql: str
+    params: Any
+    duration: float
+    model: Optional[type]
+    kind: str
+    operation: str
+    call_site: Optional[str]
+    explain: Optional[list] = field(default=None, repr=False)
+
+    @property
+    def model_label(self):
+        return self.model._meta.label if self.model is not None else None
+
+
+class QueryProfiler(QueryCaptureHandler):
+    """
+    a QueryCaptureHandler installed as an execute wrapper of a connection,
+    keeping a ProfiledQuery per statement next to the SQL in `queries`
+    """
+
+    def __init__(self, connection, explain=False):
+        super().__init__()
+        self.connection = connection
+        self.explain = explain
+        self.profiled = []
+        self._models_by_table = {
+            model._meta.db_table.lower(): model
+            for model in apps.get_models(include_auto_created=True)
+        }
+        self._explaining = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if self._explaining:
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record(sql, params, many, time.perf_counter() - start)
+
+    def record(self, sql, params, many, duration):
+        statement = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+        match = _TABLE_PATTERN.match(sql)
+        model = self._models_by_table.get(match[1].lower()) if match else None
+        kind = get_model_kind(model)
+        query = ProfiledQuery(
+            sql=sql,
+            params=params,
+            duration=duration,
+            model=model,
+            kind=kind,
+            operation=get_operation(kind, statement, sql),
+            call_site=get_call_site(),
+        )
+        if self.explain and statement == "SELECT" and not many:
+            query.explain = self.explain_query(sql, params)
+        self.queries.append(sql)
+        self.profiled.append(query)
+
+    def explain_query(self, sql, params):
+        prefix = (
+            "EXPLAIN QUERY PLAN"
+            if self.connection.vendor == "sqlite"
+            else self.connection.ops.explain_prefix
+        )
+        self._explaining = True
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(f"{prefix} {sql}", params)
+                return cursor.fetchall()
+        except Exception:  # the plan is a nice to have, not worth failing for
+            return None
+        finally:
+            self._explaining = False
+
+    def summary(self):
+        """
+        Returns:
+            list: a dict per model and operation with the number of queries
+            and their total duration, the slowest first
+        """
+        groups = defaultdict(lambda: {"count": 0, "duration": 0.0})
+        for query in self.profiled:
+            group = groups[(query.model_label, query.kind, query.operation)]
+            group["count"] += 1
+            group["duration"] += query.duration
+        return sorted(
+            (
+                {
+                    "model": model_label,
+                    "kind": kind,
+                    "operation": operation,
+                    **totals,
+                }
+                for (model_label, kind, operation), totals in groups.items()
+            ),
+            key=lambda group: group["duration"],
+            reverse=True,
+        )
+
+    def report(self):
+        lines = [
+            f"{len(self.profiled)} queries in "
+            f"{sum(query.duration for query in self.profiled) * 1000:.1f} ms"
+        ]
+        lines.extend(
+            f"{group['count']:>6} {group['duration'] * 1000:>10.1f} ms  "
+            f"{group['operation']:<17} {group['kind']:<11} {group['model']}"
+            for group in self.summary()
+        )
+        return "\n".join(lines)
+
+
+class profile_queries(ContextDecorator):
+    """
+    profile the queries on a database connection, see `QueryProfiler`
+
+    Args:
+        using: the database alias, "default" by default
+        explain: also keep the EXPLAIN output of every SELECT, one more query each
+    """
+
+    def __init__(self, using=None, explain=False):
+        self.using = using or DEFAULT_DB_ALIAS
+        self.explain = explain
+
+    def _recreate_cm(self):
+        # a profiler per call of a decorated function
+        return self.__class__(using=self.using, explain=self.explain)
+
+    def __enter__(self):
+        connection = connections[self.using]
+        self.profiler = QueryProfiler(connection, explain=self.explain)
+        self._wrapper = connection.execute_wrapper(self.profiler)
+        self._wrapper.__enter__()
+        return self.profiler
+
+    def __exit__(self, *exc_info):
+        self._wrapper.__exit__(*exc_info)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(self.profiler.report())
+        return False
@@ -161,14 +161,10 @@ class QueryHelpers:
         :param model_path: The string path of the model (e.g., 'myapp.ModelName').
         :return: The Django model class.
         """
-        from django.apps import apps
+        from dataviewer.registry import model_registry
 
         try:
-            # Split the string into app_label and model_name
-            app_label, model_name = main_model_class.split(".")
-
-            # Dynamically get the model class
-            return apps.get_model(app_label, model_name)
+            return model_registry.get_by_label(main_model_class)
         except LookupError as e:
             # Handle the case where the model_path is not found
             raise ValueError(f"Model '{main_model_class}' not found.") from e
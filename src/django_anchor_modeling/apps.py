@@ -1,6 +1,12 @@
-from django.apps import AppConfig
+from django.apps import AppConfig, apps
 from django.conf import settings
-from django.db.models.signals import class_prepared, post_migrate
+from django.core.signals import request_started
+from django.db.models.signals import (
+    class_prepared,
+    post_delete,
+    post_migrate,
+    post_save,
+)
 
 
 def historized_setup(sender, **kwargs):
@@ -14,6 +20,7 @@ class DjangoAnchorModelingApp(AppConfig):
 
     def ready(self):
         from django_anchor_modeling import signals
+        from django_anchor_modeling.models import Knot
 
         if getattr(
             settings,
@@ -22,6 +29,15 @@ class DjangoAnchorModelingApp(AppConfig):
         ):
             post_migrate.connect(signals.populate_choices, sender=self)
 
+        # per model, as a receiver for every model would keep
+        # `cascade_delete` from deleting without loading the rows
+        for model in apps.get_models():
+            if issubclass(model, Knot):
+                post_save.connect(signals.invalidate_knot_cache, sender=model)
+                post_delete.connect(signals.invalidate_knot_cache, sender=model)
+        if getattr(settings, "DJANGO_ANCHOR_MODELING_WARM_KNOT_CACHE", False):
+            request_started.connect(signals.warm_knot_cache)
+
     def __init__(self, *args, **kwargs):
         class_prepared.connect(historized_setup)
         super().__init__(*args, **kwargs)
@@ -41,6 +41,50 @@ def foreign_key_field() -> "ForeignKey":
     return foreign_key_field
 
 
+def historized_indexes() -> bool:
+    """Whether historized models get composite indexes
+    on (original, off_txn) and (on_txn, off_txn).
+
+    Set `settings.HISTORIZED_INDEXES = False` to leave them out.
+
+    Returns:
+        True by default
+    """
+    historized_indexes = getattr(settings, "HISTORIZED_INDEXES", True)
+    assert isinstance(historized_indexes, bool)
+    return historized_indexes
+
+
+def historized_unique_open_version() -> bool:
+    """Whether historized models get a partial unique index
+    enforcing one open version per original.
+
+    Set `settings.HISTORIZED_UNIQUE_OPEN_VERSION = True` to add it.
+
+    Returns:
+        False by default
+    """
+    unique_open_version = getattr(settings, "HISTORIZED_UNIQUE_OPEN_VERSION", False)
+    assert isinstance(unique_open_version, bool)
+    return unique_open_version
+
+
+def materialized_refresh_overlap() -> int:
+    """The number of Transaction ids up to the high-water-mark that an
+    incremental refresh of a materialized table scans again, to see the
+    writes of lower Transaction ids that committed after the last refresh.
+
+    Set `settings.MATERIALIZED_REFRESH_OVERLAP` to the number of Transactions
+    that can be open at once.
+
+    Returns:
+        100 by default
+    """
+    overlap = getattr(settings, "MATERIALIZED_REFRESH_OVERLAP", 100)
+    assert isinstance(overlap, int) and overlap >= 0
+    return overlap
+
+
 def exclude_field_kwargs() -> Dict["Field", List[str]]:
     """
     Provide a mapping of field classes to a list of keyword args to ignore
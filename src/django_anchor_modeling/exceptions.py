@@ -31,6 +31,10 @@ class SentinelTransactionCannotBeUsedError(CustomTransactionExceptionWithCode):
     code = "TE004"
 
 
+class BulkCreatedPrimaryKeysNotReturnedError(CustomTransactionExceptionWithCode):
+    code = "TE005"
+
+
 class CustomTransactionBackedExceptionWithCode(PermissionDenied):
     code = None
 
@@ -0,0 +1,30 @@
+from django.apps import apps
+from django.core.management.base import CommandError
+
+
+def get_anchor_derived_models(anchor_attribute, labels=None):
+    """
+    the models made for an anchor, that point to it with anchor_attribute
+    (`current_view_of`, `materialized_of`), all of them or the ones of the
+    given app_label.ModelName labels, of the models or of their anchors
+    """
+    derived_models = [
+        model
+        for model in apps.get_models()
+        if getattr(model, anchor_attribute, None) is not None
+    ]
+    if not labels:
+        return derived_models
+
+    by_label = {model._meta.label_lower: model for model in derived_models}
+    by_anchor_label = {
+        getattr(model, anchor_attribute)._meta.label_lower: model
+        for model in derived_models
+    }
+    selected = []
+    for label in labels:
+        model = by_label.get(label.lower()) or by_anchor_label.get(label.lower())
+        if model is None:
+            raise CommandError(f"No model with {anchor_attribute} for {label}")
+        selected.append(model)
+    return selected
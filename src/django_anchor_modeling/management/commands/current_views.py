@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db import transaction as db_transaction
+
+from django_anchor_modeling.management import get_anchor_derived_models
+from django_anchor_modeling.views import create_current_view_sql, drop_current_view_sql
+
+
+class Command(BaseCommand):
+    help = (
+        "(Re)create the current views of the anchors that have a model made by "
+        "create_current_view_model, or print their SQL with --sql."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "labels",
+            nargs="*",
+            help="app_label.ModelName of the anchors or of their view models",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help='The database to create the views in. Defaults to "default".',
+        )
+        parser.add_argument(
+            "--sql",
+            action="store_true",
+            help="Print the SQL instead of running it.",
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        statements = []
+        for view_model in get_anchor_derived_models(
+            "current_view_of", options["labels"]
+        ):
+            anchor_model = view_model.current_view_of
+            statements.append(drop_current_view_sql(connection, anchor_model))
+            statements.append(
+                create_current_view_sql(
+                    connection, anchor_model, view_model.current_view_attributes
+                )
+            )
+
+        if options["sql"]:
+            for statement in statements:
+                self.stdout.write(f"{statement};")
+            return
+
+        with db_transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
+        self.stdout.write(f"Created {len(statements) // 2} current view(s)")
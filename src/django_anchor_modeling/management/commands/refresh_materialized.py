@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from django_anchor_modeling.management import get_anchor_derived_models
+from django_anchor_modeling.materialized import refresh_materialized_model
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh the materialized tables made by create_materialized_model "
+        "with the changes since their last refresh."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "labels",
+            nargs="*",
+            help="app_label.ModelName of the anchors or of their materialized models",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help='The database to refresh in. Defaults to "default".',
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="The number of anchors refreshed per statement.",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Rebuild the whole tables instead of the changes.",
+        )
+        parser.add_argument(
+            "--overlap",
+            type=int,
+            help=(
+                "The number of Transaction ids up to the last refresh to scan again. "
+                "Defaults to settings.MATERIALIZED_REFRESH_OVERLAP."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        for materialized_model in get_anchor_derived_models(
+            "materialized_of", options["labels"]
+        ):
+            refreshed = refresh_materialized_model(
+                materialized_model,
+                batch_size=options["batch_size"],
+                using=options["database"],
+                full=options["full"],
+                overlap=options["overlap"],
+            )
+            self.stdout.write(
+                f"Refreshed {refreshed} anchor(s) in {materialized_model._meta.label}"
+            )
@@ -0,0 +1,216 @@
+"""
+materialized wide tables, one row per anchor with a column per attribute
+
+Unlike the current views in `views`, the joins are paid once per change
+instead of on every read. The table is kept up to date incrementally:
+only the anchors whose anchor or attribute rows (or history versions) were
+written by a Transaction after the stored high-water-mark, or by one of
+the Transactions just below it, are refreshed.
+
+>>> TProductMaterialized = create_materialized_model(TProduct, [ProductName])
+>>> refresh_materialized_model(TProductMaterialized)
+
+Refresh from the `refresh_materialized` management command, or after the
+writes with `refresh_materialized_on_commit`.
+"""
+import sys
+
+from django.db import connections, models, router
+from django.db import transaction as db_transaction
+
+from . import config
+from .models import MaterializedHighWaterMark, Transaction, get_historized_model_for
+from .utils import truncate_identifier
+from .views import (
+    get_current_model_fields,
+    get_current_values_queryset,
+    get_current_view_columns,
+)
+
+
+def get_materialized_table_name(anchor_model):
+    return truncate_identifier(f"{anchor_model._meta.db_table}_materialized")
+
+
+def create_materialized_model(anchor_model, attribute_classes):
+    """
+    a model `<Anchor>Materialized` for the materialized table of anchor_model
+
+    The attribute classes are given, as the relations of the anchor
+    are not known yet while the models module is imported.
+
+    Args:
+        anchor_model: the Anchor class
+        attribute_classes: the attributes in the table
+
+    Returns:
+        the model class, also set in the models module of the anchor
+    """
+    model_name = f"{anchor_model.__name__}Materialized"
+    fields, related_names = get_current_model_fields(anchor_model, attribute_classes)
+
+    # the pk is copied from the anchor, not generated
+    pk = anchor_model._meta.pk
+    if isinstance(pk, models.BigAutoField):
+        fields[pk.name] = models.BigIntegerField(primary_key=True)
+    elif isinstance(pk, models.AutoField):
+        fields[pk.name] = models.IntegerField(primary_key=True)
+
+    class_attrs = {
+        "__module__": anchor_model.__module__,
+        "Meta": type(
+            "Meta",
+            (),
+            {
+                "db_table": get_materialized_table_name(anchor_model),
+                "app_label": anchor_model._meta.app_label,
+            },
+        ),
+        "materialized_of": anchor_model,
+        "materialized_attributes": related_names,
+        **fields,
+    }
+
+    materialized_model = type(model_name, (models.Model,), class_attrs)
+    setattr(sys.modules[anchor_model.__module__], model_name, materialized_model)
+
+    return materialized_model
+
+
+def get_changed_anchor_pks(
+    anchor_model, related_names, low_water_mark, high_water_mark, using=None
+):
+    """
+    the pks of the anchors written by a Transaction in
+    (low_water_mark, high_water_mark], one query per table on the indexed
+    transaction_id and off_txn
+
+    - created or updated: the transaction_id of the anchor or the attribute
+    - deleted: the off_txn of the history. Deletes of models without history
+      are not seen, refresh with full=True after those.
+    """
+    tables = [anchor_model] + [
+        anchor_model._meta.get_field(related_name).related_model
+        for related_name in related_names
+    ]
+
+    pks = set()
+    for model in tables:
+        pks.update(
+            model._base_manager.using(using)
+            .filter(
+                transaction_id__gt=low_water_mark,
+                transaction_id__lte=high_water_mark,
+            )
+            .values_list("pk", flat=True)
+        )
+        historized_model = get_historized_model_for(model)
+        if historized_model is not None:
+            pks.update(
+                historized_model._base_manager.using(using)
+                .filter(off_txn_id__gt=low_water_mark, off_txn_id__lte=high_water_mark)
+                .values_list("original_id", flat=True)
+            )
+
+    return pks
+
+
+def _refresh_anchors(materialized_model, pks, using):
+    """
+    DELETE and INSERT ... SELECT the rows of the anchors with pks
+    """
+    anchor_model = materialized_model.materialized_of
+    related_names = materialized_model.materialized_attributes
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+
+    materialized_model._base_manager.using(using).filter(pk__in=pks)._raw_delete(using)
+
+    select_queryset = get_current_values_queryset(
+        anchor_model, related_names, using=using
+    ).filter(pk__in=pks)
+    select_sql, params = select_queryset.query.get_compiler(using).as_sql()
+    columns = ", ".join(
+        quote_name(column)
+        for column in get_current_view_columns(anchor_model, related_names).values()
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote_name(materialized_model._meta.db_table)} "
+            f"({columns}) {select_sql}",
+            params,
+        )
+
+
+def refresh_materialized_model(
+    materialized_model, batch_size=1000, using=None, full=False, overlap=None
+):
+    """
+    bring the materialized table up to the latest Transaction
+
+    The high-water-mark row is locked for the refresh, so refreshes of the same
+    table do not overlap. Transactions are allocated before their writes
+    commit (`transaction_scope`, `WriteBehindQueue`), so a lower Transaction id
+    can commit after a refresh moved the mark past it. The incremental refresh
+    scans the last `overlap` Transaction ids up to the mark again to see those
+    writes; refreshing an anchor twice is harmless.
+
+    Args:
+        batch_size: the number of anchors deleted and inserted per statement
+        full: rebuild the whole table instead of the changes
+        overlap: the number of Transaction ids up to the mark to scan again,
+            `settings.MATERIALIZED_REFRESH_OVERLAP` (100) by default
+
+    Returns:
+        int: the number of anchors refreshed
+    """
+    using = using or router.db_for_write(materialized_model)
+    if overlap is None:
+        overlap = config.materialized_refresh_overlap()
+    anchor_model = materialized_model.materialized_of
+
+    with db_transaction.atomic(using=using):
+        watermark, _ = (
+            MaterializedHighWaterMark.objects.using(using)
+            .select_for_update()
+            .get_or_create(db_table=materialized_model._meta.db_table)
+        )
+        high_water_mark = (
+            Transaction.objects.using(using).aggregate(models.Max("pk"))["pk__max"] or 0
+        )
+
+        if full:
+            materialized_model._base_manager.using(using).all()._raw_delete(using)
+            pks = set(
+                anchor_model._base_manager.using(using).values_list("pk", flat=True)
+            )
+        else:
+            pks = get_changed_anchor_pks(
+                anchor_model,
+                materialized_model.materialized_attributes,
+                max(watermark.high_water_mark - overlap, 0),
+                high_water_mark,
+                using=using,
+            )
+
+        pks = sorted(pks)
+        for start in range(0, len(pks), batch_size):
+            _refresh_anchors(materialized_model, pks[start : start + batch_size], using)
+
+        watermark.high_water_mark = high_water_mark
+        watermark.save(using=using)
+
+    return len(pks)
+
+
+def refresh_materialized_on_commit(*materialized_models, using=None, **kwargs):
+    """
+    refresh the materialized models once the current transaction commits,
+    right away when not in one. kwargs go to `refresh_materialized_model`
+    """
+
+    def refresh():
+        for materialized_model in materialized_models:
+            refresh_materialized_model(materialized_model, using=using, **kwargs)
+
+    db_transaction.on_commit(refresh, using=using)
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.db import migrations
+
+from django_anchor_modeling import constants
+
+# 0001_initial falls back to 1 instead of the sentinel the models use.
+# Seed the sentinel the models actually use so that the hot paths
+# can refer to it by id without a get_or_create
+SENTINEL_NULL_TRANSACTION_ID = getattr(
+    settings, "SENTINEL_NULL_TRANSACTION_ID", constants.SENTINEL_NULL_TRANSACTION_ID
+)
+
+
+def add_sentinel(apps, schema_editor):
+    Transaction = apps.get_model("django_anchor_modeling", "Transaction")
+    Transaction.objects.get_or_create(pk=SENTINEL_NULL_TRANSACTION_ID)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_anchor_modeling", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_sentinel, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-18 13:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_anchor_modeling", "0002_ensure_sentinel_transaction"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MaterializedHighWaterMark",
+            fields=[
+                (
+                    "db_table",
+                    models.CharField(max_length=255, primary_key=True, serialize=False),
+                ),
+                ("high_water_mark", models.BigIntegerField(default=0)),
+                ("refreshed", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
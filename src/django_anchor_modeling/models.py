@@ -1,20 +1,24 @@
 import sys
+import threading
 from types import new_class
 from typing import List, Union
 
 import icontract
+from asgiref.sync import sync_to_async
 from django.apps import apps
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
-from django.core.exceptions import ImproperlyConfigured
+from django.core.exceptions import ImproperlyConfigured, ObjectDoesNotExist
 from django.core.validators import RegexValidator
-from django.db import models
+from django.db import connections, models, router
+from django.db.models import signals
+from django.db.models.deletion import Collector, get_candidate_relations_to_delete
 from django.db import transaction as db_transaction
-from django.db.utils import IntegrityError
 
 from django_anchor_modeling import config, constants
 
 from .exceptions import (
+    BulkCreatedPrimaryKeysNotReturnedError,
     CannotReuseExistingTransactionError,
     MissingTransactionInModelError,
     NotAnAnchorError,
@@ -31,6 +35,8 @@ from .managers import (
     add_method_to_manager,
     create_prepare_filter_manager,
 )
+from .scope import get_current_transaction_scope
+from .utils import truncate_identifier
 
 
 class TimeStampedModel(models.Model):
@@ -91,13 +97,24 @@ class CreatedModel(models.Model):
 
 class UndeletableModelManager(models.Manager):
     def delete(self, *args, **kwargs):
-        qs = self.all()
-        for obj in qs:
-            if not obj.can_be_deleted():
+        """
+        delete every row, if they can all be deleted
+
+        With a `deletable_q` classmethod on the model, the check is one
+        exists() query, otherwise `can_be_deleted` is called per instance.
+        """
+        qs = self.get_queryset()
+        deletable_q = getattr(self.model, "deletable_q", None)
+        with db_transaction.atomic(using=qs.db):
+            if deletable_q is not None:
+                undeletable = qs.exclude(deletable_q()).exists()
+            else:
+                undeletable = any(not obj.can_be_deleted() for obj in qs.iterator())
+            if undeletable:
                 raise UndeletableModelError(
                     "Some objects cannot be deleted due to conditions."
                 )
-        super().delete(*args, **kwargs)
+            return qs.delete(*args, **kwargs)
 
 
 class UndeletableModel(models.Model):
@@ -115,6 +132,10 @@ class UndeletableModel(models.Model):
         """
         Override this method in subclass to set custom delete conditions.
         If not overridden, it will return False, making the instance undeletable.
+
+        To check the rows in SQL instead, also define a classmethod
+        `deletable_q()` returning the Q of the deletable rows, which
+        `UndeletableModelManager.delete` then uses.
         """
         return False
 
@@ -142,7 +163,11 @@ class UndeletableModel(models.Model):
 #     def delete(self, *args, **kwargs):
 #         if self.filter(is_deletable=False).exists():
 #             raise UndeletableModelError("Some objects cannot be deleted due to conditions.")
-#         super().delete(*args, **kwargs)
+#         return self.get_queryset().delete(*args, **kwargs)
+# or without a manager, on the model:
+#     @classmethod
+#     def deletable_q(cls):
+#         return Q(is_deletable=True)
 
 # class ConditionalUndeletableModel(ComputedFieldsModel, UndeletableModel):
 #     some_field = models.BooleanField(default=False)  # Example field
@@ -550,6 +575,17 @@ class Transaction(CreatedModel, UndeletableModel):
         return SENTINEL_NULL_TRANSACTION_ID
 
 
+class MaterializedHighWaterMark(models.Model):
+    """
+    the latest Transaction id a materialized model is refreshed up to,
+    see `materialized.refresh_materialized_model`
+    """
+
+    db_table = models.CharField(max_length=255, primary_key=True)
+    high_water_mark = models.BigIntegerField(default=0)
+    refreshed = models.DateTimeField(auto_now=True)
+
+
 class TransactionBackedManager(models.Manager):
     def get_queryset(self):
         return TransactionBackedQuerySet(self.model, using=self._db)
@@ -612,6 +648,323 @@ class TransactionBackedAttributeManager(TransactionBackedManager):
 
             return obj, created, different
 
+    def create_or_update_if_different_many(self, values, txn_instance, batch_size=1000):
+        """
+        bulk variant of `create_or_update_if_different`
+
+        Per batch of anchors, the existing records are locked in one query
+        with the pks sorted to avoid deadlocks, the values are compared in memory,
+        the missing records are bulk created and only the different ones are
+        bulk updated. History is written per batch along with them.
+
+        Args:
+            values: mapping of anchor (instance or pk) to the new value.
+                For ForeignKey the new value can be an instance or a pk.
+            txn_instance: the Transaction or transaction id to write with.
+            batch_size: the number of anchors locked and written at a time.
+
+        Returns:
+            dict: keyed like values, of (obj, created, different)
+            the same as what `create_or_update_if_different` returns
+        """
+        pk_attname = self.model._meta.pk.attname
+        value_field = self.model._meta.get_field("value")
+
+        # anchors can be given as instances or pks
+        keys_by_pk = {getattr(anchor, "pk", anchor): anchor for anchor in values}
+        sorted_pks = sorted(keys_by_pk)
+
+        results = {}
+        with db_transaction.atomic(using=self.db):
+            for start in range(0, len(sorted_pks), batch_size):
+                batch_pks = sorted_pks[start : start + batch_size]
+                existing_objs = {
+                    obj.pk: obj
+                    for obj in self.select_for_update()
+                    .filter(pk__in=batch_pks)
+                    .order_by("pk")
+                }
+
+                objs_to_create = []
+                objs_to_update = []
+                for pk in batch_pks:
+                    key = keys_by_pk[pk]
+                    new_value = values[key]
+                    # For ForeignKey, compare IDs; otherwise, compare the values
+                    if value_field.is_relation:
+                        new_value = getattr(new_value, "pk", new_value)
+
+                    obj = existing_objs.get(pk)
+                    if obj is None:
+                        obj = self.model(
+                            **{pk_attname: pk, value_field.attname: new_value}
+                        )
+                        objs_to_create.append(obj)
+                        results[key] = (obj, True, None)
+                    elif getattr(obj, value_field.attname) != new_value:
+                        setattr(obj, value_field.attname, new_value)
+                        objs_to_update.append(obj)
+                        results[key] = (obj, False, True)
+                    else:
+                        results[key] = (obj, False, False)
+
+                if objs_to_create:
+                    self.bulk_create(objs_to_create, transaction=txn_instance)
+                if objs_to_update:
+                    self.bulk_update(
+                        objs_to_update, ["value"], transaction=txn_instance
+                    )
+
+        return results
+
+    def can_upsert(self):
+        """
+        whether the database can run `upsert_if_different` in one statement
+        """
+        connection = connections[self.db]
+        return (
+            connection.vendor in ("sqlite", "postgresql")
+            and connection.features.can_return_columns_from_insert
+        )
+
+    def upsert_if_different(self, anchor, new_value, txn_instance):
+        """
+        single statement variant of `create_or_update_if_different`
+
+        INSERT ... ON CONFLICT (anchor) DO UPDATE ... WHERE the value is different
+        RETURNING the row, so there is neither a row lock to wait for nor a
+        separate SELECT. The returned row is written straight into the history.
+        Only when nothing is returned (the value is the same) the row is read back.
+        Without xmax to tell an insert from an update, as on SQLite, whether the
+        row exists is probed first.
+
+        Falls back to `create_or_update_if_different` on the databases
+        that cannot do this, see `can_upsert`.
+
+        Returns:
+            tuple: (obj, created, different) like `create_or_update_if_different`
+        """
+        if not self.can_upsert():
+            return self.create_or_update_if_different(anchor, new_value, txn_instance)
+
+        transaction_id = (
+            txn_instance.id if isinstance(txn_instance, models.Model) else txn_instance
+        )
+        self.model.shared_required_transaction_check(transaction_id)
+
+        connection = connections[self.db]
+        quote_name = connection.ops.quote_name
+        opts = self.model._meta
+        pk_field = opts.pk
+        value_field = opts.get_field("value")
+        transaction_field = opts.get_field("transaction")
+        anchor_pk = getattr(anchor, "pk", anchor)
+        if value_field.is_relation:
+            new_value = getattr(new_value, "pk", new_value)
+
+        table = quote_name(opts.db_table)
+        pk_column = quote_name(pk_field.column)
+        value_column = quote_name(value_field.column)
+        transaction_column = quote_name(transaction_field.column)
+        concrete_fields = opts.concrete_fields
+        returning = ", ".join(
+            f"{table}.{quote_name(field.column)}" for field in concrete_fields
+        )
+        if connection.vendor == "postgresql":
+            # xmax is 0 only for a freshly inserted row
+            returning += f", ({table}.xmax = 0)"
+            distinct_from = "IS DISTINCT FROM"
+        else:
+            distinct_from = "IS NOT"
+
+        sql = (
+            f"INSERT INTO {table} ({pk_column}, {value_column}, {transaction_column}) "
+            f"VALUES (%s, %s, %s) "
+            f"ON CONFLICT ({pk_column}) DO UPDATE SET "
+            f"{value_column} = EXCLUDED.{value_column}, "
+            f"{transaction_column} = EXCLUDED.{transaction_column} "
+            f"WHERE {table}.{value_column} {distinct_from} EXCLUDED.{value_column} "
+            f"AND {table}.{transaction_column} <> EXCLUDED.{transaction_column} "
+            f"RETURNING {returning}"
+        )
+        params = [
+            pk_field.get_db_prep_save(anchor_pk, connection),
+            value_field.get_db_prep_save(new_value, connection),
+            transaction_id,
+        ]
+
+        historized_model = get_historized_model_to_write_for(self.model)
+        with db_transaction.atomic(using=self.db):
+            existed = (
+                None
+                if connection.vendor == "postgresql"
+                else self.filter(pk=anchor_pk).exists()
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                row = cursor.fetchone()
+
+            if row is None:
+                # the value is the same, or the transaction is reused
+                obj = self.get(pk=anchor_pk)
+                if getattr(obj, value_field.attname) == new_value:
+                    return obj, False, False
+                raise CannotReuseExistingTransactionError(
+                    "New Transaction must be provided for update."
+                )
+
+            values = []
+            for field, value in zip(concrete_fields, row):
+                col = field.get_col(opts.db_table)
+                converters = connection.ops.get_db_converters(
+                    col
+                ) + col.get_db_converters(connection)
+                for converter in converters:
+                    value = converter(value, col, connection)
+                values.append(value)
+            obj = self.model.from_db(
+                self.db, [field.attname for field in concrete_fields], values
+            )
+
+            created = bool(row[-1]) if existed is None else not existed
+            if historized_model is not None:
+                close_open_historized_versions(
+                    historized_model, [obj.pk], transaction_id, using=self.db
+                )
+                build_historized_instance(historized_model, obj, transaction_id).save(
+                    using=self.db
+                )
+
+        if created:
+            return obj, True, None
+        return obj, False, True
+
+    async def acreate_or_update_if_different(self, anchor, new_value, txn_instance):
+        """
+        `create_or_update_if_different` in one thread hop,
+        as its SELECT FOR UPDATE and history writes share one database transaction
+        """
+        return await sync_to_async(self.create_or_update_if_different)(
+            anchor, new_value, txn_instance
+        )
+
+    async def aupsert_if_different(self, anchor, new_value, txn_instance):
+        return await sync_to_async(self.upsert_if_different)(
+            anchor, new_value, txn_instance
+        )
+
+
+class TransactionBackedAnchorManager(TransactionBackedManager):
+    def get_queryset(self):
+        return TransactionBackedAnchorQuerySet(self.model, using=self._db)
+
+    def with_attributes(self, *related_names):
+        return self.get_queryset().with_attributes(*related_names)
+
+    def bulk_create_with_attributes(
+        self,
+        rows: List[dict],
+        transaction: Union[int, "Transaction"] = None,
+        batch_size=1000,
+    ):
+        """
+        create anchors together with their attributes
+
+        Each row is a dict keyed by the attribute related_names
+        (see `get_attribute_classes`) with the attribute values, any other key
+        is a field of the anchor itself. A missing key means no attribute.
+
+        Per batch of rows, the anchors are inserted with one `bulk_create`,
+        then there is one `bulk_create` per attribute table and one per
+        historized table, instead of a save per anchor and per attribute.
+
+        >>> TProduct.objects.bulk_create_with_attributes(
+        >>>     [{"business_identifier": "p1", "name": "Product 1", "seller": biz}],
+        >>>     transaction=txn,
+        >>> )
+
+        Returns:
+            list: the created anchors in the order of the rows
+        """
+        attribute_classes = self.model.get_attribute_classes()
+        anchors = []
+
+        with db_transaction.atomic(using=self.db):
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start : start + batch_size]
+                batch_anchors = self.bulk_create(
+                    [
+                        self.model(
+                            **{
+                                key: value
+                                for key, value in row.items()
+                                if key not in attribute_classes
+                            }
+                        )
+                        for row in batch
+                    ],
+                    batch_size=batch_size,
+                    transaction=transaction,
+                )
+                if any(anchor.pk is None for anchor in batch_anchors):
+                    raise BulkCreatedPrimaryKeysNotReturnedError(
+                        "The database must return the primary keys of "
+                        "bulk created anchors to create their attributes."
+                    )
+
+                for related_name, attribute_class in attribute_classes.items():
+                    value_field = attribute_class._meta.get_field("value")
+                    attribute_objs = []
+                    for anchor, row in zip(batch_anchors, batch):
+                        if related_name not in row:
+                            continue
+                        value = row[related_name]
+                        # For ForeignKey, a pk can be given instead of an instance
+                        value_name = (
+                            value_field.attname
+                            if value_field.is_relation
+                            and not isinstance(value, models.Model)
+                            else value_field.name
+                        )
+                        attribute_objs.append(
+                            attribute_class(anchor=anchor, **{value_name: value})
+                        )
+
+                    if attribute_objs:
+                        attribute_class.objects.using(self.db).bulk_create(
+                            attribute_objs,
+                            batch_size=batch_size,
+                            transaction=transaction,
+                        )
+
+                anchors.extend(batch_anchors)
+
+        return anchors
+
+    def as_of(self, transaction: Union[int, "Transaction"]):
+        """
+        the versions of the anchors as of transaction,
+        see `HistorizedQuerySet.as_of` and `HistorizedQuerySet.with_attributes`
+
+        >>> TProduct.objects.as_of(txn).with_attributes("name", "seller")
+        """
+        historized_model = get_historized_model_for(self.model)
+        if historized_model is None:
+            raise ImproperlyConfigured(
+                f"{self.model.__name__} must be historized to query as of a transaction"
+            )
+        return historized_model.objects.db_manager(self.db).as_of(transaction)
+
+    async def abulk_create_with_attributes(
+        self,
+        rows: List[dict],
+        transaction: Union[int, "Transaction"] = None,
+        batch_size=1000,
+    ):
+        return await sync_to_async(self.bulk_create_with_attributes)(
+            rows, transaction=transaction, batch_size=batch_size
+        )
+
 
 class TransactionBackedQuerySet(models.QuerySet):
     def required_transaction_check(self, transaction: Union[int, "Transaction"] = None):
@@ -629,6 +982,12 @@ class TransactionBackedQuerySet(models.QuerySet):
         return transaction_id
 
     def update(self, *args, transaction: Union[int, "Transaction"] = None, **kwargs):
+        """
+        update the active records and historize them set-based
+
+        the open versions are closed and the new versions are inserted
+        with one statement each, so no row passes through Python
+        """
         transaction_id = self.required_transaction_check(transaction)
 
         if self.filter(transaction_id=transaction_id).exists():
@@ -636,98 +995,52 @@ class TransactionBackedQuerySet(models.QuerySet):
                 "New Transaction must be provided for update."
             )
 
-        # Step 1: Get the corresponding historized model
-        historized_model = get_historized_model_for(self.model)
-        historized_records_queryset = None
-
-        if historized_model:
-            # Step 2: Extract primary keys and existing transaction_ids from the active records
-            if active_record_data := self.values_list("pk", "transaction_id"):
-                # Step 3: Get the corresponding historized records
-                historized_records_queryset = historized_model.objects.filter(
-                    original__in=[record[0] for record in active_record_data],
-                    on_txn__in=[record[1] for record in active_record_data],
-                    off_txn=Transaction.get_sentinel(),
+        historized_model = get_historized_model_to_write_for(self.model)
+
+        with db_transaction.atomic(using=self.db):
+            # Step 1: close the open versions BEFORE the update
+            # as the update may change the values the filters depend on
+            if historized_model is not None:
+                close_open_historized_versions(
+                    historized_model,
+                    self.values("pk"),
+                    transaction_id,
+                    using=self.db,
                 )
 
-        with db_transaction.atomic():
-            # Perform the update regardless if historized_model or historized_records is None
+            # Step 2: perform the update regardless if historized_model is None
             kwargs["transaction_id"] = transaction_id
-            super(TransactionBackedQuerySet, self).update(*args, **kwargs)
-
-            # Step 4: Update the historized records
-            if historized_records_queryset:
-                # Update existing historized records' off_txn to the current transaction
-                historized_records_queryset.update(off_txn_id=transaction_id)
-
-                # Fetch the updated active records
-                updated_active_records = self.values()
-
-                # Create a list to hold the new historized instances
-                new_historized_records = []
-
-                for updated_record in updated_active_records:
-                    # updated_record is dict
-                    the_active_pk = updated_record.get(
-                        "pk", updated_record.get("id", updated_record.get("anchor_id"))
-                    )
+            rows = super(TransactionBackedQuerySet, self).update(*args, **kwargs)
 
-                    new_historized_instance = historized_model(
-                        on_txn_id=transaction_id,
-                        off_txn=Transaction.get_sentinel(),
-                        original_id=the_active_pk,
-                    )
-
-                    for field, value in updated_record.items():
-                        if field in [
-                            "transaction_id",
-                            "id",
-                            "pk",
-                            "transaction",
-                        ]:  # Skip transaction_id as we set it explicitly
-                            continue
-
-                        setattr(new_historized_instance, field, value)
-
-                    new_historized_records.append(new_historized_instance)
+            # Step 3: copy the updated active records into the historized table
+            if historized_model is not None:
+                insert_historized_versions_from_active(
+                    historized_model, transaction_id, using=self.db
+                )
 
-                # Perform bulk insertion
-                historized_model.objects.bulk_create(new_historized_records)
+        return rows
 
-    def delete(self, *args, transaction: Union[int, "Transaction"], **kwargs):
+    def delete(
+        self,
+        *args,
+        transaction: Union[int, "Transaction"],
+        chunk_size=1000,
+        **kwargs,
+    ):
+        """
+        delete the records, their attributes and what else refers to them
+        set-based, see `cascade_delete`
+        """
         transaction_id = self.required_transaction_check(transaction)
 
-        # Step 1: Get the corresponding historized model
-        historized_model = get_historized_model_for(self.model)
-        historized_records_queryset = None
-
-        if historized_model:
-            # Step 2: Extract primary keys and existing transaction_ids from the active records
-            if active_record_data := self.values_list("pk", "transaction_id"):
-                all_the_original_pks = [record[0] for record in active_record_data]
-                # Step 3: Get the corresponding historized records
-                historized_records_queryset = historized_model.objects.filter(
-                    original__in=all_the_original_pks,
-                    on_txn__in=[record[1] for record in active_record_data],
-                    off_txn=Transaction.get_sentinel(),
-                )
-
-        with db_transaction.atomic():
-            # Perform the delete regardless if historized_model or historized_records is None
-            super(TransactionBackedQuerySet, self).delete(*args, **kwargs)
-
-            # Step 4: Update the historized records
-            if historized_records_queryset:
-                # Update existing historized records' off_txn to the current transaction
-                historized_records_queryset.update(off_txn_id=transaction_id)
-
-            # Step 5: propagate the delete down to attributes
-            if self.model.is_anchor is True:
-                attribute_classes = self.model.get_attribute_classes()
-                for _, related_class in attribute_classes.items():
-                    related_class.objects.filter(pk__in=all_the_original_pks).delete(
-                        transaction=transaction_id
-                    )
+        return cascade_delete(
+            self.model,
+            self.values_list("pk", flat=True),
+            transaction_id,
+            using=self.db,
+            chunk_size=chunk_size,
+            origin=self,
+        )
 
     def bulk_create(
         self,
@@ -748,18 +1061,25 @@ class TransactionBackedQuerySet(models.QuerySet):
         for obj in objs:
             obj.transaction_id = transaction_id
 
-        super_result = super(TransactionBackedQuerySet, self).bulk_create(
-            objs,
-            batch_size=batch_size,
-            ignore_conflicts=ignore_conflicts,
-            update_conflicts=update_conflicts,
-            update_fields=update_fields,
-            unique_fields=unique_fields,
-        )
+        # the history goes into the same transaction without a savepoint of its own
+        with db_transaction.atomic(using=self.db, savepoint=False):
+            super_result = super(TransactionBackedQuerySet, self).bulk_create(
+                objs,
+                batch_size=batch_size,
+                ignore_conflicts=ignore_conflicts,
+                update_conflicts=update_conflicts,
+                update_fields=update_fields,
+                unique_fields=unique_fields,
+            )
 
-        if super_result is not None:
-            # Now handle the historizing
-            update_historized_on_bulk_create(super_result, transaction=transaction)
+            if super_result is not None:
+                # Now handle the historizing
+                update_historized_on_bulk_create(
+                    super_result,
+                    transaction=transaction,
+                    batch_size=batch_size,
+                    using=self.db,
+                )
 
         return super_result
 
@@ -773,6 +1093,8 @@ class TransactionBackedQuerySet(models.QuerySet):
         """
         the logic is exactly the same as bulk_create
         except it also checks that the transaction_id is not repeated in existing objects
+
+        the versions are historized set-based, the same as `update`
         """
         transaction_id = self.required_transaction_check(transaction)
 
@@ -786,11 +1108,88 @@ class TransactionBackedQuerySet(models.QuerySet):
         for obj in objs:
             obj.transaction_id = transaction_id
 
-        return super(TransactionBackedQuerySet, self).bulk_update(
-            objs, fields + ["transaction_id"], batch_size=batch_size
+        historized_model = get_historized_model_to_write_for(self.model)
+
+        with db_transaction.atomic(using=self.db):
+            if historized_model is not None:
+                close_open_historized_versions(
+                    historized_model, obj_ids, transaction_id, using=self.db
+                )
+
+            # a plain queryset, as the stock bulk_update goes through `update`
+            # which here would historize a second time and needs a transaction
+            rows = models.QuerySet(model=self.model, using=self.db).bulk_update(
+                objs, fields + ["transaction_id"], batch_size=batch_size
+            )
+
+            if historized_model is not None:
+                insert_historized_versions_from_active(
+                    historized_model, transaction_id, using=self.db
+                )
+
+        return rows
+
+    # Django's own async methods call the sync ones without the transaction,
+    # and a database transaction cannot span thread hops, so each of these is
+    # the sync method with its history writes in one hop
+
+    async def adelete(
+        self, *args, transaction: Union[int, "Transaction"], chunk_size=1000, **kwargs
+    ):
+        return await sync_to_async(self.delete)(
+            *args, transaction=transaction, chunk_size=chunk_size, **kwargs
+        )
+
+    async def abulk_create(
+        self, objs, *args, transaction: Union[int, "Transaction"] = None, **kwargs
+    ):
+        return await sync_to_async(self.bulk_create)(
+            objs, *args, transaction=transaction, **kwargs
+        )
+
+    async def abulk_update(
+        self,
+        objs,
+        fields,
+        batch_size=None,
+        transaction: Union[int, "Transaction"] = None,
+    ):
+        return await sync_to_async(self.bulk_update)(
+            objs, fields, batch_size=batch_size, transaction=transaction
         )
 
 
+class TransactionBackedAnchorQuerySet(TransactionBackedQuerySet):
+    def with_attributes(self, *related_names):
+        """
+        Only meant for Anchor class
+
+        select the attributes with the anchors in the same query,
+        as in LEFT JOINs on the attribute tables (see `get_attribute_classes`),
+        so that reading anchor.name etc. does not query again.
+        All attributes without names.
+
+        The value of an attribute that is a relation is joined as well,
+        so reading anchor.seller.value does not query either.
+
+        An anchor without the attribute raises `RelatedObjectDoesNotExist`
+        on access, the same as without this, but without a query.
+        """
+        attribute_classes = self.model.get_attribute_classes()
+        for related_name in related_names:
+            if related_name not in attribute_classes:
+                raise ValueError(
+                    f"'{related_name}' is not an attribute of {self.model.__name__}"
+                )
+
+        lookups = []
+        for related_name in related_names or attribute_classes:
+            lookups.append(related_name)
+            if attribute_classes[related_name]._meta.get_field("value").is_relation:
+                lookups.append(f"{related_name}__value")
+        return self.select_related(*lookups)
+
+
 def get_historized_model_for(model_or_instance):
     # Identify the target model class
     if isinstance(model_or_instance, type):
@@ -829,72 +1228,177 @@ def get_historized_model_for(model_or_instance):
     # return historized_model
 
 
-@db_transaction.atomic
+def get_historized_field_names(historized_model):
+    """
+    the names of the fields `create_historized_model` copied over
+    from the active model, i.e. everything except the bookkeeping fields
+    """
+    bookkeeping_field_names = (
+        historized_model._meta.pk.name,
+        "original",
+        "on_txn",
+        "off_txn",
+    )
+    return [
+        field.name
+        for field in historized_model._meta.concrete_fields
+        if field.name not in bookkeeping_field_names
+    ]
+
+
+def get_historized_model_to_write_for(model_or_instance):
+    """
+    the historized model whose versions are written from Python,
+    None when not historized or when the database triggers write them
+    """
+    if isinstance(model_or_instance, type):
+        target_model_class = model_or_instance
+    else:
+        target_model_class = model_or_instance.__class__
+
+    if getattr(target_model_class, "historization_engine", "python") == "trigger":
+        return None
+
+    return get_historized_model_for(target_model_class)
+
+
+def close_open_historized_versions(
+    historized_model, original_pks, transaction_id, using=None
+):
+    """
+    set off_txn of the open versions of original_pks to transaction_id
+    in a single UPDATE
+
+    original_pks can be a list or a queryset of pks, the latter becomes a subquery
+    returns the number of versions closed
+    """
+    return (
+        historized_model._base_manager.using(using)
+        .filter(original_id__in=original_pks, off_txn_id=SENTINEL_NULL_TRANSACTION_ID)
+        .update(off_txn_id=transaction_id)
+    )
+
+
+def insert_historized_versions_from_active(
+    historized_model, transaction_id, using=None
+):
+    """
+    INSERT INTO historized ... SELECT ... FROM active in a single statement
+
+    the active records copied are the ones whose open version was closed by
+    transaction_id but which have no version opened by transaction_id yet.
+    i.e. use it right after `close_open_historized_versions` and the update
+
+    returns the number of versions inserted
+    """
+    using = using or router.db_for_write(historized_model)
+    connection = connections[using]
+    active_model = historized_model._meta.get_field("original").related_model
+
+    closed_by_transaction = historized_model._base_manager.filter(
+        off_txn_id=transaction_id
+    ).values("original_id")
+    opened_by_transaction = historized_model._base_manager.filter(
+        on_txn_id=transaction_id
+    ).values("original_id")
+
+    # keyed by the historized field name, in the order of the INSERT columns
+    selected = {
+        "original": models.F("pk"),
+        "on_txn": models.Value(transaction_id),
+        "off_txn": models.Value(SENTINEL_NULL_TRANSACTION_ID),
+        **{
+            field_name: models.F(field_name)
+            for field_name in get_historized_field_names(historized_model)
+        },
+    }
+    # annotations cannot share names with the fields of the active model
+    aliases = {
+        f"historized_{name}": expression for name, expression in selected.items()
+    }
+
+    select_queryset = (
+        active_model._base_manager.using(using)
+        .filter(transaction_id=transaction_id, pk__in=closed_by_transaction)
+        .exclude(pk__in=opened_by_transaction)
+        .annotate(**aliases)
+        .values_list(*aliases)
+    )
+    select_sql, params = select_queryset.query.get_compiler(using).as_sql()
+
+    quote_name = connection.ops.quote_name
+    columns = ", ".join(
+        quote_name(historized_model._meta.get_field(name).column) for name in selected
+    )
+    sql = (
+        f"INSERT INTO {quote_name(historized_model._meta.db_table)} ({columns}) "
+        f"{select_sql}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def build_historized_instance(historized_model, instance, transaction_id):
+    """
+    build, but do not save, the open version of instance opened by transaction_id
+
+    fields are copied by attname so that no related object is ever loaded
+    """
+    historized_instance = historized_model(
+        on_txn_id=transaction_id,
+        off_txn_id=SENTINEL_NULL_TRANSACTION_ID,
+        original_id=instance.pk,
+    )
+
+    for field_name in get_historized_field_names(historized_model):
+        attname = historized_model._meta.get_field(field_name).attname
+        setattr(historized_instance, attname, getattr(instance, attname))
+
+    return historized_instance
+
+
 def update_historized_on_save(instance, sender=None, *args, **kwargs):
     sender = sender or instance.__class__  # Infer sender from instance if not provided
     # Get the corresponding historized model
-    historized_model = get_historized_model_for(sender)
+    historized_model = get_historized_model_to_write_for(sender)
 
     if historized_model is not None:
-        # Update existing historized records with the latest transaction
-        historized_model.objects.filter(
-            original=instance, off_txn=Transaction.get_sentinel()
-        ).update(off_txn=instance.transaction)
-
-        # Create a new historized instance
-        historized_instance = historized_model(
-            on_txn=instance.transaction, original=instance
-        )
-
-        # Copy fields from the original instance to the historized instance
-        for field in sender._meta.fields:
-            if field.name not in [
-                "id",
-                "transaction",
-            ]:  # Exclude id and transaction fields
-                setattr(historized_instance, field.name, getattr(instance, field.name))
+        with db_transaction.atomic():
+            # Update existing historized records with the latest transaction
+            close_open_historized_versions(
+                historized_model, [instance.pk], instance.transaction_id
+            )
 
-        # Save the new historized instance
-        historized_instance.save()
+            # Create and save the new historized instance
+            build_historized_instance(
+                historized_model, instance, instance.transaction_id
+            ).save()
 
 
-@db_transaction.atomic
-def update_historized_on_bulk_create(objs, transaction=None):
+def update_historized_on_bulk_create(
+    objs, transaction=None, batch_size=None, using=None
+):
     if not objs:
         return
 
     sender = objs[0].__class__
-    historized_model = get_historized_model_for(sender)
+    historized_model = get_historized_model_to_write_for(sender)
     if historized_model is None:
         return
 
-    new_historized_records = []
-    for obj in objs:
-        # updated_record is dict
-        the_active_pk = obj.pk
-        # Create a new historized instance
-        new_historized_instance = historized_model(
-            on_txn_id=transaction.id,
-            off_txn=Transaction.get_sentinel(),
-            original_id=the_active_pk,
-        )
-
-        # Copy fields from the original instance
-        for field in obj._meta.fields:
-            if field.name in [
-                "transaction_id",
-                "id",
-                "pk",
-                "transaction",
-            ]:  # Skip transaction_id as we set it explicitly
-                continue
-
-            setattr(new_historized_instance, field.name, getattr(obj, field.name))
-
-        new_historized_records.append(new_historized_instance)
+    transaction_id = (
+        transaction.id if isinstance(transaction, models.Model) else transaction
+    )
 
     # Bulk create historized instances
-    historized_model.objects.bulk_create(new_historized_records)
+    historized_model.objects.using(using).bulk_create(
+        [
+            build_historized_instance(historized_model, obj, transaction_id)
+            for obj in objs
+        ],
+        batch_size=batch_size,
+    )
 
 
 @db_transaction.atomic
@@ -909,10 +1413,226 @@ def update_historized_on_delete(
     historized_model = get_historized_model_for(sender)
 
     if historized_model is not None:
+        transaction_id = (
+            transaction.id if isinstance(transaction, models.Model) else transaction
+        )
         # Update existing historized records with the latest transaction
-        historized_model.objects.filter(
-            original_id=pk, off_txn=Transaction.get_sentinel()
-        ).update(off_txn=transaction)
+        close_open_historized_versions(historized_model, [pk], transaction_id)
+
+
+# the on_delete of a foreign key that does not set a value, see get_on_delete_value
+_NOT_SET = object()
+
+
+def get_on_delete_value(field):
+    """
+    the value a SET_NULL, SET_DEFAULT or SET() foreign key is set to
+    when the row it refers to is deleted, _NOT_SET for another on_delete
+    """
+    on_delete = field.remote_field.on_delete
+    if on_delete is models.SET_NULL:
+        return None
+    if on_delete is models.SET_DEFAULT:
+        return field.get_default()
+    if hasattr(on_delete, "deconstruct"):
+        path, args, _ = on_delete.deconstruct()
+        if path == "django.db.models.SET":
+            return args[0]() if callable(args[0]) else args[0]
+    return _NOT_SET
+
+
+def plan_cascade_delete(model, pks, using=None, collector=None, updates=None):
+    """
+    work out once the rows a delete of model rows with pks takes along
+
+    - the attributes of the deleted rows
+    - the FK-valued attributes pointing at the deleted rows, and the whole tie
+      when such an attribute belongs to a `TransactionBackedTie`.
+      Attributes are declared with on_delete=DO_NOTHING, so DO_NOTHING is taken
+      the same as CASCADE for them
+    - the TransactionBacked rows with an on_delete=CASCADE foreign key to them
+
+    Referring rows of a PROTECT or RESTRICT foreign key raise ProtectedError.
+    The TransactionBacked rows with a SET_NULL, SET_DEFAULT or SET() foreign key
+    are appended to updates as (model, field, value, pks), to be updated with
+    their history. The other TransactionBacked relations are left alone,
+    the same as on_delete=DO_NOTHING, and so are the historized versions.
+
+    Every other relation (from models that are not TransactionBacked,
+    many to many through rows, generic relations) is handed to collector,
+    a Django `Collector`, with the on_delete of its field, as `Model.delete` does.
+
+    Only the rows that are referred to by other rows are looked up,
+    one query per relation for all the pks.
+
+    Returns:
+        list: of (model, pks), in the order to delete them in
+    """
+    using = using or router.db_for_write(model)
+    collector = collector if collector is not None else Collector(using=using)
+    updates = updates if updates is not None else []
+    collected = {}
+
+    def referring(related_model, field, pks):
+        return related_model._base_manager.using(using).filter(
+            **{f"{field.name}__in": pks}
+        )
+
+    def collect(model, pks):
+        new_pks = set(pks) - collected.setdefault(model, set())
+        if not new_pks:
+            return
+        collected[model] |= new_pks
+
+        for relation in get_candidate_relations_to_delete(model._meta):
+            related_model = relation.related_model
+            field = relation.field
+            on_delete = field.remote_field.on_delete
+            is_attribute = getattr(related_model, "is_attribute", False)
+            if issubclass(related_model, Historized):
+                continue
+
+            if is_attribute and field.primary_key:
+                # the attributes of the rows, keyed by the same pk
+                collect(related_model, new_pks)
+            elif on_delete in (models.PROTECT, models.RESTRICT):
+                protected = referring(related_model, field, new_pks)
+                if protected.exists():
+                    raise models.ProtectedError(
+                        f"Cannot delete some {model.__name__} because they are "
+                        f"referenced through the protected foreign key "
+                        f"{related_model.__name__}.{field.name}",
+                        set(protected),
+                    )
+            elif is_attribute and on_delete in (models.CASCADE, models.DO_NOTHING):
+                # FK-valued attributes pointing at the rows
+                owner_pks = list(
+                    referring(related_model, field, new_pks).values_list(
+                        "pk", flat=True
+                    )
+                )
+                owner_model = related_model._meta.pk.related_model
+                if owner_model is not None and issubclass(
+                    owner_model, TransactionBackedTie
+                ):
+                    collect(owner_model, owner_pks)
+                else:
+                    collect(related_model, owner_pks)
+            elif issubclass(related_model, TransactionBackedModel):
+                if on_delete is models.CASCADE:
+                    collect(
+                        related_model,
+                        referring(related_model, field, new_pks).values_list(
+                            "pk", flat=True
+                        ),
+                    )
+                elif (value := get_on_delete_value(field)) is not _NOT_SET:
+                    update_pks = list(
+                        referring(related_model, field, new_pks).values_list(
+                            "pk", flat=True
+                        )
+                    )
+                    if update_pks:
+                        updates.append((related_model, field, value, update_pks))
+            elif on_delete is not models.DO_NOTHING:
+                sub_objs = referring(related_model, field, new_pks)
+                if getattr(on_delete, "lazy_sub_objs", False) or sub_objs:
+                    on_delete(collector, field, sub_objs, using)
+
+        for field in model._meta.private_fields:
+            if hasattr(field, "bulk_related_objects"):
+                # GenericRelation, only the pks of the objects are read
+                collector.collect(
+                    field.bulk_related_objects([model(pk=pk) for pk in new_pks], using),
+                    source=model,
+                    nullable=True,
+                    fail_on_restricted=False,
+                )
+
+    collect(model, pks)
+
+    # the referring rows were collected after the rows they refer to
+    return [(model, pks) for model, pks in reversed(collected.items()) if pks]
+
+
+def has_delete_receivers(model):
+    return signals.pre_delete.has_listeners(model) or signals.post_delete.has_listeners(
+        model
+    )
+
+
+def cascade_delete(
+    model, pks, transaction_id, using=None, chunk_size=1000, origin=None
+):
+    """
+    delete model rows with pks and what they take along, see `plan_cascade_delete`
+
+    One history-close UPDATE and one DELETE per table per chunk of pks,
+    all inside a single atomic block. The open versions are closed before the
+    rows are deleted, as the delete trigger of the trigger engine cannot know
+    the deleting transaction.
+
+    The rows of the relations handed to a `Collector` are deleted or updated
+    first, with their signals. pre_delete and post_delete are sent for the
+    planned rows too, with origin, but only for the models that have
+    receivers: their rows are then loaded, a chunk at a time.
+
+    Returns:
+        tuple: (the number of deleted rows, the number per model label)
+        the same as `QuerySet.delete`
+    """
+    using = using or router.db_for_write(model)
+    collector = Collector(using=using, origin=origin)
+    updates = []
+    deleted_counter = {}
+
+    with db_transaction.atomic(using=using):
+        plan = plan_cascade_delete(
+            model, pks, using, collector=collector, updates=updates
+        )
+
+        for model_to_update, field, value, pks_to_update in updates:
+            for start in range(0, len(pks_to_update), chunk_size):
+                TransactionBackedQuerySet(model_to_update, using=using).filter(
+                    pk__in=pks_to_update[start : start + chunk_size]
+                ).update(**{field.name: value}, transaction=transaction_id)
+
+        if collector.data or collector.fast_deletes or collector.field_updates:
+            _, collected_counter = collector.delete()
+            deleted_counter.update(collected_counter)
+
+        for model_to_delete, pks_to_delete in plan:
+            historized_model = get_historized_model_for(model_to_delete)
+            send_signals = has_delete_receivers(model_to_delete)
+            manager = model_to_delete._base_manager.using(using)
+            pks_to_delete = sorted(pks_to_delete)
+            deleted = 0
+            for start in range(0, len(pks_to_delete), chunk_size):
+                chunk = pks_to_delete[start : start + chunk_size]
+                instances = list(manager.filter(pk__in=chunk)) if send_signals else []
+                for instance in instances:
+                    signals.pre_delete.send(
+                        sender=model_to_delete,
+                        instance=instance,
+                        using=using,
+                        origin=origin,
+                    )
+                if historized_model is not None:
+                    close_open_historized_versions(
+                        historized_model, chunk, transaction_id, using=using
+                    )
+                deleted += manager.filter(pk__in=chunk)._raw_delete(using)
+                for instance in instances:
+                    signals.post_delete.send(
+                        sender=model_to_delete,
+                        instance=instance,
+                        using=using,
+                        origin=origin,
+                    )
+            label = model_to_delete._meta.label
+            deleted_counter[label] = deleted_counter.get(label, 0) + deleted
+
+    return sum(deleted_counter.values()), deleted_counter
 
 
 class TransactionBackedModel(models.Model):
@@ -927,47 +1647,116 @@ class TransactionBackedModel(models.Model):
     is_anchor = None
     is_attribute = None
 
+    # set by `historize_model`, see HISTORIZATION_ENGINES
+    historization_engine = "python"
+
     class Meta:
         abstract = True
 
     def save(self, *args, transaction: Union[int, "Transaction"] = None, **kwargs):
+        """
+        a bare transaction id is accepted as is, without loading the Transaction.
+
+        A record with a pk is probed once for its transaction_id, so that
+        reusing its transaction raises before anything is written, and the
+        probe tells Django to update or to insert without trying the other
+
+        Inside a `transaction_scope` the save is buffered, see `scope`
+        """
+        scope = get_current_transaction_scope()
+        if (
+            scope is not None
+            and not args
+            and kwargs.get("update_fields") is None
+            and set(kwargs) <= {"force_insert", "using", "update_fields"}
+            and scope.accepts(self, transaction, kwargs.get("using"))
+        ):
+            scope.add_save(self)
+            return
+
         if transaction:
-            if isinstance(transaction, int):
-                try:
-                    transaction = Transaction.objects.get(pk=transaction)
-                except Transaction.DoesNotExist as e:
-                    raise Transaction.DoesNotExist from e
-            self.transaction = transaction
+            self.set_transaction(transaction)
 
-        self.check_transaction()
+        self.required_transaction_check(self.transaction_id)
+        if self.pk is not None and not kwargs.get("force_insert"):
+            using = kwargs.get("using") or router.db_for_write(
+                self.__class__, instance=self
+            )
+            existing_transaction_ids = list(
+                type(self)
+                ._base_manager.using(using)
+                .filter(pk=self.pk)
+                .values_list("transaction_id", flat=True)
+            )
+            if self.transaction_id in existing_transaction_ids:
+                raise CannotReuseExistingTransactionError(
+                    "New Transaction ID must be provided for updates or deletes."
+                )
+            if (
+                not args
+                and not kwargs.get("force_update")
+                and kwargs.get("update_fields") is None
+            ):
+                if existing_transaction_ids:
+                    kwargs["force_update"] = True
+                else:
+                    kwargs["force_insert"] = True
         super(TransactionBackedModel, self).save(*args, **kwargs)
         update_historized_on_save(self)
 
     def delete(self, *args, transaction: Union[int, "Transaction"] = None, **kwargs):
         """
         override typical model.delete method
+
+        Inside a `transaction_scope` the delete is buffered, see `scope`
         """
+        scope = get_current_transaction_scope()
+        if (
+            scope is not None
+            and not args
+            and set(kwargs) <= {"using"}
+            and scope.accepts(self, transaction, kwargs.get("using"))
+        ):
+            scope.add_delete(self)
+            return 0, {}
+
         if transaction:
-            if isinstance(transaction, int):
-                try:
-                    transaction = Transaction.objects.get(pk=transaction)
-                except Transaction.DoesNotExist as e:
-                    raise Transaction.DoesNotExist from e
-            self.transaction = transaction
+            self.set_transaction(transaction)
 
         self.check_transaction()
-        pk_before_delete = self.pk
-        transaction_before_delete = self.transaction
-        super(TransactionBackedModel, self).delete(*args, **kwargs)
-        update_historized_on_delete(
-            sender=self.__class__,
-            pk=pk_before_delete,
-            transaction=transaction_before_delete,
+        using = kwargs.get("using") or router.db_for_write(
+            self.__class__, instance=self
         )
-        if self.is_anchor is True and hasattr(
-            self, "delete_attributes_on_anchor_delete"
-        ):
-            self.delete_attributes_on_anchor_delete(pk=pk_before_delete)
+        result = cascade_delete(
+            self.__class__, [self.pk], self.transaction_id, using=using, origin=self
+        )
+        # the same as Model.delete
+        setattr(self, self._meta.pk.attname, None)
+        return result
+
+    async def asave(
+        self, *args, transaction: Union[int, "Transaction"] = None, **kwargs
+    ):
+        """
+        `save` with its history write in one thread hop, the same as Django's asave
+        """
+        return await sync_to_async(self.save)(*args, transaction=transaction, **kwargs)
+
+    async def adelete(
+        self, *args, transaction: Union[int, "Transaction"] = None, **kwargs
+    ):
+        return await sync_to_async(self.delete)(
+            *args, transaction=transaction, **kwargs
+        )
+
+    def set_transaction(self, transaction: Union[int, "Transaction"]):
+        """
+        set either the Transaction instance or the bare transaction id
+        """
+        if isinstance(transaction, models.Model):
+            self.transaction = transaction
+        else:
+            self.transaction_id = transaction
 
     @staticmethod
     def shared_required_transaction_check(transaction):
@@ -991,34 +1780,25 @@ class TransactionBackedModel(models.Model):
         ensure that a valid transaction is set
         """
         if transaction is None:
-            transaction = getattr(
-                self, "transaction", getattr(self, "transaction_id", None)
-            )
+            transaction = getattr(self, "transaction_id", None)
 
         self.shared_required_transaction_check(transaction)
 
-    def check_transaction(self):
-        self.required_transaction_check(self.transaction)
-        if self.pk:  # Check if this is an update and not a new object
-            model_class = type(self)
-            try:
-                original = model_class.objects.get(pk=self.pk)
-            except model_class.DoesNotExist:
-                # most probably an Attribute created for first time because of
-                # the OneToOneField as pk
-                return
-
-            # Priority for checking the transaction object
-            if self.transaction and self.transaction == original.transaction:
-                raise CannotReuseExistingTransactionError(
-                    "New Transaction must be provided for updates or deletes."
-                )
+    def is_transaction_reused(self, queryset=None, pk=None):
+        """
+        single probe for the existing record having the same transaction_id
+        """
+        queryset = type(self)._base_manager if queryset is None else queryset
+        pk = self.pk if pk is None else pk
+        return queryset.filter(pk=pk, transaction_id=self.transaction_id).exists()
 
-            # Fallback to checking the transaction_id if transaction object is not available
-            elif self.transaction_id and self.transaction_id == original.transaction_id:
-                raise CannotReuseExistingTransactionError(
-                    "New Transaction ID must be provided for updates or deletes."
-                )
+    def check_transaction(self):
+        self.required_transaction_check(self.transaction_id)
+        # Check if this is an update and not a new object
+        if self.pk and self.is_transaction_reused():
+            raise CannotReuseExistingTransactionError(
+                "New Transaction ID must be provided for updates or deletes."
+            )
 
 
 class TieManager(TransactionBackedManager):
@@ -1183,6 +1963,24 @@ def create_historized_model(original_model):
     additional_attrs = {}
     additional_meta = {"abstract": False}
 
+    # history is looked up by original and open version on every write,
+    # and ranged over on_txn/off_txn by as-of reads
+    if config.historized_indexes():
+        additional_meta["indexes"] = [
+            models.Index(fields=["original", "off_txn"]),
+            models.Index(fields=["on_txn", "off_txn"]),
+        ]
+    if config.historized_unique_open_version():
+        additional_meta["constraints"] = [
+            models.UniqueConstraint(
+                fields=["original"],
+                condition=models.Q(off_txn=SENTINEL_NULL_TRANSACTION_ID),
+                name=truncate_identifier(
+                    f"{app_label}_{model_name.lower()}_one_open_version"
+                ),
+            )
+        ]
+
     # Create a new ForeignKey field that relates to the original model
     # will neer be deleted
     original_foreign_key = models.ForeignKey(
@@ -1233,6 +2031,116 @@ def create_historized_model(original_model):
 from django.db import models
 
 
+class HistorizedQuerySet(models.QuerySet):
+    """
+    the versions of a historized model, see `as_of` and `with_attributes`
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._as_of_transaction_id = None
+        self._with_attribute_names = None
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._as_of_transaction_id = self._as_of_transaction_id
+        clone._with_attribute_names = self._with_attribute_names
+        return clone
+
+    def as_of(self, transaction: Union[int, "Transaction"]):
+        """
+        the versions that were open at transaction
+        as in on_txn <= transaction < off_txn where the sentinel means still open
+        """
+        transaction_id = (
+            transaction.id if isinstance(transaction, models.Model) else transaction
+        )
+        clone = self.filter(
+            models.Q(off_txn_id=SENTINEL_NULL_TRANSACTION_ID)
+            | models.Q(off_txn_id__gt=transaction_id),
+            on_txn_id__lte=transaction_id,
+        )
+        clone._as_of_transaction_id = transaction_id
+        return clone
+
+    def open_versions(self):
+        return self.filter(off_txn_id=SENTINEL_NULL_TRANSACTION_ID)
+
+    def with_attributes(self, *related_names):
+        """
+        Only meant for the historized model of an Anchor class
+
+        attach the attribute versions, as of the same transaction as `as_of`
+        or the open ones without it, to each anchor version under the related_name
+        of the attribute, None when the anchor had no such attribute then.
+
+        One query per attribute table, on the versions of the anchors in this
+        queryset, rather than a lookup per anchor. All attributes without names.
+        """
+        attribute_classes = self.model.original_model.get_attribute_classes()
+        for related_name in related_names:
+            if related_name not in attribute_classes:
+                raise ValueError(
+                    f"'{related_name}' is not an attribute of "
+                    f"{self.model.original_model.__name__}"
+                )
+
+        clone = self._chain()
+        clone._with_attribute_names = related_names or tuple(attribute_classes)
+        return clone
+
+    def _fetch_all(self):
+        attach = self._result_cache is None
+        super()._fetch_all()
+        if (
+            attach
+            and self._with_attribute_names
+            and issubclass(self._iterable_class, models.query.ModelIterable)
+        ):
+            self._attach_attributes()
+
+    def _attach_attributes(self):
+        attribute_classes = self.model.original_model.get_attribute_classes()
+        anchor_versions = self
+        if not self.query.is_sliced:
+            anchor_versions = anchor_versions.order_by()
+        anchor_pks = anchor_versions.values("original_id")
+
+        for related_name in self._with_attribute_names:
+            historized_attribute = get_historized_model_for(
+                attribute_classes[related_name]
+            )
+            versions = historized_attribute.objects.using(self.db)
+            if self._as_of_transaction_id is None:
+                versions = versions.open_versions()
+            else:
+                versions = versions.as_of(self._as_of_transaction_id)
+            versions_by_anchor = {
+                version.original_id: version
+                for version in versions.filter(original_id__in=anchor_pks)
+            }
+            for anchor_version in self._result_cache:
+                setattr(
+                    anchor_version,
+                    related_name,
+                    versions_by_anchor.get(anchor_version.original_id),
+                )
+
+
+class HistorizedManager(models.Manager):
+    def get_queryset(self):
+        return HistorizedQuerySet(self.model, using=self._db)
+
+    def as_of(self, transaction: Union[int, "Transaction"]):
+        return self.get_queryset().as_of(transaction)
+
+    def open_versions(self):
+        return self.get_queryset().open_versions()
+
+    def with_attributes(self, *related_names):
+        return self.get_queryset().with_attributes(*related_names)
+
+
 class Historized(models.Model):
     # Your fields here
     on_txn = models.ForeignKey(
@@ -1252,6 +2160,8 @@ class Historized(models.Model):
         related_query_name="that_deactivated_%(app_label)s_%(class)ss",
     )
 
+    objects = HistorizedManager()
+
     class Meta:
         abstract = True
 
@@ -1296,12 +2206,25 @@ class Historized(models.Model):
         # apps.register_model(app_label, new_model)
 
 
-def historize_model(*args, **kwargs):
+HISTORIZATION_ENGINES = ("python", "trigger")
+
+
+def historize_model(*args, engine="python", **kwargs):
     """
     decorator applied to Django model class to historize it
     as in create another Django model class with `Historized` prepended to the
     same class name and have it inherit the Historized abstract class
+
+    engine is either
+    - "python": the versions are written by the model and queryset methods
+    - "trigger": the versions are written by database triggers, so that raw SQL
+      writes are historized too. Install them with the
+      `operations.InstallHistorizationTriggers` migration operation.
     """
+    if engine not in HISTORIZATION_ENGINES:
+        raise ValueError(
+            f"engine must be one of {', '.join(HISTORIZATION_ENGINES)}, not {engine}"
+        )
 
     def _model_wrapper(model_class):
         """
@@ -1314,6 +2237,7 @@ def historize_model(*args, **kwargs):
         model_class.historized_model_name = (
             f"{historized_model._meta.app_label}.{historized_model.__name__}"
         )
+        model_class.historization_engine = engine
 
         return model_class
 
@@ -1325,6 +2249,8 @@ class TransactionBackedAnchorNoBusinessId(TransactionBackedModel):
     is_anchor = True
     is_attribute = False
 
+    objects = TransactionBackedAnchorManager()
+
     class Meta:
         abstract = True
 
@@ -1350,9 +2276,12 @@ class TransactionBackedAnchorNoBusinessId(TransactionBackedModel):
 
         return related_classes
 
-    def get_attributes(self, pk):
+    def get_attributes(self, pk=None):
         """
         Only meant for Anchor class
+
+        the attributes of the anchor with pk, keyed by related_name,
+        read in one query with `with_attributes`
         """
         if self.is_anchor is not True:
             return {}
@@ -1360,22 +2289,18 @@ class TransactionBackedAnchorNoBusinessId(TransactionBackedModel):
         if not pk:
             pk = self.pk
 
+        anchor = type(self).objects.with_attributes().filter(pk=pk).first()
+        if anchor is None:
+            return {}
+
         related_instances = {}
-        for relation in type(self)._meta.get_fields():
-            if (
-                isinstance(relation, models.OneToOneRel)
-                and relation.remote_field.primary_key
-                and getattr(relation.remote_field.related_model, "is_attribute", False)
-            ):
-                related_model = relation.related_model
-                related_name = (
-                    relation.get_accessor_name()
-                )  # Use the accessor name (related_name or default)
-                try:
-                    related_instance = related_model.objects.get(anchor_id=pk)
-                    related_instances[related_name] = related_instance
-                except related_model.DoesNotExist:
-                    continue
+        for related_name in type(self).get_attribute_classes():
+            try:
+                related_instances[related_name] = getattr(anchor, related_name)
+            except ObjectDoesNotExist:
+                continue
+
+        return related_instances
 
     @icontract.require(lambda pk: pk is not None, "pk must not be None")
     def delete_attributes_on_anchor_delete(self, pk=None):
@@ -1383,7 +2308,7 @@ class TransactionBackedAnchorNoBusinessId(TransactionBackedModel):
             raise NotAnAnchorError("This method is not allowed if not an Anchor class")
         attributes = self.get_attributes(pk)
         for _, related_instance in attributes.items():
-            related_instance.delete(transaction=self.transaction)
+            related_instance.delete(transaction=self.transaction_id)
 
 
 class TransactionBackedAnchorWithBusinessId(TransactionBackedAnchorNoBusinessId):
@@ -1393,8 +2318,79 @@ class TransactionBackedAnchorWithBusinessId(TransactionBackedAnchorNoBusinessId)
         abstract = True
 
 
+# (model, database alias) -> {pk: knot}, per process, see KnotManager.cached_all
+_knot_cache = {}
+# bumped by every clear, so rows read before a clear are not cached after it
+_knot_cache_generation = 0
+_knot_cache_lock = threading.Lock()
+
+
+def clear_knot_cache(model=None):
+    """
+    drop the cached rows of the Knot model, or of every Knot model
+    """
+    global _knot_cache_generation
+
+    with _knot_cache_lock:
+        _knot_cache_generation += 1
+        if model is None:
+            _knot_cache.clear()
+            return
+        for key in [key for key in _knot_cache if key[0] is model]:
+            del _knot_cache[key]
+
+
 class KnotManager(models.Manager):
+    def _get_cached_rows(self):
+        key = (self.model, self.db)
+        with _knot_cache_lock:
+            rows = _knot_cache.get(key)
+            generation = _knot_cache_generation
+        if rows is None:
+            rows = {knot.pk: knot for knot in self.get_queryset()}
+            with _knot_cache_lock:
+                if generation == _knot_cache_generation:
+                    rows = _knot_cache.setdefault(key, rows)
+        return rows
+
+    def cached_all(self):
+        """
+        every row, read once per process then from memory until a row
+        of the model is saved or deleted
+
+        The instances are shared, do not modify them.
+        """
+        return list(self._get_cached_rows().values())
+
+    def cached_get(self, pk):
+        """
+        the row with pk, as `cached_all`
+
+        Raises:
+            DoesNotExist
+        """
+        # a TextChoices member is the str of its value
+        pk = str(pk)
+        rows = self._get_cached_rows()
+        knot = rows.get(pk)
+        if knot is None:
+            # created by another process since the rows were read
+            knot = self.get_queryset().get(pk=pk)
+            with _knot_cache_lock:
+                # unless the rows were cleared meanwhile
+                if _knot_cache.get((self.model, self.db)) is rows:
+                    rows[pk] = knot
+        return knot
+
     def ensure_choices_exist(self):
+        """
+        create the rows of the TextChoices missing from the table
+
+        Returns:
+            list: the rows that were missing when the table was read.
+            Those created meanwhile by another process are skipped by
+            the insert, but still returned.
+        """
         model_cls = self.model
         model_name = model_cls.__name__
         textchoices_inner_class = getattr(model_cls, "TextChoices", None)
@@ -1410,17 +2406,21 @@ class KnotManager(models.Manager):
                 f"for {model_name}.TextChoices",
             )
 
-        for value, label in choices:
-            try:
-                _, created = model_cls.objects.get_or_create(pk=value, label=label)
-                if created:
-                    print(f"Created {model_name} with pk {value}, label {label}")
-                else:
-                    print(f"{model_name} with pk {value}, label {label} already exists")
-            except IntegrityError:
-                print(f"Could not create {model_name} with pk {value}. IntegrityError.")
-                # re-raise the exception
-                raise
+        existing_pks = set(
+            self.filter(pk__in=[value for value, _ in choices]).values_list(
+                "pk", flat=True
+            )
+        )
+        missing = [
+            model_cls(pk=value, label=label)
+            for value, label in choices
+            if value not in existing_pks
+        ]
+        if missing:
+            # bulk_create sends no post_save
+            self.bulk_create(missing, ignore_conflicts=True)
+            clear_knot_cache(model_cls)
+        return missing
 
 
 class Knot(UndeletableModel):
@@ -0,0 +1,176 @@
+"""
+Migration operations, to be added by hand to the migration of the models
+
+>>> from django_anchor_modeling.operations import (
+>>>     CreateCurrentView,
+>>>     InstallHistorizationTriggers,
+>>> )
+>>>
+>>> operations = [
+>>>     ...,
+>>>     InstallHistorizationTriggers(
+>>>         model_name="TProduct", historized_model_name="HistorizedTProduct"
+>>>     ),
+>>>     CreateCurrentView(model_name="TProduct", attributes=["name", "seller"]),
+>>> ]
+"""
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.operations.base import Operation
+
+from .triggers import create_triggers_sql, drop_triggers_sql
+from .views import create_current_view_sql, drop_current_view_sql
+
+
+class InstallHistorizationTriggers(Operation):
+    """
+    install the triggers that maintain the historized table of a model
+    historized with `historize_model(engine="trigger")`
+
+    The triggers are generated from the historized fields in the migration
+    state, so add it after the operations creating both models.
+    """
+
+    reversible = True
+
+    def __init__(self, model_name, historized_model_name):
+        self.model_name = model_name
+        self.historized_model_name = historized_model_name
+
+    def deconstruct(self):
+        return (
+            self.__class__.__name__,
+            [],
+            {
+                "model_name": self.model_name,
+                "historized_model_name": self.historized_model_name,
+            },
+        )
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def _install(self, app_label, schema_editor, state):
+        model = state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            historized_model = state.apps.get_model(
+                app_label, self.historized_model_name
+            )
+            for sql in create_triggers_sql(
+                schema_editor.connection, model, historized_model
+            ):
+                schema_editor.execute(sql)
+
+    def _remove(self, app_label, schema_editor, state):
+        model = state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            for sql in drop_triggers_sql(schema_editor.connection, model):
+                schema_editor.execute(sql)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        self._install(app_label, schema_editor, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        self._remove(app_label, schema_editor, from_state)
+
+    def describe(self):
+        return f"Install historization triggers on {self.model_name}"
+
+    @property
+    def migration_name_fragment(self):
+        return f"install_historization_triggers_{self.model_name.lower()}"
+
+
+class RemoveHistorizationTriggers(InstallHistorizationTriggers):
+    """
+    remove the triggers installed by `InstallHistorizationTriggers`,
+    as in when going back to the Python engine
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        self._remove(app_label, schema_editor, from_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        self._install(app_label, schema_editor, to_state)
+
+    def describe(self):
+        return f"Remove historization triggers on {self.model_name}"
+
+    @property
+    def migration_name_fragment(self):
+        return f"remove_historization_triggers_{self.model_name.lower()}"
+
+
+class CreateCurrentView(Operation):
+    """
+    (re)create the current view of an anchor, see `views`
+
+    The attributes are listed here as the related_names, as the models of the
+    migration state do not know which of their relations are attributes.
+    Add it after the operations creating the anchor and the attributes, and add
+    another one whenever the attributes in the view change. Unapplied, it
+    recreates the view of the previous one, or drops the view.
+    """
+
+    reversible = True
+
+    def __init__(self, model_name, attributes):
+        self.model_name = model_name
+        self.attributes = list(attributes)
+
+    def deconstruct(self):
+        return (
+            self.__class__.__name__,
+            [],
+            {"model_name": self.model_name, "attributes": self.attributes},
+        )
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def get_previous_attributes(self, app_label):
+        """
+        the attributes of the CreateCurrentView of the same model that comes
+        before this one in the migrations of app_label, None if there is none
+        """
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        for leaf in loader.graph.leaf_nodes(app_label):
+            previous = None
+            for key in loader.graph.forwards_plan(leaf):
+                if key[0] != app_label:
+                    continue
+                for operation in loader.graph.nodes[key].operations:
+                    if operation is self:
+                        return previous
+                    if (
+                        isinstance(operation, CreateCurrentView)
+                        and operation.model_name.lower() == self.model_name.lower()
+                    ):
+                        previous = operation.attributes
+        return None
+
+    def _replace_view(self, schema_editor, model, attributes):
+        schema_editor.execute(drop_current_view_sql(schema_editor.connection, model))
+        if attributes is not None:
+            schema_editor.execute(
+                create_current_view_sql(schema_editor.connection, model, attributes)
+            )
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            self._replace_view(schema_editor, model, self.attributes)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        # back to the view of the previous CreateCurrentView, dropped if none
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            self._replace_view(
+                schema_editor, model, self.get_previous_attributes(app_label)
+            )
+
+    def describe(self):
+        return f"Create the current view of {self.model_name}"
+
+    @property
+    def migration_name_fragment(self):
+        return f"create_current_view_{self.model_name.lower()}"
@@ -0,0 +1,226 @@
+"""
+unit of work for transaction-backed models
+
+Inside `transaction_scope()`, saves and deletes of transaction-backed models
+are buffered per table under one Transaction, and flushed on exit as bulk
+inserts, bulk updates and set-based deletes with their history, instead of a
+savepoint, a transaction check and a history write per save.
+
+>>> with transaction_scope() as scope:
+>>>     product = TProduct(business_identifier="p1")
+>>>     product.save()
+>>>     ProductName(anchor=product, value="Product 1").save()
+>>>     old_product.delete()
+
+Until the flush, the buffered objects are not in the database: an object
+created in the scope, with save() or with objects.create(), has no
+auto-generated pk yet, and delete returns (0, {}). As with save(), an object
+with its pk set is updated if the row exists and inserted otherwise, which is
+checked per table with one query at the flush.
+Saves with other arguments (update_fields, another database, another
+transaction) are not buffered and run right away.
+
+Buffered saves send neither pre_save nor post_save, the same as bulk_create
+and bulk_update. The deletes send their signals as `cascade_delete` does.
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from graphlib import TopologicalSorter
+
+from django.db import DEFAULT_DB_ALIAS, router
+from django.db import transaction as db_transaction
+
+_current_scope = ContextVar("transaction_scope", default=None)
+
+
+def get_current_transaction_scope():
+    return _current_scope.get()
+
+
+class TransactionScope:
+    """
+    the buffers of a `transaction_scope`, per model
+    """
+
+    def __init__(self, transaction, using=DEFAULT_DB_ALIAS, batch_size=1000):
+        self.transaction = transaction
+        self.using = using
+        self.batch_size = batch_size
+        # model -> {id(obj): obj}, in the order of the saves
+        self.creates = defaultdict(dict)
+        # model -> {pk: obj}, the last saved instance of each row
+        self.updates = defaultdict(dict)
+        # model -> pks
+        self.deletes = defaultdict(set)
+
+    def accepts(self, instance, transaction, using):
+        if transaction is not None:
+            transaction_id = getattr(transaction, "pk", transaction)
+            if transaction_id != self.transaction.pk:
+                return False
+        using = using or router.db_for_write(instance.__class__, instance=instance)
+        return using == self.using
+
+    def add_save(self, instance):
+        instance.set_transaction(self.transaction)
+        model = instance.__class__
+        if instance._state.adding:
+            self.creates[model][id(instance)] = instance
+        else:
+            self.updates[model][instance.pk] = instance
+
+    def add_delete(self, instance):
+        instance.set_transaction(self.transaction)
+        model = instance.__class__
+        if self.creates[model].pop(id(instance), None) is not None:
+            return
+        if instance.pk is None:
+            raise ValueError(
+                f"{model._meta.object_name} object can't be deleted because its "
+                f"{model._meta.pk.attname} attribute is set to None."
+            )
+        self.updates[model].pop(instance.pk, None)
+        self.deletes[model].add(instance.pk)
+
+    def get_create_order(self):
+        """
+        the models with buffered creates, the ones they refer to first
+        """
+        models = set(model for model, objs in self.creates.items() if objs)
+        sorter = TopologicalSorter()
+        for model in models:
+            sorter.add(
+                model,
+                *(
+                    field.related_model
+                    for field in model._meta.concrete_fields
+                    if field.is_relation
+                    and field.related_model in models
+                    and field.related_model is not model
+                ),
+            )
+        return list(sorter.static_order())
+
+    def split_existing(self, model, objs, inserted):
+        """
+        the objs to insert, after moving the ones whose row exists to the updates
+
+        the same choice as save() makes, with one query for the whole table.
+        Attributes of anchors inserted by this flush, by id in inserted,
+        cannot exist yet and are not looked up
+        """
+        pk_field = model._meta.pk
+        pks = []
+        for obj in objs:
+            # sets the pks taken from the objects bulk created before these
+            obj._prepare_related_fields_for_save(operation_name="bulk_create")
+            related = (
+                pk_field.get_cached_value(obj, None) if pk_field.is_relation else None
+            )
+            if obj.pk is not None and id(related) not in inserted:
+                pks.append(obj.pk)
+        if not pks:
+            return objs
+
+        existing_pks = set(
+            model._base_manager.using(self.using)
+            .filter(pk__in=pks)
+            .values_list("pk", flat=True)
+        )
+        objs_to_insert = []
+        for obj in objs:
+            if obj.pk in existing_pks:
+                obj._state.adding = False
+                obj._state.db = self.using
+                self.updates[model][obj.pk] = obj
+            else:
+                objs_to_insert.append(obj)
+        return objs_to_insert
+
+    def flush(self):
+        from .models import TransactionBackedQuerySet, cascade_delete
+
+        inserted = set()
+        for model in self.get_create_order():
+            objs = self.split_existing(
+                model, list(self.creates[model].values()), inserted
+            )
+            # bulk_create sets the pks of the objects referring to these,
+            # which come later in the order
+            TransactionBackedQuerySet(model, using=self.using).bulk_create(
+                objs,
+                batch_size=self.batch_size,
+                transaction=self.transaction,
+            )
+            inserted.update(id(obj) for obj in objs)
+
+        for model, objs_by_pk in self.updates.items():
+            if not objs_by_pk:
+                continue
+            fields = [
+                field.name
+                for field in model._meta.concrete_fields
+                if not field.primary_key and field.name != "transaction"
+            ]
+            TransactionBackedQuerySet(model, using=self.using).bulk_update(
+                list(objs_by_pk.values()),
+                fields,
+                batch_size=self.batch_size,
+                transaction=self.transaction,
+            )
+
+        for model, pks in self.deletes.items():
+            if pks:
+                cascade_delete(
+                    model,
+                    sorted(pks),
+                    self.transaction.pk,
+                    using=self.using,
+                    chunk_size=self.batch_size,
+                )
+
+        self.creates.clear()
+        self.updates.clear()
+        self.deletes.clear()
+
+
+@contextmanager
+def transaction_scope(using=None, batch_size=1000):
+    """
+    one Transaction and one database transaction for the writes inside,
+    flushed in bulk on exit, see the module docstring
+
+    Nested scopes are part of the outermost one.
+
+    Yields:
+        TransactionScope: with the Transaction as `scope.transaction`
+
+    Raises:
+        ValueError: when nested in a scope of another database
+    """
+    from .models import Transaction
+
+    outer_scope = _current_scope.get()
+    if outer_scope is not None:
+        if using is not None and using != outer_scope.using:
+            raise ValueError(
+                f"A transaction scope on '{using}' cannot be nested "
+                f"in a transaction scope on '{outer_scope.using}'."
+            )
+        yield outer_scope
+        return
+
+    using = using or DEFAULT_DB_ALIAS
+    with db_transaction.atomic(using=using):
+        scope = TransactionScope(
+            Transaction.objects.using(using).create(),
+            using=using,
+            batch_size=batch_size,
+        )
+        token = _current_scope.set(scope)
+        try:
+            yield scope
+        finally:
+            _current_scope.reset(token)
+        scope.flush()
@@ -1,2 +1,3 @@
 # settings.py
 DJANGO_ANCHOR_MODELING_AUTO_POPULATE_CHOICES_FOR_KNOT_SUBCLASSES = False
+DJANGO_ANCHOR_MODELING_WARM_KNOT_CACHE = False
@@ -1,4 +1,8 @@
-from .models import Knot
+from django.apps import apps
+from django.db import DatabaseError
+from django.db import transaction as db_transaction
+
+from .models import Knot, clear_knot_cache
 
 
 def populate_choices(sender, **kwargs):
@@ -6,3 +10,28 @@ def populate_choices(sender, **kwargs):
         manager = subclass.objects
         if hasattr(manager, "ensure_choices_exist"):
             manager.ensure_choices_exist()
+
+
+def invalidate_knot_cache(sender, **kwargs):
+    clear_knot_cache(sender)
+    # again after the commit, in case another thread read the rows before it
+    db_transaction.on_commit(
+        lambda: clear_knot_cache(sender), using=kwargs.get("using")
+    )
+
+
+def warm_knot_cache(sender=None, **kwargs):
+    """
+    read every Knot table into the process cache, on the first request
+    rather than in AppConfig.ready where the database should not be queried
+    """
+    from django.core.signals import request_started
+
+    request_started.disconnect(warm_knot_cache)
+    for model in apps.get_models():
+        if issubclass(model, Knot) and hasattr(model.objects, "cached_all"):
+            try:
+                model.objects.cached_all()
+            except DatabaseError:
+                # not migrated yet, read on first use instead
+                clear_knot_cache(model)
@@ -0,0 +1,150 @@
+"""
+SQL for the trigger historization engine, see `historize_model(engine="trigger")`
+
+The triggers keep the historized table in step with the active table
+inside the database, the same way the Python engine does:
+
+- AFTER INSERT opens a version with on_txn = NEW.transaction_id
+- AFTER UPDATE closes the open version with off_txn = NEW.transaction_id
+  and opens a new one
+- AFTER DELETE closes the open version. A deleted row does not carry the
+  deleting transaction, so the Python delete paths close the version with it
+  before deleting. What is still open then (raw SQL deletes) is closed with the
+  latest transaction.
+
+Install and remove them with the migration operations in `operations`.
+"""
+from django.db.utils import NotSupportedError
+
+from .models import SENTINEL_NULL_TRANSACTION_ID, get_historized_field_names
+from .utils import truncate_identifier
+
+SUPPORTED_VENDORS = ("sqlite", "postgresql")
+
+
+def get_trigger_name(active_model):
+    return truncate_identifier(f"{active_model._meta.db_table}_historize")
+
+
+def _check_vendor(connection):
+    if connection.vendor not in SUPPORTED_VENDORS:
+        raise NotSupportedError(
+            f"Historization triggers are not supported on {connection.vendor}, "
+            f"only on {', '.join(SUPPORTED_VENDORS)}."
+        )
+
+
+def _get_statements(connection, active_model, historized_model):
+    """
+    the statements shared by both vendors, with OLD and NEW as row references
+    """
+    quote_name = connection.ops.quote_name
+    active_opts = active_model._meta
+    historized_opts = historized_model._meta
+    transaction_field = active_opts.get_field("transaction")
+
+    historized_table = quote_name(historized_opts.db_table)
+    transaction_table = quote_name(transaction_field.related_model._meta.db_table)
+    transaction_pk = quote_name(transaction_field.related_model._meta.pk.column)
+    active_pk = quote_name(active_opts.pk.column)
+    active_transaction = quote_name(transaction_field.column)
+    original = quote_name(historized_opts.get_field("original").column)
+    on_txn = quote_name(historized_opts.get_field("on_txn").column)
+    off_txn = quote_name(historized_opts.get_field("off_txn").column)
+    sentinel = int(SENTINEL_NULL_TRANSACTION_ID)
+
+    field_names = get_historized_field_names(historized_model)
+    historized_columns = [
+        quote_name(historized_opts.get_field(name).column) for name in field_names
+    ]
+    active_columns = [
+        quote_name(active_opts.get_field(name).column) for name in field_names
+    ]
+
+    insert_columns = ", ".join([original, on_txn, off_txn, *historized_columns])
+    insert_values = ", ".join(
+        [
+            f"NEW.{active_pk}",
+            f"NEW.{active_transaction}",
+            str(sentinel),
+            *[f"NEW.{column}" for column in active_columns],
+        ]
+    )
+
+    def close(off_txn_value):
+        return (
+            f"UPDATE {historized_table} SET {off_txn} = {off_txn_value} "
+            f"WHERE {original} = OLD.{active_pk} AND {off_txn} = {sentinel};"
+        )
+
+    return {
+        "open": (
+            f"INSERT INTO {historized_table} ({insert_columns}) "
+            f"VALUES ({insert_values});"
+        ),
+        "close_on_update": close(f"NEW.{active_transaction}"),
+        "close_on_delete": close(
+            f"(SELECT MAX({transaction_pk}) FROM {transaction_table})"
+        ),
+    }
+
+
+def create_triggers_sql(connection, active_model, historized_model):
+    """
+    Returns:
+        list: the statements that install the triggers of active_model
+    """
+    _check_vendor(connection)
+    quote_name = connection.ops.quote_name
+    name = get_trigger_name(active_model)
+    table = quote_name(active_model._meta.db_table)
+    statements = _get_statements(connection, active_model, historized_model)
+
+    if connection.vendor == "sqlite":
+        return [
+            f"CREATE TRIGGER {quote_name(f'{name}_insert')} "
+            f"AFTER INSERT ON {table} FOR EACH ROW BEGIN "
+            f"{statements['open']} END",
+            f"CREATE TRIGGER {quote_name(f'{name}_update')} "
+            f"AFTER UPDATE ON {table} FOR EACH ROW BEGIN "
+            f"{statements['close_on_update']} {statements['open']} END",
+            f"CREATE TRIGGER {quote_name(f'{name}_delete')} "
+            f"AFTER DELETE ON {table} FOR EACH ROW BEGIN "
+            f"{statements['close_on_delete']} END",
+        ]
+
+    return [
+        f"CREATE OR REPLACE FUNCTION {quote_name(name)}() RETURNS trigger AS $$ "
+        f"BEGIN "
+        f"IF TG_OP = 'DELETE' THEN {statements['close_on_delete']} RETURN NULL; "
+        f"END IF; "
+        f"IF TG_OP = 'UPDATE' THEN {statements['close_on_update']} END IF; "
+        f"{statements['open']} "
+        f"RETURN NULL; "
+        f"END; $$ LANGUAGE plpgsql",
+        f"CREATE TRIGGER {quote_name(name)} "
+        f"AFTER INSERT OR UPDATE OR DELETE ON {table} "
+        f"FOR EACH ROW EXECUTE FUNCTION {quote_name(name)}()",
+    ]
+
+
+def drop_triggers_sql(connection, active_model):
+    """
+    Returns:
+        list: the statements that remove the triggers of active_model
+    """
+    _check_vendor(connection)
+    quote_name = connection.ops.quote_name
+    name = get_trigger_name(active_model)
+
+    if connection.vendor == "sqlite":
+        return [
+            f"DROP TRIGGER IF EXISTS {quote_name(f'{name}_{action}')}"
+            for action in ("insert", "update", "delete")
+        ]
+
+    return [
+        f"DROP TRIGGER IF EXISTS {quote_name(name)} "
+        f"ON {quote_name(active_model._meta.db_table)}",
+        f"DROP FUNCTION IF EXISTS {quote_name(name)}()",
+    ]
@@ -1,3 +1,6 @@
+from django.db.backends.utils import truncate_name
+
+
 def get_knot_choice_value(instance: object):
     """
     Given any instance of a model, return the knot choice value
@@ -9,3 +12,11 @@ def get_knot_choice_value(instance: object):
     class_name = instance.__class__.__name__
 
     return f"{app_label}__{class_name}"
+
+
+def truncate_identifier(name):
+    """
+    name within the 63 characters of PostgreSQL identifiers,
+    shortened with a hash of it when longer
+    """
+    return truncate_name(name, 63)
@@ -0,0 +1,177 @@
+"""
+"current state" SQL views, one flat relation per anchor
+
+The view `<anchor table>_current` has the columns of the anchor and
+the value of each of its attributes, LEFT JOINed from the attribute tables.
+
+>>> TProductCurrent = create_current_view_model(TProduct, [ProductName, ProductHasSeller])
+>>> TProductCurrent.objects.filter(name__startswith="P").order_by("seller")
+
+The view itself is created by the `operations.CreateCurrentView` migration
+operation or the `current_views` management command.
+"""
+import copy
+import sys
+
+from django.db import models
+
+from .utils import truncate_identifier
+
+
+def get_current_view_name(anchor_model):
+    return truncate_identifier(f"{anchor_model._meta.db_table}_current")
+
+
+def _get_attribute_value_field(anchor_model, related_name):
+    attribute_model = anchor_model._meta.get_field(related_name).related_model
+    return attribute_model._meta.get_field("value")
+
+
+def get_current_view_columns(anchor_model, related_names):
+    """
+    Returns:
+        dict: the view column of the anchor fields and of the attributes,
+        keyed by the anchor field attname or the attribute related_name
+    """
+    columns = {
+        field.attname: field.column for field in anchor_model._meta.concrete_fields
+    }
+    for related_name in related_names:
+        value_field = _get_attribute_value_field(anchor_model, related_name)
+        columns[related_name] = (
+            f"{related_name}_id" if value_field.is_relation else related_name
+        )
+    return columns
+
+
+def get_current_values_queryset(anchor_model, related_names, using=None):
+    """
+    the anchors with their attribute values, in the order of
+    `get_current_view_columns`, as a values_list queryset
+
+    The SELECT is compiled by the ORM, so the joins are the ones Django
+    does for anchor.<related_name>.value
+    """
+    anchor_fields = [field.attname for field in anchor_model._meta.concrete_fields]
+    # annotations cannot share names with the relations of the anchor
+    annotations = {
+        f"current_{related_name}": models.F(
+            f"{related_name}__"
+            f"{_get_attribute_value_field(anchor_model, related_name).attname}"
+        )
+        for related_name in related_names
+    }
+    return (
+        anchor_model._base_manager.using(using)
+        .annotate(**annotations)
+        .values_list(*anchor_fields, *annotations)
+        .order_by()
+    )
+
+
+def create_current_view_sql(connection, anchor_model, related_names):
+    """
+    works on the models of the migration state too,
+    hence the related_names and not `get_attribute_classes`
+    """
+    quote_name = connection.ops.quote_name
+    queryset = get_current_values_queryset(
+        anchor_model, related_names, using=connection.alias
+    )
+    sql, params = queryset.query.get_compiler(connection=connection).as_sql()
+    if params:
+        raise ValueError("A view cannot be created from a query with parameters.")
+
+    columns = ", ".join(
+        quote_name(column)
+        for column in get_current_view_columns(anchor_model, related_names).values()
+    )
+    return (
+        f"CREATE VIEW {quote_name(get_current_view_name(anchor_model))} "
+        f"({columns}) AS {sql}"
+    )
+
+
+def drop_current_view_sql(connection, anchor_model):
+    return (
+        f"DROP VIEW IF EXISTS "
+        f"{connection.ops.quote_name(get_current_view_name(anchor_model))}"
+    )
+
+
+def _copy_field(field, **overrides):
+    # not swappable, as deconstruct would look it up in the app registry
+    # that is not ready while the models module is imported
+    field = copy.deepcopy(field)
+    field.swappable = False
+    _, _, args, kwargs = field.deconstruct()
+    kwargs.pop("unique", None)
+    if field.is_relation:
+        kwargs.update(
+            on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+        )
+        kwargs.pop("related_query_name", None)
+    kwargs.update(overrides)
+    return type(field)(*args, **kwargs)
+
+
+def get_current_model_fields(anchor_model, attribute_classes):
+    """
+    the fields of a model over the anchor with its attribute values,
+    copies of the anchor fields and of the attribute value fields
+
+    Returns:
+        tuple: (the fields keyed by name, the related_names of the attributes)
+    """
+    fields = {
+        field.name: _copy_field(field) for field in anchor_model._meta.concrete_fields
+    }
+
+    related_names = []
+    for attribute_class in attribute_classes:
+        related_name = attribute_class._meta.pk.remote_field.get_accessor_name()
+        related_names.append(related_name)
+        # LEFT JOINed, so missing attributes are NULL
+        fields[related_name] = _copy_field(
+            attribute_class._meta.get_field("value"), null=True, blank=True
+        )
+
+    return fields, tuple(related_names)
+
+
+def create_current_view_model(anchor_model, attribute_classes):
+    """
+    an unmanaged model `<Anchor>Current` over the current view of anchor_model
+
+    The attribute classes are given, as the relations of the anchor
+    are not known yet while the models module is imported.
+
+    Args:
+        anchor_model: the Anchor class
+        attribute_classes: the attributes in the view
+
+    Returns:
+        the model class, also set in the models module of the anchor
+    """
+    model_name = f"{anchor_model.__name__}Current"
+    fields, related_names = get_current_model_fields(anchor_model, attribute_classes)
+    class_attrs = {
+        "__module__": anchor_model.__module__,
+        "Meta": type(
+            "Meta",
+            (),
+            {
+                "managed": False,
+                "db_table": get_current_view_name(anchor_model),
+                "app_label": anchor_model._meta.app_label,
+            },
+        ),
+        "current_view_of": anchor_model,
+        "current_view_attributes": related_names,
+        **fields,
+    }
+
+    view_model = type(model_name, (models.Model,), class_attrs)
+    setattr(sys.modules[anchor_model.__module__], model_name, view_model)
+
+    return view_model
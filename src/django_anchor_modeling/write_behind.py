@@ -0,0 +1,235 @@
+"""
+write-behind queue for high-frequency attribute updates
+
+Producers submit the new value of an attribute, and a background thread
+commits what is pending every `interval` seconds, or as soon as `max_items`
+are pending, under one Transaction with
+`TransactionBackedAttributeManager.create_or_update_if_different_many`.
+Pending updates of the same attribute and anchor are coalesced, only the last
+value is written.
+
+>>> stock_queue = WriteBehindQueue(interval=0.05, max_items=1000)
+>>> future = stock_queue.submit(ProductStockQuantity, product, 42)
+>>> obj, created, different = future.result(timeout=5)  # to wait for the commit
+
+The updates still pending when the process exits are flushed by an atexit
+hook, or call `close()` from the shutdown of the app server.
+
+A future cancelled before its commit starts gets no result, and the update is
+dropped when every future of its attribute and anchor is cancelled.
+"""
+import atexit
+import queue
+import threading
+import time
+import weakref
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future
+
+from django.db import close_old_connections, connections, router
+from django.db import transaction as db_transaction
+
+# the queues to close at exit, without keeping them alive
+_open_queues = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_queues():
+    for write_behind_queue in list(_open_queues):
+        write_behind_queue.close()
+
+
+class WriteBehindQueue:
+    """
+    Args:
+        interval: seconds between two commits
+        max_items: pending (attribute, anchor) pairs that trigger a commit early
+        max_pending: pending pairs beyond which `submit` blocks (back-pressure)
+        batch_size: rows locked and written per statement
+        autostart: start the background thread on the first submit,
+            otherwise only `flush` writes
+        flush_on_exit: close the queue at exit if it is still open
+    """
+
+    def __init__(
+        self,
+        interval=0.05,
+        max_items=1000,
+        max_pending=10000,
+        batch_size=1000,
+        using=None,
+        autostart=True,
+        flush_on_exit=True,
+    ):
+        self.interval = interval
+        self.max_items = max_items
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.using = using
+        self.autostart = autostart
+
+        # (attribute model, anchor pk) -> [value, futures]
+        self._pending = OrderedDict()
+        self._condition = threading.Condition()
+        # one commit at a time, from the thread or from flush
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+        if flush_on_exit:
+            _open_queues.add(self)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def submit(self, attribute_model, anchor, value, timeout=None):
+        """
+        queue the new value of the attribute of anchor
+
+        Blocks while `max_pending` pairs are pending, unless the pair is
+        already pending and only its value changes.
+
+        Returns:
+            Future: resolved after the commit with (obj, created, different)
+            as `create_or_update_if_different` returns them, or the exception
+
+        Raises:
+            queue.Full: when still full after timeout seconds
+            RuntimeError: when the queue is closed
+        """
+        key = (attribute_model, getattr(anchor, "pk", anchor))
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The write-behind queue is closed.")
+            if key not in self._pending and not self._condition.wait_for(
+                lambda: len(self._pending) < self.max_pending or self._closed,
+                timeout=timeout,
+            ):
+                raise queue.Full(
+                    f"{len(self._pending)} attribute updates are pending already."
+                )
+            if self._closed:
+                raise RuntimeError("The write-behind queue is closed.")
+
+            entry = self._pending.get(key)
+            if entry is None:
+                self._pending[key] = [value, [future]]
+            else:
+                # coalesced: the futures resolve with the last value written
+                entry[0] = value
+                entry[1].append(future)
+
+            if len(self._pending) >= self.max_items:
+                self._condition.notify_all()
+
+        if self.autostart:
+            self._ensure_started()
+        return future
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._condition:
+            if self._closed or (self._thread is not None and self._thread.is_alive()):
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="anchor-modeling-write-behind", daemon=True
+            )
+            self._thread.start()
+
+    def _take_pending(self):
+        with self._condition:
+            pending, self._pending = self._pending, OrderedDict()
+            # room for the producers waiting on back-pressure
+            self._condition.notify_all()
+        return pending
+
+    def _run(self):
+        try:
+            while True:
+                deadline = time.monotonic() + self.interval
+                with self._condition:
+                    while (
+                        not self._closed
+                        and len(self._pending) < self.max_items
+                        and (remaining := deadline - time.monotonic()) > 0
+                    ):
+                        self._condition.wait(timeout=remaining)
+                    closed = self._closed
+                # as between two requests
+                close_old_connections()
+                self.flush()
+                if closed:
+                    return
+        finally:
+            # the thread had its own connection
+            connections.close_all()
+
+    def flush(self):
+        """
+        commit what is pending now, in the calling thread
+
+        Returns:
+            int: the number of attribute updates written
+        """
+        with self._flush_lock:
+            pending = self._take_pending()
+            if pending:
+                self._write(pending)
+            return len(pending)
+
+    def _write(self, pending):
+        from .models import Transaction
+
+        # from here on the futures cannot be cancelled
+        for key, entry in list(pending.items()):
+            entry[1] = [
+                future for future in entry[1] if future.set_running_or_notify_cancel()
+            ]
+            if not entry[1]:
+                del pending[key]
+        if not pending:
+            return
+
+        values_by_model = defaultdict(dict)
+        for (attribute_model, anchor_pk), (value, _) in pending.items():
+            values_by_model[attribute_model][anchor_pk] = value
+
+        try:
+            using = self.using or router.db_for_write(next(iter(values_by_model)))
+            with db_transaction.atomic(using=using):
+                txn = Transaction.objects.using(using).create()
+                results = {}
+                for attribute_model, values in values_by_model.items():
+                    model_results = attribute_model.objects.db_manager(
+                        using
+                    ).create_or_update_if_different_many(
+                        values, txn, batch_size=self.batch_size
+                    )
+                    for anchor_pk, result in model_results.items():
+                        results[(attribute_model, anchor_pk)] = result
+        except Exception as e:
+            for _, futures in pending.values():
+                for future in futures:
+                    future.set_exception(e)
+            return
+
+        for key, (_, futures) in pending.items():
+            for future in futures:
+                future.set_result(results[key])
+
+    def close(self, timeout=None):
+        """
+        stop taking updates, and commit the pending ones
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self.flush()
+        _open_queues.discard(self)
@@ -0,0 +1,353 @@
+# Generated by Django 5.0.14 on 2026-10-18 13:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_anchor_modeling", "0002_ensure_sentinel_transaction"),
+        ("orders", "0015_child_grandchild_grandparent_parent_childname_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="historizedchild",
+            index=models.Index(
+                fields=["original", "off_txn"], name="orders_hist_origina_06b3ff_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedchild",
+            index=models.Index(
+                fields=["on_txn", "off_txn"], name="orders_hist_on_txn__9b4dc4_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedchildname",
+            index=models.Index(
+                fields=["original", "off_txn"], name="orders_hist_origina_79c0e1_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedchildname",
+            index=models.Index(
+                fields=["on_txn", "off_txn"], name="orders_hist_on_txn__991198_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedchildparent",
+            index=models.Index(
+                fields=["original", "off_txn"], name="orders_hist_origina_9fcc30_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedchildparent",
+            index=models.Index(
+                fields=["on_txn", "off_txn"], name="orders_hist_on_txn__9a6fbd_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedgrandchild",
+            index=models.Index(
+                fields=["original", "off_txn"], name="orders_hist_origina_be3457_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedgrandchild",
+            index=models.Index(
+                fields=["on_txn", "off_txn"], name="orders_hist_on_txn__da8920_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedgrandchildname",
+            index=models.Index(
+                fields=["original", "off_txn"], name="orders_hist_origina_dd963b_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedgrandchildname",
+            index=models.Index(
+                fields=["on_txn", "off_txn"], name="orders_hist_on_txn__394875_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedgrandchildparent",
+            index=models.Index(
+                fields=["original", "off_txn"], name="orders_hist_origina_aecdea_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedgrandchildparent",
+            index=models.Index(
+                fields=["on_txn", "off_txn"], name="orders_hist_on_txn__0bcbf9_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedgrandparent",
+            index=models.Index(
+                fields=["original", "off_txn"], name="orders_hist_origina_be60bc_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedgrandparent",
+            index=models.Index(
+                fields=["on_txn", "off_txn"], name="orders_hist_on_txn__96c407_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedgrandparentname",
+            index=models.Index(
+                fields=["original", "off_txn"], name="orders_hist_origina_5a723e_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedgrandparentname",
+            index=models.Index(
+                fields=["on_txn", "off_txn"], name="orders_hist_on_txn__f3a811_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedparent",
+            index=models.Index(
+                fields=["original", "off_txn"], name="orders_hist_origina_d92060_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedparent",
+            index=models.Index(
+                fields=["on_txn", "off_txn"], name="orders_hist_on_txn__c789e1_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedparentname",
+            index=models.Index(
+                fields=["original", "off_txn"], name="orders_hist_origina_f8c78c_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedparentname",
+            index=models.Index(
+                fields=["on_txn", "off_txn"], name="orders_hist_on_txn__677853_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedparentparent",
+            index=models.Index(
+                fields=["original", "off_txn"], name="orders_hist_origina_3ebde8_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedparentparent",
+            index=models.Index(
+                fields=["on_txn", "off_txn"], name="orders_hist_on_txn__450290_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedproductdescription",
+            index=models.Index(
+                fields=["original", "off_txn"], name="orders_hist_origina_3fbcd2_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedproductdescription",
+            index=models.Index(
+                fields=["on_txn", "off_txn"], name="orders_hist_on_txn__bb4517_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedproducthasseller",
+            index=models.Index(
+                fields=["original", "off_txn"], name="orders_hist_origina_bc8c82_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedproducthasseller",
+            index=models.Index(
+                fields=["on_txn", "off_txn"], name="orders_hist_on_txn__7ab6e1_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedproductname",
+            index=models.Index(
+                fields=["original", "off_txn"], name="orders_hist_origina_07fc3d_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedproductname",
+            index=models.Index(
+                fields=["on_txn", "off_txn"], name="orders_hist_on_txn__05e769_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedproductstockquantity",
+            index=models.Index(
+                fields=["original", "off_txn"], name="orders_hist_origina_29d6b2_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedproductstockquantity",
+            index=models.Index(
+                fields=["on_txn", "off_txn"], name="orders_hist_on_txn__2fbd15_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedtproduct",
+            index=models.Index(
+                fields=["original", "off_txn"], name="orders_hist_origina_259509_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedtproduct",
+            index=models.Index(
+                fields=["on_txn", "off_txn"], name="orders_hist_on_txn__617afb_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedwithfkthatsetrelatedname",
+            index=models.Index(
+                fields=["original", "off_txn"], name="orders_hist_origina_fc1d38_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedwithfkthatsetrelatedname",
+            index=models.Index(
+                fields=["on_txn", "off_txn"], name="orders_hist_on_txn__151e77_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="historizedchild",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("off_txn", -1)),
+                fields=("original",),
+                name="orders_historizedchild_one_open_version",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="historizedchildname",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("off_txn", -1)),
+                fields=("original",),
+                name="orders_historizedchildname_one_open_version",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="historizedchildparent",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("off_txn", -1)),
+                fields=("original",),
+                name="orders_historizedchildparent_one_open_version",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="historizedgrandchild",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("off_txn", -1)),
+                fields=("original",),
+                name="orders_historizedgrandchild_one_open_version",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="historizedgrandchildname",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("off_txn", -1)),
+                fields=("original",),
+                name="orders_historizedgrandchildname_one_open_version",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="historizedgrandchildparent",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("off_txn", -1)),
+                fields=("original",),
+                name="orders_historizedgrandchildparent_one_open_version",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="historizedgrandparent",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("off_txn", -1)),
+                fields=("original",),
+                name="orders_historizedgrandparent_one_open_version",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="historizedgrandparentname",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("off_txn", -1)),
+                fields=("original",),
+                name="orders_historizedgrandparentname_one_open_version",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="historizedparent",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("off_txn", -1)),
+                fields=("original",),
+                name="orders_historizedparent_one_open_version",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="historizedparentname",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("off_txn", -1)),
+                fields=("original",),
+                name="orders_historizedparentname_one_open_version",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="historizedparentparent",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("off_txn", -1)),
+                fields=("original",),
+                name="orders_historizedparentparent_one_open_version",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="historizedproductdescription",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("off_txn", -1)),
+                fields=("original",),
+                name="orders_historizedproductdescription_one_open_version",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="historizedproducthasseller",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("off_txn", -1)),
+                fields=("original",),
+                name="orders_historizedproducthasseller_one_open_version",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="historizedproductname",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("off_txn", -1)),
+                fields=("original",),
+                name="orders_historizedproductname_one_open_version",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="historizedproductstockquantity",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("off_txn", -1)),
+                fields=("original",),
+                name="orders_historizedproductstockquantity_one_open_version",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="historizedtproduct",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("off_txn", -1)),
+                fields=("original",),
+                name="orders_historizedtproduct_one_open_version",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="historizedwithfkthatsetrelatedname",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("off_txn", -1)),
+                fields=("original",),
+                name="orders_historizedwithfkthatsetrelatedname_one_open_version",
+            ),
+        ),
+    ]
@@ -0,0 +1,229 @@
+# Generated by Django 5.0.14 on 2026-10-18 13:05
+
+import django.db.models.deletion
+import django_anchor_modeling.fields
+import django_anchor_modeling.models
+from django.db import migrations, models
+
+from django_anchor_modeling.operations import InstallHistorizationTriggers
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_anchor_modeling", "0002_ensure_sentinel_transaction"),
+        ("orders", "0016_historized_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TriggerProduct",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "business_identifier",
+                    django_anchor_modeling.fields.BusinessIdentifierField(
+                        max_length=255, unique=True
+                    ),
+                ),
+                (
+                    "transaction",
+                    models.ForeignKey(
+                        default=django_anchor_modeling.models.Transaction.get_sentinel_id,
+                        on_delete=models.SET(
+                            django_anchor_modeling.models.Transaction.get_sentinel
+                        ),
+                        to="django_anchor_modeling.transaction",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="TriggerProductName",
+            fields=[
+                ("value", models.CharField(max_length=100)),
+                (
+                    "anchor",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="name",
+                        serialize=False,
+                        to="orders.triggerproduct",
+                    ),
+                ),
+                (
+                    "transaction",
+                    models.ForeignKey(
+                        default=django_anchor_modeling.models.Transaction.get_sentinel_id,
+                        on_delete=models.SET(
+                            django_anchor_modeling.models.Transaction.get_sentinel
+                        ),
+                        to="django_anchor_modeling.transaction",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="HistorizedTriggerProductName",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("value", models.CharField(max_length=100)),
+                (
+                    "off_txn",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        default=django_anchor_modeling.models.Transaction.get_sentinel_id,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="deactivated_%(app_label)s_%(class)ss",
+                        related_query_name="that_deactivated_%(app_label)s_%(class)ss",
+                        to="django_anchor_modeling.transaction",
+                    ),
+                ),
+                (
+                    "on_txn",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        default=django_anchor_modeling.models.Transaction.get_sentinel_id,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="created_%(app_label)s_%(class)ss",
+                        related_query_name="that_created_%(app_label)s_%(class)ss",
+                        to="django_anchor_modeling.transaction",
+                    ),
+                ),
+                (
+                    "original",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="versions",
+                        to="orders.triggerproductname",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="HistorizedTriggerProduct",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "business_identifier",
+                    django_anchor_modeling.fields.BusinessIdentifierField(
+                        max_length=255
+                    ),
+                ),
+                (
+                    "off_txn",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        default=django_anchor_modeling.models.Transaction.get_sentinel_id,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="deactivated_%(app_label)s_%(class)ss",
+                        related_query_name="that_deactivated_%(app_label)s_%(class)ss",
+                        to="django_anchor_modeling.transaction",
+                    ),
+                ),
+                (
+                    "on_txn",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        default=django_anchor_modeling.models.Transaction.get_sentinel_id,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="created_%(app_label)s_%(class)ss",
+                        related_query_name="that_created_%(app_label)s_%(class)ss",
+                        to="django_anchor_modeling.transaction",
+                    ),
+                ),
+                (
+                    "original",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="versions",
+                        to="orders.triggerproduct",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+                "indexes": [
+                    models.Index(
+                        fields=["original", "off_txn"],
+                        name="orders_hist_origina_0b556a_idx",
+                    ),
+                    models.Index(
+                        fields=["on_txn", "off_txn"],
+                        name="orders_hist_on_txn__bb2dfe_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="historizedtriggerproduct",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("off_txn", -1)),
+                fields=("original",),
+                name="orders_historizedtriggerproduct_one_open_version",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedtriggerproductname",
+            index=models.Index(
+                fields=["original", "off_txn"], name="orders_hist_origina_c6f265_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historizedtriggerproductname",
+            index=models.Index(
+                fields=["on_txn", "off_txn"], name="orders_hist_on_txn__3200e0_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="historizedtriggerproductname",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("off_txn", -1)),
+                fields=("original",),
+                name="orders_historizedtriggerproductname_one_open_version",
+            ),
+        ),
+        InstallHistorizationTriggers(
+            model_name="TriggerProduct",
+            historized_model_name="HistorizedTriggerProduct",
+        ),
+        InstallHistorizationTriggers(
+            model_name="TriggerProductName",
+            historized_model_name="HistorizedTriggerProductName",
+        ),
+    ]
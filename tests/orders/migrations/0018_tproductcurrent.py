@@ -0,0 +1,49 @@
+# Generated by Django 5.0.14 on 2026-10-18 13:10
+
+import django_anchor_modeling.fields
+from django.db import migrations, models
+
+from django_anchor_modeling.operations import CreateCurrentView
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("orders", "0017_triggerproduct_triggerproductname"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TProductCurrent",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "business_identifier",
+                    django_anchor_modeling.fields.BusinessIdentifierField(
+                        max_length=255
+                    ),
+                ),
+                ("name", models.CharField(blank=True, max_length=100, null=True)),
+                ("description", models.TextField(blank=True, null=True)),
+                (
+                    "stock_quantity",
+                    models.IntegerField(blank=True, max_length=8, null=True),
+                ),
+            ],
+            options={
+                "db_table": "orders_tproduct_current",
+                "managed": False,
+            },
+        ),
+        CreateCurrentView(
+            model_name="TProduct",
+            attributes=["name", "description", "stock_quantity", "seller"],
+        ),
+    ]
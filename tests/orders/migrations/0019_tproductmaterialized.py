@@ -0,0 +1,58 @@
+# Generated by Django 5.0.14 on 2026-10-18 13:12
+
+import django.db.models.deletion
+import django_anchor_modeling.fields
+import django_anchor_modeling.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_anchor_modeling", "0003_materializedhighwatermark"),
+        ("orders", "0018_tproductcurrent"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TProductMaterialized",
+            fields=[
+                (
+                    "business_identifier",
+                    django_anchor_modeling.fields.BusinessIdentifierField(
+                        max_length=255
+                    ),
+                ),
+                ("name", models.CharField(blank=True, max_length=100, null=True)),
+                ("description", models.TextField(blank=True, null=True)),
+                (
+                    "stock_quantity",
+                    models.IntegerField(blank=True, max_length=8, null=True),
+                ),
+                ("id", models.IntegerField(primary_key=True, serialize=False)),
+                (
+                    "seller",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="orders.tbusiness",
+                    ),
+                ),
+                (
+                    "transaction",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        default=django_anchor_modeling.models.Transaction.get_sentinel_id,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="django_anchor_modeling.transaction",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "orders_tproduct_materialized",
+            },
+        ),
+    ]
@@ -0,0 +1,234 @@
+# Generated by Django 5.0.14 on 2026-10-18 13:39
+
+import django.db.models.deletion
+import django.db.models.manager
+import django_anchor_modeling.fields
+import django_anchor_modeling.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_anchor_modeling", "0003_materializedhighwatermark"),
+        ("orders", "0019_tproductmaterialized"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TShipment",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "transaction",
+                    models.ForeignKey(
+                        default=django_anchor_modeling.models.Transaction.get_sentinel_id,
+                        on_delete=models.SET(
+                            django_anchor_modeling.models.Transaction.get_sentinel
+                        ),
+                        to="django_anchor_modeling.transaction",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+            managers=[
+                ("filters", django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="TSupplier",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "business_identifier",
+                    django_anchor_modeling.fields.BusinessIdentifierField(
+                        max_length=255, unique=True
+                    ),
+                ),
+                (
+                    "transaction",
+                    models.ForeignKey(
+                        default=django_anchor_modeling.models.Transaction.get_sentinel_id,
+                        on_delete=models.SET(
+                            django_anchor_modeling.models.Transaction.get_sentinel
+                        ),
+                        to="django_anchor_modeling.transaction",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="SupplierInvoice",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("number", models.CharField(max_length=20)),
+                (
+                    "supplier",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="invoices",
+                        to="orders.tsupplier",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SupplierContact",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("email", models.EmailField(max_length=254)),
+                (
+                    "supplier",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="contacts",
+                        to="orders.tsupplier",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ShipmentHasSupplier",
+            fields=[
+                (
+                    "anchor",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="supplier",
+                        serialize=False,
+                        to="orders.tshipment",
+                    ),
+                ),
+                (
+                    "transaction",
+                    models.ForeignKey(
+                        default=django_anchor_modeling.models.Transaction.get_sentinel_id,
+                        on_delete=models.SET(
+                            django_anchor_modeling.models.Transaction.get_sentinel
+                        ),
+                        to="django_anchor_modeling.transaction",
+                    ),
+                ),
+                (
+                    "value",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        to="orders.tsupplier",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="HistorizedTSupplier",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "business_identifier",
+                    django_anchor_modeling.fields.BusinessIdentifierField(
+                        max_length=255
+                    ),
+                ),
+                (
+                    "off_txn",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        default=django_anchor_modeling.models.Transaction.get_sentinel_id,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="deactivated_%(app_label)s_%(class)ss",
+                        related_query_name="that_deactivated_%(app_label)s_%(class)ss",
+                        to="django_anchor_modeling.transaction",
+                    ),
+                ),
+                (
+                    "on_txn",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        default=django_anchor_modeling.models.Transaction.get_sentinel_id,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="created_%(app_label)s_%(class)ss",
+                        related_query_name="that_created_%(app_label)s_%(class)ss",
+                        to="django_anchor_modeling.transaction",
+                    ),
+                ),
+                (
+                    "original",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="versions",
+                        to="orders.tsupplier",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+                "indexes": [
+                    models.Index(
+                        fields=["original", "off_txn"],
+                        name="orders_hist_origina_8f913d_idx",
+                    ),
+                    models.Index(
+                        fields=["on_txn", "off_txn"],
+                        name="orders_hist_on_txn__d9d77a_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="historizedtsupplier",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("off_txn", -1)),
+                fields=("original",),
+                name="orders_historizedtsupplier_one_open_version",
+            ),
+        ),
+    ]
@@ -5,6 +5,7 @@ from django_anchor_modeling.models import (
     AnchorWithBusinessId,
     Knot,
     StaticTie,
+    UndeletableModel,
     ZeroUpdateStrategyModel,
     static_attribute,
 )
@@ -106,3 +107,28 @@ class ProductIsUnderWhat(StaticTie):
         max_length=100, choices=ProductIsUnderWhatType.TextChoices.choices
     )
     composite_key_fields = ("product", "under_what_id", "under_what_type")
+
+
+class ArchivableNote(UndeletableModel):
+    """
+    deletable once archived, checked in SQL
+    """
+
+    text = models.CharField(max_length=100)
+    is_archived = models.BooleanField(default=False)
+
+    @classmethod
+    def deletable_q(cls):
+        return models.Q(is_archived=True)
+
+
+class ConditionalNote(UndeletableModel):
+    """
+    deletable once archived, checked per instance
+    """
+
+    text = models.CharField(max_length=100)
+    is_archived = models.BooleanField(default=False)
+
+    def can_be_deleted(self):
+        return self.is_archived
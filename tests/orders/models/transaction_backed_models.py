@@ -1,10 +1,13 @@
 from django.db import models
 
 from django_anchor_modeling.models import (
+    TransactionBackedAnchorNoBusinessId,
     TransactionBackedAnchorWithBusinessId,
     historize_model,
     transaction_backed_static_attribute,
 )
+from django_anchor_modeling.materialized import create_materialized_model
+from django_anchor_modeling.views import create_current_view_model
 
 
 @historize_model
@@ -77,3 +80,73 @@ AbstractProductHasSeller = transaction_backed_static_attribute(
 @historize_model
 class ProductHasSeller(AbstractProductHasSeller):
     pass
+
+
+@historize_model
+class TSupplier(TransactionBackedAnchorWithBusinessId):
+    pass
+
+
+class SupplierContact(models.Model):
+    """
+    a plain model deleted along with the supplier
+    """
+
+    supplier = models.ForeignKey(
+        TSupplier, on_delete=models.CASCADE, related_name="contacts"
+    )
+    email = models.EmailField()
+
+
+class SupplierInvoice(models.Model):
+    """
+    a plain model kept without its supplier
+    """
+
+    supplier = models.ForeignKey(
+        TSupplier, on_delete=models.SET_NULL, null=True, related_name="invoices"
+    )
+    number = models.CharField(max_length=20)
+
+
+class TShipment(TransactionBackedAnchorNoBusinessId):
+    pass
+
+
+AbstractShipmentHasSupplier = transaction_backed_static_attribute(
+    anchor_class=TShipment,
+    value_type=models.ForeignKey(TSupplier, on_delete=models.PROTECT),
+    related_name="supplier",
+)
+
+
+class ShipmentHasSupplier(AbstractShipmentHasSupplier):
+    pass
+
+
+@historize_model(engine="trigger")
+class TriggerProduct(TransactionBackedAnchorWithBusinessId):
+    pass
+
+
+AbstractTriggerProductName = transaction_backed_static_attribute(
+    anchor_class=TriggerProduct,
+    value_type=models.CharField(max_length=100),
+    related_name="name",
+)
+
+
+@historize_model(engine="trigger")
+class TriggerProductName(AbstractTriggerProductName):
+    pass
+
+
+TProductCurrent = create_current_view_model(
+    TProduct,
+    [ProductName, ProductDescription, ProductStockQuantity, ProductHasSeller],
+)
+
+TProductMaterialized = create_materialized_model(
+    TProduct,
+    [ProductName, ProductDescription, ProductStockQuantity, ProductHasSeller],
+)
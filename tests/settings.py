@@ -31,3 +31,6 @@ TEMPLATES = [{"BACKEND": "django.template.backends.django.DjangoTemplates"}]
 # SECURE_PROXY_SSL_HEADER = ("HTTP_FAKE_SECURE", "true")
 
 USE_TZ = True
+
+# one open version per original in the historized tables
+HISTORIZED_UNIQUE_OPEN_VERSION = True
@@ -1,10 +1,17 @@
+from unittest import mock
+
 import pytest
 from django.apps import apps
-from django.db import transaction
+from django.db import IntegrityError, connection, transaction
+from django.db.models.signals import post_save
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from django_anchor_modeling import constants
-from django_anchor_modeling.exceptions import SentinelTransactionCannotBeUsedError
+from django_anchor_modeling.exceptions import (
+    CannotReuseExistingTransactionError,
+    SentinelTransactionCannotBeUsedError,
+)
 from django_anchor_modeling.models import Transaction
 from tests.orders.models.transaction_backed_models import (
     ProductDescription,
@@ -599,3 +606,476 @@ class Test6NFTransactionBackedWithHistoryModel(TestCase):
         assert seller.value == new_biz
         assert different is False
         assert seller.transaction == t5
+
+    def test_queryset_update_historizes_set_based(self):
+        """
+        queryset/manager->update closes the open versions and inserts the new
+        versions with one statement each, whatever the number of rows
+        """
+        t1 = Transaction.objects.create()
+        p1 = TProduct.objects.create(business_identifier="p1", transaction=t1)
+        ProductDescription.objects.create(
+            anchor=p1, value="description for P1", transaction=t1
+        )
+
+        new_t = Transaction.objects.create()
+        descriptions = ProductDescription.objects.filter(
+            value__startswith="description for"
+        )
+
+        # exists check, savepoint, close versions, update, insert versions, release
+        with self.assertNumQueries(6):
+            rows = descriptions.update(value="same description", transaction=new_t)
+
+        assert rows == 2
+        assert not descriptions.exists()
+
+        new_versions = HistorizedProductDescription.objects.filter(on_txn=new_t)
+        assert new_versions.count() == 2
+        assert set(new_versions.values_list("value", flat=True)) == {"same description"}
+        assert set(new_versions.values_list("off_txn_id", flat=True)) == {
+            constants.SENTINEL_NULL_TRANSACTION_ID
+        }
+        assert set(new_versions.values_list("original_id", flat=True)) == set(
+            ProductDescription.objects.values_list("pk", flat=True)
+        )
+
+        closed_versions = HistorizedProductDescription.objects.filter(off_txn=new_t)
+        assert set(closed_versions.values_list("value", flat=True)) == {
+            "description for P0",
+            "description for P1",
+        }
+
+    def test_save_costs_no_extra_queries(self):
+        """
+        model->edit->save with a bare transaction id:
+        no Transaction lookup, no original record fetch, no sentinel get_or_create
+        """
+        new_t = Transaction.objects.create()
+        n0 = ProductName.objects.get(anchor__business_identifier="p0")
+        n0.value = "Product 0 - updated"
+
+        # probe transaction, update, savepoint, close version, insert version,
+        # release
+        with self.assertNumQueries(6):
+            n0.save(transaction=new_t.pk)
+
+        assert n0.transaction_id == new_t.pk
+        assert HistorizedProductName.objects.get(original=n0, on_txn=new_t).value == (
+            "Product 0 - updated"
+        )
+
+        # model->create->save of an attribute is not any dearer than an update
+        p1 = TProduct.objects.create(business_identifier="p1", transaction=new_t)
+        # probe transaction, insert, savepoint, close version, insert version,
+        # release
+        with self.assertNumQueries(6):
+            ProductName(anchor=p1, value="Product 1").save(transaction=new_t.pk)
+
+    def test_save_cannot_reuse_transaction_of_existing_record(self):
+        n0 = ProductName.objects.get(anchor__business_identifier="p0")
+        n0.value = "Product 0 - updated"
+
+        saved = []
+
+        def receiver(sender, instance, **kwargs):
+            saved.append(instance)
+
+        post_save.connect(receiver, sender=ProductName)
+        self.addCleanup(post_save.disconnect, receiver, sender=ProductName)
+        with pytest.raises(CannotReuseExistingTransactionError):
+            n0.save(transaction=n0.transaction_id)
+
+        assert saved == [], "post_save should not be sent for a rejected save"
+        # nothing was written, the enclosing atomic block is still usable
+        assert ProductName.objects.count() == 1
+
+        assert ProductName.objects.get(pk=n0.pk).value == "Product 0"
+        assert (
+            HistorizedProductName.objects.filter(original=n0).count() == 1
+        ), "no version should be written for a rejected save"
+
+    def test_delete_with_bare_transaction_id(self):
+        new_t = Transaction.objects.create()
+        n0 = ProductName.objects.get(anchor__business_identifier="p0")
+        n0_pk = n0.pk
+
+        # probe transaction, delete, savepoint, close version, release
+        with self.assertNumQueries(5):
+            n0.delete(transaction=new_t.pk)
+
+        assert not ProductName.objects.filter(pk=n0_pk).exists()
+        assert HistorizedProductName.objects.get(original_id=n0_pk).off_txn == new_t
+
+    def test_create_or_update_if_different_many(self):
+        t1 = Transaction.objects.create()
+        p0 = TProduct.objects.get(business_identifier="p0")
+        p1 = TProduct.objects.create(business_identifier="p1", transaction=t1)
+        p2 = TProduct.objects.create(business_identifier="p2", transaction=t1)
+        ProductName.objects.create(anchor=p1, value="Product 1", transaction=t1)
+
+        t2 = Transaction.objects.create()
+        results = ProductName.objects.create_or_update_if_different_many(
+            {p0: "Product 0", p1: "Product 1 - updated", p2.pk: "Product 2"},
+            txn_instance=t2,
+        )
+
+        name, created, different = results[p0]
+        assert (created, different) == (False, False)
+        assert name.value == "Product 0"
+        assert name.transaction_id != t2.pk
+
+        name, created, different = results[p1]
+        assert (created, different) == (False, True)
+        assert name.value == "Product 1 - updated"
+        assert name.transaction_id == t2.pk
+
+        name, created, different = results[p2.pk]
+        assert (created, different) == (True, None)
+        assert name.value == "Product 2"
+        assert name.transaction_id == t2.pk
+
+        assert ProductName.objects.get(pk=p1.pk).value == "Product 1 - updated"
+        assert ProductName.objects.get(pk=p2.pk).value == "Product 2"
+
+        # only the created and the changed got a version opened by t2
+        opened_by_t2 = HistorizedProductName.objects.filter(on_txn=t2)
+        assert set(opened_by_t2.values_list("original_id", "value")) == {
+            (p1.pk, "Product 1 - updated"),
+            (p2.pk, "Product 2"),
+        }
+        closed_by_t2 = HistorizedProductName.objects.filter(off_txn=t2)
+        assert list(closed_by_t2.values_list("original_id", "value")) == [
+            (p1.pk, "Product 1")
+        ]
+
+    def test_create_or_update_if_different_many_with_foreignkey(self):
+        t1 = Transaction.objects.create()
+        p0 = TProduct.objects.get(business_identifier="p0")
+        biz = TBusiness.objects.create(business_identifier="biz", transaction=t1)
+        new_biz = TBusiness.objects.create(
+            business_identifier="new_biz", transaction=t1
+        )
+
+        results = ProductHasSeller.objects.create_or_update_if_different_many(
+            {p0: biz}, txn_instance=t1
+        )
+        assert results[p0][1:] == (True, None)
+
+        t2 = Transaction.objects.create()
+        results = ProductHasSeller.objects.create_or_update_if_different_many(
+            {p0: new_biz.pk}, txn_instance=t2
+        )
+        seller, created, different = results[p0]
+        assert (created, different) == (False, True)
+        assert ProductHasSeller.objects.get(pk=p0.pk).value == new_biz
+
+        t3 = Transaction.objects.create()
+        results = ProductHasSeller.objects.create_or_update_if_different_many(
+            {p0: new_biz}, txn_instance=t3
+        )
+        seller, created, different = results[p0]
+        assert (created, different) == (False, False)
+        assert seller.transaction_id == t2.pk
+
+    def test_create_or_update_if_different_many_queries_do_not_grow_with_rows(self):
+        t1 = Transaction.objects.create()
+        products = [
+            TProduct.objects.create(business_identifier=f"p{i}", transaction=t1)
+            for i in range(1, 11)
+        ]
+        ProductStockQuantity.objects.create_or_update_if_different_many(
+            {product: 1 for product in products[:5]}, txn_instance=t1
+        )
+
+        t2 = Transaction.objects.create()
+        with CaptureQueriesContext(connection) as queries:
+            ProductStockQuantity.objects.create_or_update_if_different_many(
+                {product: 2 for product in products}, txn_instance=t2
+            )
+
+        # 5 changed and 5 created in one batch,
+        # a fixed number of statements for any number of rows
+        writes = [
+            query["sql"]
+            for query in queries.captured_queries
+            if not query["sql"].startswith(("SAVEPOINT", "RELEASE"))
+        ]
+        assert len(writes) <= 8
+        assert HistorizedProductStockQuantity.objects.filter(on_txn=t2).count() == 10
+
+    def test_upsert_if_different(self):
+        p0 = TProduct.objects.get(business_identifier="p0")
+        t1 = Transaction.objects.create()
+        p1 = TProduct.objects.create(business_identifier="p1", transaction=t1)
+        assert ProductName.objects.can_upsert()
+
+        # created
+        t2 = Transaction.objects.create()
+        # savepoint, probe, upsert, close version, insert version, release
+        with self.assertNumQueries(6):
+            name, created, different = ProductName.objects.upsert_if_different(
+                p1, "Product 1", t2
+            )
+        assert (created, different) == (True, None)
+        assert (name.pk, name.value, name.transaction_id) == (p1.pk, "Product 1", t2.pk)
+
+        # different
+        t3 = Transaction.objects.create()
+        with self.assertNumQueries(6):
+            name, created, different = ProductName.objects.upsert_if_different(
+                p1, "Product 1 - updated", t3
+            )
+        assert (created, different) == (False, True)
+        assert ProductName.objects.get(pk=p1.pk).value == "Product 1 - updated"
+        versions = HistorizedProductName.objects.filter(original_id=p1.pk)
+        assert list(
+            versions.order_by("on_txn_id").values_list("value", "on_txn", "off_txn")
+        ) == [
+            ("Product 1", t2.pk, t3.pk),
+            ("Product 1 - updated", t3.pk, constants.SENTINEL_NULL_TRANSACTION_ID),
+        ]
+
+        # the same value, nothing written
+        t4 = Transaction.objects.create()
+        name, created, different = ProductName.objects.upsert_if_different(
+            p0, "Product 0", t4
+        )
+        assert (created, different) == (False, False)
+        assert name.transaction_id != t4.pk
+        assert not HistorizedProductName.objects.filter(on_txn=t4).exists()
+
+        # a different value with a reused transaction
+        with pytest.raises(CannotReuseExistingTransactionError):
+            ProductName.objects.upsert_if_different(p1, "Product 1 - again", t3)
+
+    def test_upsert_if_different_without_open_version(self):
+        """
+        created is whether the row existed, not whether a version was closed
+        """
+        p0 = TProduct.objects.get(business_identifier="p0")
+        HistorizedProductName.objects.filter(original_id=p0.pk).delete()
+
+        t1 = Transaction.objects.create()
+        name, created, different = ProductName.objects.upsert_if_different(
+            p0, "Product 0 - updated", t1
+        )
+        assert (created, different) == (False, True)
+        assert name.value == "Product 0 - updated"
+        assert HistorizedProductName.objects.get(original_id=p0.pk).on_txn == t1
+
+    def test_upsert_if_different_with_foreignkey(self):
+        p0 = TProduct.objects.get(business_identifier="p0")
+        t1 = Transaction.objects.create()
+        biz = TBusiness.objects.create(business_identifier="biz", transaction=t1)
+        new_biz = TBusiness.objects.create(
+            business_identifier="new_biz", transaction=t1
+        )
+
+        _, created, _ = ProductHasSeller.objects.upsert_if_different(p0, biz, t1)
+        assert created
+
+        t2 = Transaction.objects.create()
+        seller, created, different = ProductHasSeller.objects.upsert_if_different(
+            p0, new_biz, t2
+        )
+        assert (created, different) == (False, True)
+        assert seller.value_id == new_biz.pk
+
+        t3 = Transaction.objects.create()
+        seller, created, different = ProductHasSeller.objects.upsert_if_different(
+            p0.pk, new_biz.pk, t3
+        )
+        assert (created, different) == (False, False)
+        assert seller.transaction_id == t2.pk
+
+    def test_upsert_if_different_falls_back_without_returning(self):
+        p0 = TProduct.objects.get(business_identifier="p0")
+        t1 = Transaction.objects.create()
+        with mock.patch.object(
+            type(ProductName.objects), "can_upsert", return_value=False
+        ), mock.patch.object(
+            type(ProductName.objects),
+            "create_or_update_if_different",
+            wraps=ProductName.objects.create_or_update_if_different,
+        ) as fallback:
+            name, created, different = ProductName.objects.upsert_if_different(
+                p0, "Product 0 - updated", t1
+            )
+        fallback.assert_called_once_with(p0, "Product 0 - updated", t1)
+        assert (created, different) == (False, True)
+        assert name.value == "Product 0 - updated"
+
+    def test_bulk_create_with_attributes(self):
+        t1 = Transaction.objects.create()
+        biz = TBusiness.objects.create(business_identifier="biz", transaction=t1)
+
+        t2 = Transaction.objects.create()
+        rows = [
+            {
+                "business_identifier": f"p{i}",
+                "name": f"Product {i}",
+                "description": f"Description {i}",
+                "stock_quantity": i,
+                "seller": biz if i % 2 else biz.pk,
+            }
+            for i in range(1, 21)
+        ]
+        # without a description
+        rows.append({"business_identifier": "p21", "name": "Product 21"})
+
+        # one INSERT per table and one per historized table, the anchor and
+        # its 4 attributes, in one savepoint
+        with self.assertNumQueries(2 + 2 * 5):
+            products = TProduct.objects.bulk_create_with_attributes(
+                rows, transaction=t2, batch_size=100
+            )
+
+        assert [product.business_identifier for product in products] == [
+            row["business_identifier"] for row in rows
+        ]
+        p1 = TProduct.objects.get(business_identifier="p1")
+        assert p1.name.value == "Product 1"
+        assert p1.description.value == "Description 1"
+        assert p1.stock_quantity.value == 1
+        assert p1.seller.value == biz
+        assert p1.transaction_id == t2.pk
+        assert p1.name.transaction_id == t2.pk
+        assert TProduct.objects.get(business_identifier="p2").seller.value == biz
+
+        p21 = TProduct.objects.get(business_identifier="p21")
+        assert p21.name.value == "Product 21"
+        assert not ProductDescription.objects.filter(anchor=p21).exists()
+
+        assert HistorizedTProduct.objects.filter(on_txn=t2).count() == 21
+        assert HistorizedProductName.objects.filter(on_txn=t2).count() == 21
+        assert HistorizedProductDescription.objects.filter(on_txn=t2).count() == 20
+
+    def test_as_of_transaction(self):
+        p0 = TProduct.objects.get(business_identifier="p0")
+        t0 = p0.transaction
+
+        t1 = Transaction.objects.create()
+        ProductName.objects.filter(pk=p0.pk).update(
+            value="Product 0 - renamed", transaction=t1
+        )
+
+        t2 = Transaction.objects.create()
+        ProductDescription.objects.get(pk=p0.pk).delete(transaction=t2)
+
+        t3 = Transaction.objects.create()
+        p1 = TProduct.objects.create(business_identifier="p1", transaction=t3)
+        ProductName.objects.create(anchor=p1, value="Product 1", transaction=t3)
+
+        def names_as_of(txn):
+            return set(HistorizedProductName.objects.as_of(txn).values_list("value"))
+
+        assert names_as_of(t0) == {("Product 0",)}
+        assert names_as_of(t1) == {("Product 0 - renamed",)}
+        assert names_as_of(t3.pk) == {("Product 0 - renamed",), ("Product 1",)}
+
+        assert TProduct.objects.as_of(t2).count() == 1
+        assert TProduct.objects.as_of(t3).count() == 2
+
+        # one query for the anchors and one per attribute
+        with self.assertNumQueries(3):
+            products = list(
+                TProduct.objects.as_of(t1)
+                .with_attributes("name", "description")
+                .order_by("business_identifier")
+            )
+        assert [product.original_id for product in products] == [p0.pk]
+        assert products[0].name.value == "Product 0 - renamed"
+        assert products[0].description.value == "description for P0"
+
+        with self.assertNumQueries(1 + 4):
+            products = {
+                product.business_identifier: product
+                for product in TProduct.objects.as_of(t3).with_attributes()
+            }
+        assert products["p0"].description is None
+        assert products["p0"].stock_quantity.value == 100
+        assert products["p1"].name.value == "Product 1"
+        assert products["p1"].seller is None
+
+        with pytest.raises(ValueError):
+            TProduct.objects.as_of(t3).with_attributes("not_an_attribute")
+
+    def test_one_open_version_per_original(self):
+        p0 = TProduct.objects.get(business_identifier="p0")
+        t1 = Transaction.objects.create()
+
+        index_fields = {
+            tuple(index.fields) for index in HistorizedProductName._meta.indexes
+        }
+        assert index_fields == {("original", "off_txn"), ("on_txn", "off_txn")}
+
+        with pytest.raises(IntegrityError), transaction.atomic():
+            HistorizedProductName.objects.create(
+                original_id=p0.pk, value="a second open version", on_txn=t1
+            )
+
+        # closed versions are not limited
+        HistorizedProductName.objects.create(
+            original_id=p0.pk, value="a closed version", on_txn=t1, off_txn=t1
+        )
+
+    def test_with_attributes_reads_anchors_in_one_query(self):
+        t1 = Transaction.objects.create()
+        TProduct.objects.bulk_create_with_attributes(
+            [{"business_identifier": "p1", "name": "Product 1"}], transaction=t1
+        )
+
+        with self.assertNumQueries(1):
+            products = {
+                product.business_identifier: product
+                for product in TProduct.objects.with_attributes()
+            }
+            assert products["p0"].name.value == "Product 0"
+            assert products["p0"].description.value == "description for P0"
+            assert products["p0"].stock_quantity.value == 100
+            assert products["p1"].name.value == "Product 1"
+            with pytest.raises(ProductDescription.DoesNotExist):
+                products["p1"].description
+
+        with self.assertNumQueries(1):
+            p0 = TProduct.objects.with_attributes("name").get(business_identifier="p0")
+            assert p0.name.value == "Product 0"
+
+        with pytest.raises(ValueError):
+            TProduct.objects.with_attributes("not_an_attribute")
+
+        with self.assertNumQueries(1):
+            attributes = p0.get_attributes()
+        assert set(attributes) == {"name", "description", "stock_quantity"}
+
+    def test_with_attributes_joins_foreignkey_values(self):
+        t1 = Transaction.objects.create()
+        biz = TBusiness.objects.create(business_identifier="biz", transaction=t1)
+        TProduct.objects.bulk_create_with_attributes(
+            [{"business_identifier": "p1", "name": "Product 1", "seller": biz}],
+            transaction=t1,
+        )
+
+        with self.assertNumQueries(1):
+            p1 = TProduct.objects.with_attributes().get(business_identifier="p1")
+            assert p1.seller.value.business_identifier == "biz"
+
+        with self.assertNumQueries(1):
+            p1 = TProduct.objects.with_attributes("seller").get(
+                business_identifier="p1"
+            )
+            assert p1.seller.value == biz
+
+    def test_anchor_delete_deletes_its_attributes(self):
+        p0 = TProduct.objects.get(business_identifier="p0")
+        p0_pk = p0.pk
+        t1 = Transaction.objects.create()
+
+        p0.delete(transaction=t1)
+
+        assert not TProduct.objects.filter(pk=p0_pk).exists()
+        assert not ProductName.objects.filter(pk=p0_pk).exists()
+        assert not ProductStockQuantity.objects.filter(pk=p0_pk).exists()
+        assert HistorizedTProduct.objects.get(original_id=p0_pk).off_txn_id == t1.pk
+        assert HistorizedProductName.objects.get(original_id=p0_pk).off_txn_id == t1.pk
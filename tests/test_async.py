@@ -0,0 +1,103 @@
+import pytest
+from django.apps import apps
+from django.test import TestCase
+
+from dataviewer.models import BusinessToDataFieldMap
+from dataviewer.services import aiter_hydrated_rows
+from django_anchor_modeling.exceptions import CannotReuseExistingTransactionError
+from django_anchor_modeling.models import Transaction
+from tests.orders.models.transaction_backed_models import ProductName, TProduct
+
+HistorizedProductName = apps.get_model("orders", "HistorizedProductName")
+
+
+@pytest.mark.django_db
+class TestAsyncAPI(TestCase):
+    async def test_asave_and_adelete(self):
+        t0 = await Transaction.objects.acreate()
+        product = TProduct(business_identifier="p0")
+        await product.asave(transaction=t0)
+        name = ProductName(anchor=product, value="Product 0")
+        await name.asave(transaction=t0)
+
+        name.value = "Renamed"
+        with pytest.raises(CannotReuseExistingTransactionError):
+            await name.asave(transaction=t0)
+
+        t1 = await Transaction.objects.acreate()
+        await name.asave(transaction=t1)
+        assert (
+            await HistorizedProductName.objects.filter(original_id=product.pk).acount()
+            == 2
+        )
+
+        t2 = await Transaction.objects.acreate()
+        await product.adelete(transaction=t2)
+        assert not await TProduct.objects.filter(business_identifier="p0").aexists()
+        assert not await ProductName.objects.aexists()
+
+    async def test_acreate_or_update_if_different(self):
+        t0 = await Transaction.objects.acreate()
+        product = await TProduct.objects.acreate(
+            business_identifier="p0", transaction=t0
+        )
+        _, created, _ = await ProductName.objects.acreate_or_update_if_different(
+            product, "Product 0", t0
+        )
+        assert created
+
+        t1 = await Transaction.objects.acreate()
+        _, created, different = await ProductName.objects.aupsert_if_different(
+            product, "Renamed", t1
+        )
+        assert (created, different) == (False, True)
+        assert (await ProductName.objects.aget(anchor=product)).value == "Renamed"
+
+    async def test_bulk_methods_and_hydration(self):
+        t0 = await Transaction.objects.acreate()
+        products = await TProduct.objects.abulk_create_with_attributes(
+            [
+                {"business_identifier": f"p{i}", "name": f"Product {i}"}
+                for i in range(3)
+            ],
+            transaction=t0,
+        )
+        extra = await TProduct.objects.abulk_create(
+            [TProduct(business_identifier="p3")], transaction=t0
+        )
+        assert await TProduct.objects.acount() == 4
+
+        t1 = await Transaction.objects.acreate()
+        names = [name async for name in ProductName.objects.order_by("pk")]
+        for name in names:
+            name.value = name.value.upper()
+        await ProductName.objects.abulk_update(names, ["value"], transaction=t1)
+        assert await HistorizedProductName.objects.filter(off_txn=t1).acount() == 3
+
+        await BusinessToDataFieldMap.objects.acreate(
+            id="Product.ASYNC",
+            description="",
+            main_model_class="orders.TProduct",
+            map={
+                "id": {"field": "business_identifier", "model": "TProduct"},
+                "name": {
+                    "field": "value",
+                    "model": "ProductName",
+                    "type": "prefetch_related",
+                    "related_name": "name",
+                },
+            },
+        )
+        rows = [
+            row
+            async for row in aiter_hydrated_rows(
+                "Product.ASYNC",
+                {"pk__in": [product.pk for product in products]},
+                chunk_size=2,
+            )
+        ]
+        assert rows == [{"id": f"p{i}", "name": f"PRODUCT {i}"} for i in range(3)]
+
+        t2 = await Transaction.objects.acreate()
+        await TProduct.objects.filter(pk=extra[0].pk).adelete(transaction=t2)
+        assert await TProduct.objects.acount() == 3
@@ -0,0 +1,205 @@
+import pytest
+from django.apps import apps
+from django.db.models import ProtectedError
+from django.db.models.signals import post_delete, pre_delete
+from django.test import TestCase
+
+from django_anchor_modeling.models import Transaction, plan_cascade_delete
+from tests.orders.models.dataviewer_models import (
+    Child,
+    ChildParent,
+    Parent,
+    ParentName,
+    ParentParent,
+)
+from tests.orders.models.transaction_backed_models import (
+    ProductName,
+    ProductStockQuantity,
+    ShipmentHasSupplier,
+    SupplierContact,
+    SupplierInvoice,
+    TProduct,
+    TShipment,
+    TSupplier,
+    WithFKThatSetRelatedName,
+)
+
+HistorizedTProduct = apps.get_model("orders", "HistorizedTProduct")
+HistorizedProductName = apps.get_model("orders", "HistorizedProductName")
+HistorizedWithFKThatSetRelatedName = apps.get_model(
+    "orders", "HistorizedWithFKThatSetRelatedName"
+)
+HistorizedChildParent = apps.get_model("orders", "HistorizedChildParent")
+HistorizedTSupplier = apps.get_model("orders", "HistorizedTSupplier")
+
+
+@pytest.mark.django_db
+class TestCascadeDelete(TestCase):
+    def create_products(self, count, transaction):
+        return TProduct.objects.bulk_create_with_attributes(
+            [
+                {
+                    "business_identifier": f"p{i}",
+                    "name": f"Product {i}",
+                    "stock_quantity": i,
+                }
+                for i in range(count)
+            ],
+            transaction=transaction,
+        )
+
+    def test_queryset_delete_is_set_based(self):
+        t0 = Transaction.objects.create()
+        products = self.create_products(10, t0)
+        WithFKThatSetRelatedName.objects.create(
+            business_identifier="with_fk", some_fk=products[0], transaction=t0
+        )
+        pks = [product.pk for product in products]
+
+        t1 = Transaction.objects.create()
+        # 1 for the pks, 1 for the rows referring through the CASCADE foreign key,
+        # then 1 history close and 1 delete for each of the 6 tables
+        # (the anchor, 4 attribute tables and WithFKThatSetRelatedName)
+        with self.assertNumQueries(1 + 1 + 2 + 2 * 6):
+            deleted, deleted_per_model = TProduct.objects.all().delete(transaction=t1)
+
+        assert deleted == 10 + 10 + 10 + 1
+        assert deleted_per_model["orders.TProduct"] == 10
+        assert deleted_per_model["orders.ProductName"] == 10
+        assert deleted_per_model["orders.WithFKThatSetRelatedName"] == 1
+        assert not TProduct.objects.exists()
+        assert not ProductName.objects.exists()
+        assert not ProductStockQuantity.objects.exists()
+        assert not WithFKThatSetRelatedName.objects.exists()
+
+        for historized_model in (
+            HistorizedTProduct,
+            HistorizedProductName,
+            HistorizedWithFKThatSetRelatedName,
+        ):
+            assert set(historized_model.objects.values_list("off_txn", flat=True)) == {
+                t1.pk
+            }
+        assert HistorizedProductName.objects.filter(original_id__in=pks).count() == 10
+
+    def test_delete_in_chunks(self):
+        t0 = Transaction.objects.create()
+        products = self.create_products(5, t0)
+
+        t1 = Transaction.objects.create()
+        TProduct.objects.filter(pk__in=[product.pk for product in products[:4]]).delete(
+            transaction=t1, chunk_size=2
+        )
+
+        assert list(TProduct.objects.values_list("business_identifier", flat=True)) == [
+            "p4"
+        ]
+        assert list(ProductName.objects.values_list("value", flat=True)) == [
+            "Product 4"
+        ]
+        assert HistorizedProductName.objects.filter(off_txn=t1).count() == 4
+
+    def test_foreignkey_valued_attributes_pointing_at_the_anchor_are_deleted(self):
+        t0 = Transaction.objects.create()
+        parent = Parent.objects.create(transaction=t0)
+        other_parent = Parent.objects.create(transaction=t0)
+        child = Child.objects.create(transaction=t0)
+        other_child = Child.objects.create(transaction=t0)
+        ChildParent.objects.create(anchor=child, value=parent, transaction=t0)
+        ChildParent.objects.create(
+            anchor=other_child, value=other_parent, transaction=t0
+        )
+
+        assert dict(plan_cascade_delete(Parent, [parent.pk])) == {
+            ChildParent: {child.pk},
+            ParentName: {parent.pk},
+            ParentParent: {parent.pk},
+            Parent: {parent.pk},
+        }
+
+        t1 = Transaction.objects.create()
+        parent.delete(transaction=t1)
+
+        # the child stays, without its parent
+        assert Child.objects.filter(pk=child.pk).exists()
+        assert not ChildParent.objects.filter(pk=child.pk).exists()
+        assert ChildParent.objects.get(pk=other_child.pk).value == other_parent
+        assert HistorizedChildParent.objects.get(original_id=child.pk).off_txn == t1
+
+    def test_plain_models_follow_their_on_delete(self):
+        t0 = Transaction.objects.create()
+        supplier = TSupplier.objects.create(business_identifier="s0", transaction=t0)
+        other_supplier = TSupplier.objects.create(
+            business_identifier="s1", transaction=t0
+        )
+        SupplierContact.objects.create(supplier=supplier, email="a@example.com")
+        SupplierContact.objects.create(supplier=supplier, email="b@example.com")
+        SupplierContact.objects.create(supplier=other_supplier, email="c@example.com")
+        invoice = SupplierInvoice.objects.create(supplier=supplier, number="I-1")
+        other_invoice = SupplierInvoice.objects.create(
+            supplier=other_supplier, number="I-2"
+        )
+
+        t1 = Transaction.objects.create()
+        deleted, deleted_per_model = TSupplier.objects.filter(pk=supplier.pk).delete(
+            transaction=t1
+        )
+
+        assert deleted == 3
+        assert deleted_per_model["orders.TSupplier"] == 1
+        assert deleted_per_model["orders.SupplierContact"] == 2
+        # CASCADE
+        assert list(SupplierContact.objects.values_list("email", flat=True)) == [
+            "c@example.com"
+        ]
+        # SET_NULL
+        invoice.refresh_from_db()
+        other_invoice.refresh_from_db()
+        assert invoice.supplier is None
+        assert other_invoice.supplier == other_supplier
+        assert HistorizedTSupplier.objects.get(original_id=supplier.pk).off_txn == t1
+
+    def test_protected_foreignkey_valued_attribute(self):
+        t0 = Transaction.objects.create()
+        supplier = TSupplier.objects.create(business_identifier="s0", transaction=t0)
+        shipment = TShipment.objects.create(transaction=t0)
+        ShipmentHasSupplier.objects.create(
+            anchor=shipment, value=supplier, transaction=t0
+        )
+
+        t1 = Transaction.objects.create()
+        with pytest.raises(ProtectedError):
+            supplier.delete(transaction=t1)
+        assert TSupplier.objects.filter(pk=supplier.pk).exists()
+        assert ShipmentHasSupplier.objects.filter(pk=shipment.pk).exists()
+
+        shipment.delete(transaction=t1)
+        supplier.delete(transaction=t1)
+        assert not TSupplier.objects.exists()
+
+    def test_delete_signals_are_sent_to_receivers(self):
+        t0 = Transaction.objects.create()
+        supplier = TSupplier.objects.create(business_identifier="s0", transaction=t0)
+        supplier_pk = supplier.pk
+        SupplierContact.objects.create(supplier=supplier, email="a@example.com")
+        received = []
+
+        def receiver(signal, sender, instance, origin, **kwargs):
+            received.append((signal, sender, instance.pk, origin))
+
+        for signal in (pre_delete, post_delete):
+            for sender in (TSupplier, SupplierContact):
+                signal.connect(receiver, sender=sender)
+                self.addCleanup(signal.disconnect, receiver, sender=sender)
+
+        supplier.delete(transaction=Transaction.objects.create())
+
+        contact_signals = [
+            signal for signal, sender, _, _ in received if sender is SupplierContact
+        ]
+        assert contact_signals == [pre_delete, post_delete]
+        assert [
+            (signal, pk, origin)
+            for signal, sender, pk, origin in received
+            if sender is TSupplier
+        ] == [(pre_delete, supplier_pk, supplier), (post_delete, supplier_pk, supplier)]
@@ -0,0 +1,128 @@
+from importlib import import_module
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+
+from django_anchor_modeling.models import Transaction
+from django_anchor_modeling.operations import CreateCurrentView
+from tests.orders.models.transaction_backed_models import (
+    TBusiness,
+    TProduct,
+    TProductCurrent,
+)
+
+
+@pytest.mark.django_db
+class TestCurrentView(TestCase):
+    def setUp(self):
+        t0 = Transaction.objects.create()
+        self.biz = TBusiness.objects.create(business_identifier="biz", transaction=t0)
+        TProduct.objects.bulk_create_with_attributes(
+            [
+                {
+                    "business_identifier": "p0",
+                    "name": "Product 0",
+                    "stock_quantity": 20,
+                    "seller": self.biz,
+                },
+                {
+                    "business_identifier": "p1",
+                    "name": "Product 1",
+                    "description": "description for P1",
+                    "stock_quantity": 10,
+                },
+            ],
+            transaction=t0,
+        )
+
+    def test_query_the_current_view(self):
+        with self.assertNumQueries(1):
+            products = list(
+                TProductCurrent.objects.filter(name__startswith="Product").order_by(
+                    "stock_quantity"
+                )
+            )
+
+        assert [product.business_identifier for product in products] == ["p1", "p0"]
+        p1, p0 = products
+        assert p1.description == "description for P1"
+        assert p1.seller_id is None
+        assert p0.description is None
+        assert p0.seller_id == self.biz.pk
+
+        t1 = Transaction.objects.create()
+        TProduct.objects.get(business_identifier="p0").name.delete(transaction=t1)
+        assert TProductCurrent.objects.get(business_identifier="p0").name is None
+
+    def test_current_views_command(self):
+        out = StringIO()
+        call_command("current_views", "orders.TProduct", "--sql", stdout=out)
+        assert 'CREATE VIEW "orders_tproduct_current"' in out.getvalue()
+        assert "LEFT OUTER JOIN" in out.getvalue()
+
+        out = StringIO()
+        call_command("current_views", stdout=out)
+        assert out.getvalue().strip() == "Created 1 current view(s)"
+        assert TProductCurrent.objects.count() == 2
+
+
+class TestCreateCurrentViewBackwards(TransactionTestCase):
+    # the SQLite schema editor cannot run in the atomic block of a TestCase
+
+    def view_columns(self):
+        if "orders_tproduct_current" not in connection.introspection.table_names(
+            include_views=True
+        ):
+            return None
+        with connection.cursor() as cursor:
+            return [
+                column.name
+                for column in connection.introspection.get_table_description(
+                    cursor, "orders_tproduct_current"
+                )
+            ]
+
+    def test_backwards_recreates_the_previous_view(self):
+        migration = import_module("tests.orders.migrations.0018_tproductcurrent")
+        (created,) = [
+            operation
+            for operation in migration.Migration.operations
+            if isinstance(operation, CreateCurrentView)
+        ]
+        narrowed = CreateCurrentView(model_name="TProduct", attributes=["name"])
+        state = MigrationExecutor(connection).loader.project_state(
+            ("orders", "0018_tproductcurrent")
+        )
+        columns = self.view_columns()
+
+        with mock.patch.object(
+            migration.Migration,
+            "operations",
+            [*migration.Migration.operations, narrowed],
+        ), connection.schema_editor() as schema_editor:
+            try:
+                narrowed.database_forwards("orders", schema_editor, state, state)
+                assert "description" not in self.view_columns()
+                # back to the view of the CreateCurrentView before it
+                narrowed.database_backwards("orders", schema_editor, state, state)
+                assert self.view_columns() == columns
+
+                # the first one of the model drops the view
+                created.database_backwards("orders", schema_editor, state, state)
+                assert self.view_columns() is None
+            finally:
+                created.database_forwards("orders", schema_editor, state, state)
+
+
+def test_create_current_view_deconstruct():
+    operation = CreateCurrentView(model_name="TProduct", attributes=["name"])
+    assert operation.deconstruct() == (
+        "CreateCurrentView",
+        [],
+        {"model_name": "TProduct", "attributes": ["name"]},
+    )
@@ -1,15 +1,27 @@
+from types import SimpleNamespace
+from unittest import mock
+
 import pytest
+from django.contrib.contenttypes.models import ContentType
 from django.db import connection
 from django.test import TestCase
 from django.test.utils import CaptureQueriesContext
 
+from dataviewer.cache import LocalLRUCache, TwoTierCache
+from dataviewer.exceptions import AmbiguousModelNameError
 from dataviewer.models import BusinessToDataFieldMap
+from dataviewer.registry import ModelRegistry, model_registry
 from dataviewer.services import (
+    get_app_model,
     get_biz_to_data_field_map,
     get_hydrated_anchor_based_on_data_map,
     get_hydrated_queryset_based_on_data_map,
+    get_model_class,
+    iter_hydrated_rows,
     transform_hydrated_instance_into_dict,
+    transform_many_hydrated_instances,
 )
+from dataviewer.utils.encoders import iter_csv, iter_json_lines
 from django_anchor_modeling.models import Transaction
 from tests.orders.models.transaction_backed_models import ProductName, TProduct
 
@@ -59,10 +71,10 @@ class TestBusinessToDataFieldMap(TestCase):
             for query in queries.captured_queries:
                 print(query["sql"])
             assert hydrated_dict == {"id": p0.pk, "name": "Product 0"}
-            # 1 query to use contenttype to get model class for productname
+            # the model class for productname comes from the model registry
             # 1 query to get productname and product in get_hydrated_anchor_based_on_data_map
             # 1 query to get productname and product in get_hydrated_queryset_based_on_data_map
-            assert len(queries) == 3
+            assert len(queries) == 2
 
     def test_get_biz_to_data_field_map(self):
         field_model_map = {"id": {"field": "id", "model": "TProduct"}}
@@ -72,3 +84,168 @@ class TestBusinessToDataFieldMap(TestCase):
         assert b2dfm.map == field_model_map
         cached_map = get_biz_to_data_field_map("Product.GENERIC")
         assert cached_map == field_model_map
+
+    def test_biz_to_data_field_map_two_tier_cache(self):
+        data_map = BusinessToDataFieldMap.objects.create(
+            description="", id="Product.CACHED", map={"id": {"field": "id"}}
+        )
+        assert get_biz_to_data_field_map("Product.CACHED") == {"id": {"field": "id"}}
+
+        # from the memory of the process, without the database or the Django cache
+        with self.assertNumQueries(0), mock.patch("dataviewer.cache.cache") as cache:
+            assert get_biz_to_data_field_map("Product.CACHED") == {
+                "id": {"field": "id"}
+            }
+        assert not cache.method_calls
+
+        # another process, whose memory tier trusts its versions for no time
+        other_process = TwoTierCache("biz_to_data_field_map", ttl=0)
+        other_process.get("Product.CACHED", lambda: data_map.map)
+
+        data_map.map = {"name": {"field": "name"}}
+        data_map.save()
+        assert get_biz_to_data_field_map("Product.CACHED") == data_map.map
+        assert other_process.get("Product.CACHED", lambda: None) == data_map.map
+
+        data_map.delete()
+        with pytest.raises(BusinessToDataFieldMap.DoesNotExist):
+            get_biz_to_data_field_map("Product.CACHED")
+
+    def test_iter_hydrated_rows_pages_by_primary_key(self):
+        t0 = Transaction.objects.create()
+        TProduct.objects.bulk_create_with_attributes(
+            [
+                {"business_identifier": f"p{i}", "name": f"Product {i}"}
+                for i in range(5)
+            ],
+            transaction=t0,
+        )
+        BusinessToDataFieldMap.objects.create(
+            id="Product.NAMES",
+            description="",
+            main_model_class="orders.TProduct",
+            map={
+                "id": {"field": "business_identifier", "model": "TProduct"},
+                "name": {
+                    "field": "value",
+                    "model": "ProductName",
+                    "type": "prefetch_related",
+                    "related_name": "name",
+                },
+            },
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            rows = list(
+                iter_hydrated_rows(
+                    "Product.NAMES",
+                    {"business_identifier__gte": "p1"},
+                    chunk_size=2,
+                )
+            )
+
+        assert rows == [{"id": f"p{i}", "name": f"Product {i}"} for i in range(1, 5)]
+        chunk_queries = [
+            query["sql"]
+            for query in queries.captured_queries
+            if 'FROM "orders_tproduct"' in query["sql"]
+        ]
+        # 2 full chunks and the empty one, each by pk and not by OFFSET
+        assert len(chunk_queries) == 3
+        assert all("OFFSET" not in sql for sql in chunk_queries)
+        assert '"orders_tproduct"."id" > ' in chunk_queries[1]
+
+        assert list(iter_json_lines(rows[:1])) == [
+            '{"id": "p1", "name": "Product 1"}\n'
+        ]
+        assert "".join(iter_csv(rows[:2])) == (
+            "id,name\r\np1,Product 1\r\np2,Product 2\r\n"
+        )
+        assert list(iter_csv([], fieldnames=["id"])) == ["id\r\n"]
+
+    def test_prefetch_latest_reads_the_latest_version_from_memory(self):
+        t0 = Transaction.objects.create()
+        products = TProduct.objects.bulk_create_with_attributes(
+            [
+                {"business_identifier": f"p{i}", "name": f"Product {i}"}
+                for i in range(3)
+            ],
+            transaction=t0,
+        )
+        for version in range(1, 3):
+            txn = Transaction.objects.create()
+            for product in products:
+                product.name.value = f"Product {product.business_identifier} v{version}"
+                product.name.save(transaction=txn)
+
+        field_model_map = {
+            "id": {"field": "business_identifier", "model": "TProduct"},
+            "name": {
+                "field": "value",
+                "model": "HistorizedProductName",
+                "type": "prefetch_latest",
+                "related_name": "name__versions",
+                "order_by": "-on_txn",
+            },
+        }
+        queryset = get_hydrated_queryset_based_on_data_map(
+            {}, TProduct, field_model_map
+        ).order_by("pk")
+
+        # the products, their names, the latest versions of the names
+        with self.assertNumQueries(3):
+            anchors = list(queryset)
+        with self.assertNumQueries(0):
+            rows = transform_many_hydrated_instances(anchors, field_model_map, None)
+
+        assert rows == [{"id": f"p{i}", "name": f"Product p{i} v2"} for i in range(3)]
+
+
+@pytest.mark.django_db
+class TestModelRegistry(TestCase):
+    def test_lookups_are_dict_hits(self):
+        with self.assertNumQueries(0):
+            assert get_app_model("orders", "TProduct") is TProduct
+            assert get_model_class("productname") is ProductName
+            assert model_registry.get("orders.ProductName") is ProductName
+
+        with pytest.raises(ValueError):
+            get_app_model("orders", "Missing")
+        with pytest.raises(ContentType.DoesNotExist):
+            get_model_class("Missing")
+
+        content_type = ContentType.objects.get_for_model(TProduct)
+        assert model_registry.get_by_content_type_id(content_type.pk) is TProduct
+
+    def test_ambiguous_names(self):
+        def fake_model(app_label, name):
+            return SimpleNamespace(
+                _meta=SimpleNamespace(
+                    label=f"{app_label}.{name}",
+                    label_lower=f"{app_label}.{name}".lower(),
+                    model_name=name.lower(),
+                )
+            )
+
+        registry = ModelRegistry()
+        first = fake_model("first", "Item")
+        registry.build([first, fake_model("second", "Item")])
+
+        with pytest.raises(AmbiguousModelNameError) as excinfo:
+            registry.get("Item")
+        assert excinfo.value.labels == ["first.Item", "second.Item"]
+        assert registry.get("first.item") is first
+
+
+def test_local_lru_cache_is_bounded_with_a_ttl():
+    lru = LocalLRUCache(maxsize=2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1
+    lru.set("c", 3)
+    assert lru.get("b") is None
+    assert len(lru) == 2
+
+    expired = LocalLRUCache(ttl=0)
+    expired.set("a", 1)
+    assert expired.get("a") is None
@@ -0,0 +1,199 @@
+import pytest
+from django.test import TestCase
+
+from dataviewer.models import BusinessToQueryMap
+from dataviewer.plans import (
+    QueryPlanCache,
+    get_projection_lookup,
+    get_query_plan,
+    query_plan_cache,
+)
+from dataviewer.utils.query_helpers import QueryHelpers
+from django_anchor_modeling.models import Transaction
+from tests.orders.models.dataviewer_models import (
+    Grandparent,
+    GrandparentName,
+    Parent,
+    ParentName,
+    ParentParent,
+)
+
+FIELD_PROCESSORS = {
+    "id": {"full_path_to_single": "id"},
+    "name": {
+        "full_path_to_single": "name.value",
+        "conditions": {"hasattr": "name"},
+    },
+    "non_existent_field": {
+        "full_path_to_single": "non_existent",
+        "conditions": {"hasattr": "non_existent"},
+    },
+    "parents": {
+        "path_to_many": "parentparent_set",
+        "return_dict": {"id": "anchor.id", "name": "anchor.name.value"},
+    },
+    "parent_names": {
+        "path_to_many": "parentparent_set",
+        "return_string": "anchor.name.value",
+    },
+    "no_rule": {},
+}
+
+
+@pytest.mark.django_db
+class TestQueryPlan(TestCase):
+    def setUp(self):
+        query_plan_cache.clear()
+        t0 = Transaction.objects.create()
+        self.gp0 = Grandparent.objects.create(business_identifier="gp0", transaction=t0)
+        GrandparentName.objects.create(
+            anchor=self.gp0, value="Grandparent 0", transaction=t0
+        )
+        for i in range(2):
+            parent = Parent.objects.create(transaction=t0)
+            ParentName.objects.create(
+                anchor=parent, value=f"Parent {i}", transaction=t0
+            )
+            ParentParent.objects.create(anchor=parent, value=self.gp0, transaction=t0)
+
+        self.query_map = BusinessToQueryMap.objects.create(
+            pk="GP_WITH_PARENTS",
+            description="grandparents with their parents",
+            main_model_class="orders.Grandparent",
+            select_related=["name"],
+            prefetch_related=[
+                {
+                    "prefetch_field": "parentparent_set",
+                    "model": "orders.ParentParent",
+                    "only_fields": ["pk", "value_id"],
+                    "nested_prefetch": [
+                        {
+                            "prefetch_field": "anchor",
+                            "model": "orders.Parent",
+                            "only_fields": ["id"],
+                            "is_one_to_one": True,
+                            "nested_prefetch": [
+                                {
+                                    "prefetch_field": "name",
+                                    "model": "orders.ParentName",
+                                    "only_fields": ["value"],
+                                    "is_one_to_one": True,
+                                }
+                            ],
+                        }
+                    ],
+                }
+            ],
+            only=["id", "business_identifier", "name__value"],
+            field_processors=FIELD_PROCESSORS,
+        )
+
+    def test_plan_processes_like_query_helpers(self):
+        plan = get_query_plan("GP_WITH_PARENTS")
+        processed = [plan.process_instance(gp) for gp in plan.get_queryset()]
+
+        expected = [
+            QueryHelpers.process_instance(gp, FIELD_PROCESSORS)
+            for gp in Grandparent.objects.all()
+        ]
+        assert processed == expected
+        assert processed[0]["parent_names"] == "Parent 0, Parent 1"
+        assert processed[0]["non_existent_field"] is None
+        assert processed[0]["no_rule"] is None
+
+    def test_projection_matches_the_instances(self):
+        plan = get_query_plan("GP_WITH_PARENTS")
+        expected = [plan.process_instance(gp) for gp in plan.get_queryset()]
+
+        # the values_list of the projected rules, then the instances for the
+        # rest with their prefetch, and the 2 parent names the map does not prefetch
+        with self.assertNumQueries(1 + 2 + 2):
+            assert list(plan.iter_projected()) == expected
+
+        lookups = {p.field: p.lookup for p in plan.field_processors}
+        assert lookups == {
+            "id": "id",
+            "name": "name__value",
+            "non_existent_field": None,
+            "parents": None,
+            "parent_names": None,
+            "no_rule": None,
+        }
+
+    def test_projection_without_fallback_is_one_query(self):
+        self.query_map.field_processors = {
+            "id": {"full_path_to_single": "pk"},
+            "business_identifier": {"full_path_to_single": "business_identifier"},
+            "name": {
+                "full_path_to_single": "name.value",
+                "conditions": {"hasattr": "name"},
+            },
+        }
+        self.query_map.save()
+        gp1 = Grandparent.objects.create(
+            business_identifier="gp1", transaction=Transaction.objects.create()
+        )
+        plan = get_query_plan("GP_WITH_PARENTS")
+
+        with self.assertNumQueries(1):
+            rows = list(plan.iter_projected(plan.get_queryset().order_by("pk")))
+
+        assert rows == [
+            {"id": self.gp0.pk, "business_identifier": "gp0", "name": "Grandparent 0"},
+            {"id": gp1.pk, "business_identifier": "gp1", "name": None},
+        ]
+        assert rows[1] == plan.process_instance(gp1)
+
+    def test_projection_lookups(self):
+        assert get_projection_lookup(ParentParent, ("value", "name", "value")) == (
+            "value__name__value"
+        )
+        assert get_projection_lookup(ParentParent, ("value_id",)) == "value_id"
+        # an instance, a manager, an attribute of a value
+        assert get_projection_lookup(ParentParent, ("value",)) is None
+        assert get_projection_lookup(Grandparent, ("parentparent_set", "pk")) is None
+        assert get_projection_lookup(Grandparent, ("name", "value", "upper")) is None
+        # the condition is not on the path
+        assert (
+            get_projection_lookup(Grandparent, ("name", "value"), ("business",)) is None
+        )
+
+    def test_cached_plan_skips_the_map(self):
+        plan = get_query_plan("GP_WITH_PARENTS")
+        # the grandparents with their name,
+        # the parentparents with their parents and names
+        with self.assertNumQueries(2):
+            assert get_query_plan("GP_WITH_PARENTS") is plan
+            list(plan.get_queryset())
+
+    def test_saving_or_deleting_the_map_drops_the_plan(self):
+        plan = get_query_plan("GP_WITH_PARENTS")
+
+        self.query_map.field_processors = {"id": {"full_path_to_single": "id"}}
+        self.query_map.save()
+        new_plan = get_query_plan("GP_WITH_PARENTS")
+        assert new_plan is not plan
+        assert new_plan.process_instance(self.gp0) == {"id": self.gp0.pk}
+
+        self.query_map.delete()
+        with pytest.raises(BusinessToQueryMap.DoesNotExist):
+            get_query_plan("GP_WITH_PARENTS")
+
+
+def test_query_plan_cache_is_lru():
+    cache = QueryPlanCache(maxsize=2)
+
+    class Plan:
+        def __init__(self, map_id, version=1):
+            self.map_id = map_id
+            self.version = version
+
+    a, b, c = Plan("a"), Plan("b"), Plan("c")
+    cache.set(a)
+    cache.set(b)
+    assert cache.get("a", 1) is a
+    cache.set(c)
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) is a
+    assert cache.get("a", 2) is None
+    assert len(cache) == 2
@@ -1,7 +1,11 @@
+from unittest import mock
+
 import pytest
 from django.core.exceptions import ImproperlyConfigured
 from django.test import TestCase
 
+from django_anchor_modeling.models import clear_knot_cache
+
 from tests.orders.models import (
     OrderType,
     OrderTypeTextChoicesNoChoices,
@@ -45,3 +49,70 @@ class TestOrderTypeModel(TestCase):
         """
         with pytest.raises(ImproperlyConfigured):
             OrderTypeTextChoicesNoChoices.objects.ensure_choices_exist()
+
+
+@pytest.mark.django_db
+class TestKnotCache(TestCase):
+    def setUp(self):
+        clear_knot_cache()
+        self.addCleanup(clear_knot_cache)
+
+    def test_ensure_choices_exist_creates_only_the_missing_rows(self):
+        OrderType.objects.create(pk="REQUEST", label="Request")
+        with self.assertNumQueries(2):
+            created = OrderType.objects.ensure_choices_exist()
+        assert len(created) == len(OrderType.TextChoices.choices) - 1
+        assert OrderType.objects.count() == len(OrderType.TextChoices.choices)
+
+        with self.assertNumQueries(1):
+            assert OrderType.objects.ensure_choices_exist() == []
+
+    def test_cached_get_reads_the_table_once(self):
+        OrderType.objects.ensure_choices_exist()
+        with self.assertNumQueries(1):
+            request = OrderType.objects.cached_get(OrderType.TextChoices.REQUEST)
+            invoice = OrderType.objects.cached_get("INVOICE")
+            assert len(OrderType.objects.cached_all()) == len(
+                OrderType.TextChoices.choices
+            )
+        assert request.label == "Request"
+        assert invoice.label == "Invoice"
+
+    def test_cached_get_missing_pk(self):
+        with pytest.raises(OrderType.DoesNotExist):
+            OrderType.objects.cached_get("MISSING")
+
+    def test_save_invalidates_the_cache(self):
+        OrderType.objects.ensure_choices_exist()
+        assert OrderType.objects.cached_get("REQUEST").label == "Request"
+
+        request = OrderType.objects.get(pk="REQUEST")
+        request.label = "Request for quotation"
+        request.save()
+
+        with self.assertNumQueries(1):
+            assert (
+                OrderType.objects.cached_get("REQUEST").label == "Request for quotation"
+            )
+
+    def test_rows_read_before_a_clear_are_not_cached(self):
+        OrderType.objects.ensure_choices_exist()
+        manager_class = type(OrderType.objects)
+        get_queryset = manager_class.get_queryset
+
+        def get_queryset_after_a_save(manager):
+            # as if another thread saved a row while these were read
+            clear_knot_cache(OrderType)
+            return get_queryset(manager)
+
+        with mock.patch.object(
+            manager_class, "get_queryset", get_queryset_after_a_save
+        ):
+            assert len(OrderType.objects.cached_all()) == len(
+                OrderType.TextChoices.choices
+            )
+            with pytest.raises(OrderType.DoesNotExist):
+                OrderType.objects.cached_get("MISSING")
+
+        with self.assertNumQueries(1):
+            OrderType.objects.cached_all()
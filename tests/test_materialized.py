@@ -0,0 +1,128 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import transaction as db_transaction
+from django.test import TestCase
+
+from django_anchor_modeling.materialized import (
+    get_changed_anchor_pks,
+    refresh_materialized_model,
+    refresh_materialized_on_commit,
+)
+from django_anchor_modeling.models import MaterializedHighWaterMark, Transaction
+from tests.orders.models.transaction_backed_models import (
+    TBusiness,
+    TProduct,
+    TProductMaterialized,
+)
+
+
+@pytest.mark.django_db
+class TestMaterialized(TestCase):
+    def setUp(self):
+        t0 = Transaction.objects.create()
+        self.biz = TBusiness.objects.create(business_identifier="biz", transaction=t0)
+        self.products = TProduct.objects.bulk_create_with_attributes(
+            [
+                {
+                    "business_identifier": f"p{i}",
+                    "name": f"Product {i}",
+                    "stock_quantity": i,
+                    "seller": self.biz,
+                }
+                for i in range(5)
+            ],
+            transaction=t0,
+        )
+
+    def test_refresh_is_incremental(self):
+        pks = [product.pk for product in self.products]
+        assert refresh_materialized_model(TProductMaterialized) == 5
+        p0 = TProductMaterialized.objects.get(business_identifier="p0")
+        assert p0.name == "Product 0"
+        assert p0.stock_quantity == 0
+        assert p0.seller_id == self.biz.pk
+        assert p0.description is None
+
+        # nothing changed since, the overlap scans the anchors again
+        assert refresh_materialized_model(TProductMaterialized) == 5
+        assert refresh_materialized_model(TProductMaterialized, overlap=0) == 0
+
+        t1 = Transaction.objects.create()
+        self.products[1].name.value = "Renamed"
+        self.products[1].name.save(transaction=t1)
+        self.products[2].name.delete(transaction=t1)
+        self.products[3].delete(transaction=t1)
+
+        assert get_changed_anchor_pks(
+            TProduct, TProductMaterialized.materialized_attributes, t1.pk - 1, t1.pk
+        ) == {pks[1], pks[2], pks[3]}
+
+        # the savepoint, the watermark, the max transaction id, a query per table
+        # to find the changes (the anchor and 4 attributes, with history for
+        # each), a delete and an insert for the one batch, the watermark update
+        # and the savepoint release
+        with self.assertNumQueries(3 + 2 * 5 + 2 + 2):
+            assert refresh_materialized_model(TProductMaterialized, overlap=0) == 3
+
+        assert dict(TProductMaterialized.objects.values_list("pk", "name")) == {
+            pks[0]: "Product 0",
+            pks[1]: "Renamed",
+            pks[2]: None,
+            pks[4]: "Product 4",
+        }
+        assert (
+            MaterializedHighWaterMark.objects.get(
+                db_table=TProductMaterialized._meta.db_table
+            ).high_water_mark
+            == t1.pk
+        )
+
+    def test_refresh_sees_lower_transaction_committed_late(self):
+        # t1 is allocated first, but its writes commit after t2's refresh
+        t1 = Transaction.objects.create()
+        t2 = Transaction.objects.create()
+        self.products[1].name.value = "Renamed by t2"
+        self.products[1].name.save(transaction=t2)
+        assert refresh_materialized_model(TProductMaterialized) == 5
+
+        self.products[2].name.value = "Renamed by t1"
+        self.products[2].name.save(transaction=t1)
+
+        assert refresh_materialized_model(TProductMaterialized, overlap=0) == 0
+        # the mark t2 and t1 below it
+        assert refresh_materialized_model(TProductMaterialized, overlap=2) == 2
+        assert (
+            TProductMaterialized.objects.get(pk=self.products[2].pk).name
+            == "Renamed by t1"
+        )
+
+    def test_refresh_in_batches_and_full(self):
+        assert refresh_materialized_model(TProductMaterialized, batch_size=2) == 5
+        assert TProductMaterialized.objects.count() == 5
+
+        TProductMaterialized.objects.all().delete()
+        # incremental refresh does not see rows gone from the table itself
+        assert refresh_materialized_model(TProductMaterialized, overlap=0) == 0
+        assert refresh_materialized_model(TProductMaterialized, full=True) == 5
+        assert TProductMaterialized.objects.count() == 5
+
+    def test_refresh_on_commit(self):
+        with db_transaction.atomic():
+            refresh_materialized_on_commit(TProductMaterialized)
+            assert not TProductMaterialized.objects.exists()
+        # the on_commit callbacks of TestCase run with captureOnCommitCallbacks
+        with self.captureOnCommitCallbacks(execute=True):
+            refresh_materialized_on_commit(TProductMaterialized)
+        assert TProductMaterialized.objects.count() == 5
+
+    def test_refresh_materialized_command(self):
+        out = StringIO()
+        call_command("refresh_materialized", "orders.TProduct", stdout=out)
+        assert out.getvalue().strip() == (
+            "Refreshed 5 anchor(s) in orders.TProductMaterialized"
+        )
+        out = StringIO()
+        call_command("refresh_materialized", "--full", stdout=out)
+        assert "Refreshed 5 anchor(s)" in out.getvalue()
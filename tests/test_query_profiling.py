@@ -0,0 +1,67 @@
+import pytest
+from django.test import TestCase
+
+from dataviewer.utils.profiling import profile_queries
+from django_anchor_modeling.models import Transaction
+from tests.orders.models.transaction_backed_models import ProductName, TProduct
+
+
+@pytest.mark.django_db
+class TestProfileQueries(TestCase):
+    def test_queries_are_grouped_by_model_and_operation(self):
+        with profile_queries(explain=True) as profiler:
+            t0 = Transaction.objects.create()
+            product = TProduct.objects.create(business_identifier="p0", transaction=t0)
+            name = ProductName.objects.create(
+                anchor=product, value="p0", transaction=t0
+            )
+            name.value = "Product 0"
+            name.save(transaction=Transaction.objects.create())
+            list(TProduct.objects.with_attributes("name"))
+
+        groups = {
+            (group["model"], group["operation"]): group for group in profiler.summary()
+        }
+        assert groups[("orders.TProduct", "write")]["kind"] == "anchor"
+        # the INSERT of create and the UPDATE of save, which write the value
+        assert groups[("orders.ProductName", "write")]["kind"] == "attribute"
+        assert groups[("orders.ProductName", "write")]["count"] == 2
+        # closing the open version and inserting the new one, on create and save
+        assert groups[("orders.HistorizedProductName", "history write")]["count"] == 4
+        assert groups[("orders.TProduct", "hydrate")]["count"] == 1
+        transaction_writes = groups[("django_anchor_modeling.Transaction", "write")]
+        assert transaction_writes["kind"] == "transaction"
+        assert transaction_writes["count"] == 2
+        assert not any(
+            group["operation"] == "transaction check"
+            for (model, _), group in groups.items()
+            if model == "django_anchor_modeling.Transaction"
+        )
+        assert len(profiler.queries) == len(profiler.profiled)
+
+        hydrate = next(
+            query for query in profiler.profiled if query.operation == "hydrate"
+        )
+        assert hydrate.explain
+        assert __file__.rstrip("c") in hydrate.call_site
+        assert hydrate.duration >= 0
+        assert "orders.TProduct" in profiler.report()
+
+        with profile_queries() as profiler:
+            name.is_transaction_reused()
+            ProductName.objects.filter(pk=name.pk).values_list(
+                "transaction_id", flat=True
+            ).first()
+        assert [query.operation for query in profiler.profiled] == [
+            "transaction check",
+            "transaction check",
+        ]
+
+    def test_as_a_decorator(self):
+        @profile_queries()
+        def count_products():
+            return TProduct.objects.count()
+
+        with self.assertLogs("dataviewer.profiling", level="DEBUG") as logs:
+            assert count_products() == 0
+        assert "1 queries" in logs.output[0]
@@ -0,0 +1,126 @@
+import pytest
+from django.apps import apps
+from django.test import TestCase
+
+from django_anchor_modeling.models import Transaction
+from django_anchor_modeling.scope import (
+    get_current_transaction_scope,
+    transaction_scope,
+)
+from tests.orders.models.transaction_backed_models import (
+    ProductName,
+    ProductStockQuantity,
+    TProduct,
+)
+
+HistorizedTProduct = apps.get_model("orders", "HistorizedTProduct")
+HistorizedProductName = apps.get_model("orders", "HistorizedProductName")
+
+
+@pytest.mark.django_db
+class TestTransactionScope(TestCase):
+    def test_writes_are_flushed_in_bulk(self):
+        t0 = Transaction.objects.create()
+        old = TProduct.objects.create(business_identifier="old", transaction=t0)
+        old_name = ProductName.objects.create(anchor=old, value="Old", transaction=t0)
+
+        # the savepoint and the Transaction, an insert per table with its history
+        # insert for the 3 tables created, then the reuse check, savepoint,
+        # history close, update, history insert and release for the update
+        with self.assertNumQueries(2 + 2 * 3 + 6 + 1):
+            with transaction_scope() as scope:
+                products = []
+                for i in range(10):
+                    product = TProduct(business_identifier=f"p{i}")
+                    product.save()
+                    ProductName(anchor=product, value=f"Product {i}").save()
+                    ProductStockQuantity(anchor=product, value=i).save()
+                    products.append(product)
+
+                old_name.value = "Renamed"
+                old_name.save()
+
+                doomed = TProduct(business_identifier="doomed")
+                doomed.save()
+                # never inserted
+                doomed.delete()
+
+                # nothing written yet
+                assert products[0].pk is None
+                assert get_current_transaction_scope() is scope
+
+        assert get_current_transaction_scope() is None
+        txn = scope.transaction
+        assert TProduct.objects.filter(transaction=txn).count() == 10
+        assert ProductName.objects.filter(transaction=txn).count() == 11
+        assert not TProduct.objects.filter(business_identifier="doomed").exists()
+        assert ProductName.objects.get(anchor=products[3]).value == "Product 3"
+        assert ProductStockQuantity.objects.get(anchor=products[3]).value == 3
+        assert ProductName.objects.get(anchor=old).value == "Renamed"
+        assert HistorizedProductName.objects.filter(original_id=old.pk).count() == 2
+        assert HistorizedTProduct.objects.filter(on_txn=txn).count() == 10
+
+    def test_deletes_are_flushed_after_the_writes(self):
+        t0 = Transaction.objects.create()
+        products = [
+            TProduct.objects.create(business_identifier=f"p{i}", transaction=t0)
+            for i in range(3)
+        ]
+
+        with transaction_scope() as scope:
+            for product in products[:2]:
+                product.delete()
+            with transaction_scope() as nested_scope:
+                assert nested_scope is scope
+                TProduct(business_identifier="p3").save()
+
+        assert sorted(
+            TProduct.objects.values_list("business_identifier", flat=True)
+        ) == [
+            "p2",
+            "p3",
+        ]
+        assert HistorizedTProduct.objects.filter(off_txn=scope.transaction).count() == 2
+
+    def test_save_with_the_pk_of_an_existing_row_updates_it(self):
+        t0 = Transaction.objects.create()
+        product = TProduct.objects.create(business_identifier="p0", transaction=t0)
+        ProductName.objects.create(anchor=product, value="Product 0", transaction=t0)
+        other_product = TProduct.objects.create(
+            business_identifier="p1", transaction=t0
+        )
+
+        with transaction_scope() as scope:
+            # as outside a scope, an UPDATE of the existing row
+            ProductName(anchor=product, value="Renamed").save()
+            # and an INSERT of the missing one
+            ProductName(anchor=other_product, value="Product 1").save()
+
+        assert ProductName.objects.get(anchor=product).value == "Renamed"
+        assert ProductName.objects.get(anchor=other_product).value == "Product 1"
+        assert set(
+            HistorizedProductName.objects.filter(on_txn=scope.transaction).values_list(
+                "value", flat=True
+            )
+        ) == {"Renamed", "Product 1"}
+
+    def test_nested_scope_of_another_database(self):
+        with transaction_scope():
+            with pytest.raises(ValueError):
+                with transaction_scope(using="other"):
+                    pass
+
+    def test_nothing_is_written_on_error(self):
+        with pytest.raises(ValueError):
+            with transaction_scope():
+                TProduct(business_identifier="p0").save()
+                raise ValueError
+
+        assert not TProduct.objects.exists()
+
+    def test_other_transactions_are_not_buffered(self):
+        t0 = Transaction.objects.create()
+        with transaction_scope():
+            product = TProduct(business_identifier="p0")
+            product.save(transaction=t0)
+            assert product.pk is not None
@@ -0,0 +1,155 @@
+from types import SimpleNamespace
+
+import pytest
+from django.apps import apps
+from django.db import connection
+from django.db.utils import NotSupportedError
+from django.test import TestCase
+
+from django_anchor_modeling import constants
+from django_anchor_modeling.models import Transaction
+from django_anchor_modeling.triggers import create_triggers_sql, drop_triggers_sql
+from tests.orders.models.transaction_backed_models import (
+    TriggerProduct,
+    TriggerProductName,
+)
+
+HistorizedTriggerProduct = apps.get_model("orders", "HistorizedTriggerProduct")
+HistorizedTriggerProductName = apps.get_model("orders", "HistorizedTriggerProductName")
+
+OPEN = constants.SENTINEL_NULL_TRANSACTION_ID
+
+
+def versions_of(historized_model, original_id):
+    return list(
+        historized_model.objects.filter(original_id=original_id)
+        .order_by("pk")
+        .values_list("value", "on_txn_id", "off_txn_id")
+    )
+
+
+@pytest.mark.django_db
+class TestTriggerHistorization(TestCase):
+    def setUp(self):
+        self.t0 = Transaction.objects.create()
+        self.p0 = TriggerProduct.objects.create(
+            business_identifier="p0", transaction=self.t0
+        )
+
+    def test_save_is_historized_by_the_triggers_only(self):
+        t0 = self.t0
+        # the INSERT only, no history written from Python
+        with self.assertNumQueries(1):
+            TriggerProductName.objects.create(
+                anchor=self.p0, value="Product 0", transaction=t0
+            )
+        assert versions_of(HistorizedTriggerProductName, self.p0.pk) == [
+            ("Product 0", t0.pk, OPEN)
+        ]
+
+        t1 = Transaction.objects.create()
+        name = TriggerProductName.objects.get(pk=self.p0.pk)
+        name.value = "Product 0 - updated"
+        name.save(transaction=t1)
+        assert versions_of(HistorizedTriggerProductName, self.p0.pk) == [
+            ("Product 0", t0.pk, t1.pk),
+            ("Product 0 - updated", t1.pk, OPEN),
+        ]
+
+    def test_queryset_update_and_raw_sql_are_historized(self):
+        TriggerProductName.objects.create(
+            anchor=self.p0, value="Product 0", transaction=self.t0
+        )
+
+        t1 = Transaction.objects.create()
+        TriggerProductName.objects.filter(pk=self.p0.pk).update(
+            value="updated", transaction=t1
+        )
+
+        t2 = Transaction.objects.create()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {TriggerProductName._meta.db_table} "
+                "SET value = %s, transaction_id = %s WHERE anchor_id = %s",
+                ["raw", t2.pk, self.p0.pk],
+            )
+
+        assert versions_of(HistorizedTriggerProductName, self.p0.pk) == [
+            ("Product 0", self.t0.pk, t1.pk),
+            ("updated", t1.pk, t2.pk),
+            ("raw", t2.pk, OPEN),
+        ]
+
+    def test_bulk_create_is_historized(self):
+        t1 = Transaction.objects.create()
+        products = TriggerProduct.objects.bulk_create_with_attributes(
+            [
+                {"business_identifier": f"p{i}", "name": f"Product {i}"}
+                for i in range(1, 4)
+            ],
+            transaction=t1,
+        )
+        assert HistorizedTriggerProduct.objects.filter(on_txn=t1).count() == 3
+        assert versions_of(HistorizedTriggerProductName, products[0].pk) == [
+            ("Product 1", t1.pk, OPEN)
+        ]
+
+    def test_delete_closes_with_the_deleting_transaction(self):
+        TriggerProductName.objects.create(
+            anchor=self.p0, value="Product 0", transaction=self.t0
+        )
+        t1 = Transaction.objects.create()
+        # a later transaction, which the delete trigger alone would have used
+        Transaction.objects.create()
+
+        TriggerProductName.objects.get(pk=self.p0.pk).delete(transaction=t1)
+        assert versions_of(HistorizedTriggerProductName, self.p0.pk) == [
+            ("Product 0", self.t0.pk, t1.pk)
+        ]
+
+    def test_raw_delete_closes_with_the_latest_transaction(self):
+        TriggerProductName.objects.create(
+            anchor=self.p0, value="Product 0", transaction=self.t0
+        )
+        latest = Transaction.objects.create()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {TriggerProductName._meta.db_table} "
+                "WHERE anchor_id = %s",
+                [self.p0.pk],
+            )
+
+        assert versions_of(HistorizedTriggerProductName, self.p0.pk) == [
+            ("Product 0", self.t0.pk, latest.pk)
+        ]
+
+
+def test_postgresql_triggers_sql():
+    postgresql = SimpleNamespace(vendor="postgresql", ops=connection.ops)
+
+    create_function, create_trigger = create_triggers_sql(
+        postgresql, TriggerProductName, HistorizedTriggerProductName
+    )
+    assert create_function.startswith(
+        'CREATE OR REPLACE FUNCTION "orders_triggerproductname_historize"()'
+    )
+    assert "LANGUAGE plpgsql" in create_function
+    assert 'NEW."value"' in create_function
+    assert create_trigger == (
+        'CREATE TRIGGER "orders_triggerproductname_historize" '
+        'AFTER INSERT OR UPDATE OR DELETE ON "orders_triggerproductname" '
+        'FOR EACH ROW EXECUTE FUNCTION "orders_triggerproductname_historize"()'
+    )
+
+    assert drop_triggers_sql(postgresql, TriggerProductName) == [
+        'DROP TRIGGER IF EXISTS "orders_triggerproductname_historize" '
+        'ON "orders_triggerproductname"',
+        'DROP FUNCTION IF EXISTS "orders_triggerproductname_historize"()',
+    ]
+
+
+def test_triggers_not_supported_on_other_databases():
+    mysql = SimpleNamespace(vendor="mysql", ops=connection.ops)
+    with pytest.raises(NotSupportedError):
+        create_triggers_sql(mysql, TriggerProductName, HistorizedTriggerProductName)
@@ -0,0 +1,44 @@
+import pytest
+from django.test import TestCase
+
+from django_anchor_modeling.exceptions import UndeletableModelError
+from tests.orders.models import ArchivableNote, ConditionalNote
+
+
+@pytest.mark.django_db
+class TestUndeletableModelManager(TestCase):
+    def test_delete_checks_deletable_q_in_one_query(self):
+        ArchivableNote.objects.create(text="archived", is_archived=True)
+        active = ArchivableNote.objects.create(text="active")
+
+        # savepoint, exists, rollback and release
+        with self.assertNumQueries(4), pytest.raises(UndeletableModelError):
+            ArchivableNote.objects.delete()
+        assert ArchivableNote.objects.count() == 2
+
+        active.is_archived = True
+        active.save()
+        # savepoint, exists, delete and release
+        with self.assertNumQueries(4):
+            deleted, _ = ArchivableNote.objects.delete()
+        assert deleted == 2
+        assert not ArchivableNote.objects.exists()
+
+    def test_delete_checks_can_be_deleted_without_deletable_q(self):
+        ConditionalNote.objects.create(text="archived", is_archived=True)
+        active = ConditionalNote.objects.create(text="active")
+
+        with pytest.raises(UndeletableModelError):
+            ConditionalNote.objects.delete()
+        assert ConditionalNote.objects.count() == 2
+
+        active.is_archived = True
+        active.save()
+        deleted, _ = ConditionalNote.objects.delete()
+        assert deleted == 2
+        assert not ConditionalNote.objects.exists()
+
+    def test_instances_stay_undeletable(self):
+        note = ArchivableNote.objects.create(text="archived", is_archived=True)
+        with pytest.raises(UndeletableModelError):
+            note.delete()
@@ -0,0 +1,117 @@
+import gc
+import queue
+import weakref
+from unittest import mock
+
+import pytest
+from django.test import TestCase, TransactionTestCase
+
+from django_anchor_modeling import write_behind as write_behind_module
+from django_anchor_modeling.models import Transaction
+from django_anchor_modeling.write_behind import WriteBehindQueue
+from tests.orders.models.transaction_backed_models import (
+    ProductName,
+    ProductStockQuantity,
+    TProduct,
+)
+
+
+@pytest.mark.django_db
+class TestWriteBehindQueue(TestCase):
+    def setUp(self):
+        t0 = Transaction.objects.create()
+        self.products = TProduct.objects.bulk_create_with_attributes(
+            [
+                {"business_identifier": f"p{i}", "stock_quantity": i, "name": f"P{i}"}
+                for i in range(3)
+            ],
+            transaction=t0,
+        )
+        self.write_behind = WriteBehindQueue(autostart=False, flush_on_exit=False)
+
+    def test_cancelled_futures_are_skipped(self):
+        p0, p1, _ = self.products
+        cancelled = self.write_behind.submit(ProductStockQuantity, p0, 10)
+        assert cancelled.cancel()
+        kept = self.write_behind.submit(ProductName, p1, "Renamed")
+
+        assert self.write_behind.flush() == 1
+        assert kept.result(timeout=5)[2] is True
+        assert ProductName.objects.get(anchor=p1).value == "Renamed"
+        # every future of the update is cancelled, so it is dropped
+        assert ProductStockQuantity.objects.get(anchor=p0).value == 0
+
+    def test_queues_are_closed_at_exit_without_being_kept_alive(self):
+        write_behind = WriteBehindQueue(autostart=False)
+        assert write_behind in write_behind_module._open_queues
+        write_behind.close()
+        assert write_behind not in write_behind_module._open_queues
+
+        reference = weakref.ref(WriteBehindQueue(autostart=False))
+        gc.collect()
+        assert reference() is None
+
+    def test_updates_are_coalesced_into_one_transaction(self):
+        p0, p1, p2 = self.products
+        futures = [
+            self.write_behind.submit(ProductStockQuantity, p0, value)
+            for value in (10, 11, 12)
+        ]
+        unchanged = self.write_behind.submit(ProductStockQuantity, p1.pk, 1)
+        renamed = self.write_behind.submit(ProductName, p2, "Renamed")
+        assert len(self.write_behind) == 3
+
+        transactions = Transaction.objects.count()
+        assert self.write_behind.flush() == 3
+        assert Transaction.objects.count() == transactions + 1
+
+        for future in futures:
+            obj, created, different = future.result(timeout=0)
+            assert (obj.value, created, different) == (12, False, True)
+        assert unchanged.result(timeout=0)[2] is False
+        assert renamed.result(timeout=0)[0].value == "Renamed"
+        assert ProductStockQuantity.objects.get(anchor=p0).value == 12
+        assert self.write_behind.flush() == 0
+
+    def test_back_pressure(self):
+        write_behind = WriteBehindQueue(
+            max_pending=1, autostart=False, flush_on_exit=False
+        )
+        write_behind.submit(ProductStockQuantity, self.products[0], 1)
+        # the same pair is coalesced
+        write_behind.submit(ProductStockQuantity, self.products[0], 2)
+        with pytest.raises(queue.Full):
+            write_behind.submit(ProductStockQuantity, self.products[1], 1, timeout=0.01)
+
+        write_behind.close()
+        assert ProductStockQuantity.objects.get(anchor=self.products[0]).value == 2
+        with pytest.raises(RuntimeError):
+            write_behind.submit(ProductStockQuantity, self.products[1], 1)
+
+    def test_failed_commit_sets_the_exceptions(self):
+        future = self.write_behind.submit(ProductStockQuantity, self.products[0], 5)
+        with mock.patch.object(
+            ProductStockQuantity.objects.__class__,
+            "create_or_update_if_different_many",
+            side_effect=ValueError("boom"),
+        ):
+            self.write_behind.flush()
+        with pytest.raises(ValueError):
+            future.result(timeout=0)
+
+
+class TestWriteBehindThread(TransactionTestCase):
+    def test_background_thread_commits(self):
+        t0 = Transaction.objects.create()
+        product = TProduct.objects.create(business_identifier="p0", transaction=t0)
+
+        write_behind = WriteBehindQueue(interval=0.01, flush_on_exit=False)
+        futures = [
+            write_behind.submit(ProductStockQuantity, product, value)
+            for value in range(5)
+        ]
+        obj, created, _ = futures[-1].result(timeout=5)
+        write_behind.close(timeout=5)
+
+        assert obj.value == 4
+        assert ProductStockQuantity.objects.get(anchor=product).value == 4